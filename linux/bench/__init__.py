@@ -0,0 +1,9 @@
+"""
+Benchmarks for SessionForge (Linux).
+Generates synthetic ~/.claude/projects trees and Codex databases, times
+discovery, enrichment, cost analysis and sorting against them in a
+sandboxed HOME, and compares the results with a stored baseline.
+
+Run from the linux directory:  python -m bench --help
+Transcript readers alone:       python -m bench.scan --help
+"""
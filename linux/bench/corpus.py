@@ -0,0 +1,260 @@
+"""
+Synthetic session corpus for the SessionForge benchmarks.
+Writes a Claude projects tree (transcripts plus sessions-index.json) and
+a Codex state database with rollout files under a fake home directory.
+The same spec and seed always produce the same corpus.
+"""
+
+import os
+import json
+import math
+import random
+import shutil
+import sqlite3
+import hashlib
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Written last; a corpus directory without it (or with another spec) is regenerated
+MARKER_FILE = 'corpus.json'
+
+CLAUDE_MODELS = ('claude-opus-4-1-20250805', 'claude-sonnet-4-5-20250929', 'claude-haiku-4-5-20251001')
+CODEX_MODELS = ('gpt-5-codex', 'gpt-5', 'o4-mini')
+
+# Newest generated session; older ones step back from here
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+_WORDS = ('refactor the parser so that nested blocks keep their indentation and add a regression test '
+          'for the cache invalidation path then update the docs fix flaky integration timeout in ci').split()
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+    sessions: int = 1000
+    projects: int = 10
+    # Transcript length: log-normal number of turns (median, sigma), capped
+    median_turns: int = 12
+    turns_sigma: float = 1.0
+    max_turns: int = 2000
+    # Share of sessions with one huge tool-output line, and its size
+    huge_line_rate: float = 0.01
+    huge_line_bytes: int = 1024 * 1024
+    # Share of transcripts listed in sessions-index.json, and of those, share
+    # appended to after the index was written (so they must be parsed anyway)
+    index_coverage: float = 0.8
+    stale_index_rate: float = 0.05
+    codex_threads: int = 100
+    codex_rollout_lines: int = 40
+    seed: int = 1
+
+    @classmethod
+    def for_scale(cls, sessions: int, **overrides) -> 'CorpusSpec':
+        """Spec with project and Codex counts proportional to the session count."""
+        values = dict(sessions=sessions, projects=max(1, sessions // 100),
+                      codex_threads=max(1, sessions // 10))
+        values.update(overrides)
+        return cls(**values)
+
+    def key(self) -> str:
+        """Short stable hash identifying this spec."""
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()[:10]
+
+
+def ensure_corpus(root: Path, spec: CorpusSpec) -> Tuple[Path, Dict[str, Any]]:
+    """
+    Generate the corpus under root unless it is already there.
+    Returns the fake home and the corpus totals (see generate_corpus).
+    """
+    home = root / 'home'
+    marker = root / MARKER_FILE
+    try:
+        stored = json.loads(marker.read_text())
+        if stored['spec'] == asdict(spec):
+            return home, stored['totals']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    totals = generate_corpus(home, spec)
+    marker.write_text(json.dumps({'spec': asdict(spec), 'totals': totals}, indent=2))
+    return home, totals
+
+
+def generate_corpus(home: Path, spec: CorpusSpec) -> Dict[str, Any]:
+    """Write the corpus under home (cleared first). Returns file and byte counts."""
+    _clear(home)
+    rng = random.Random(spec.seed)
+    totals = {'transcripts': 0, 'transcript_bytes': 0, 'indexed': 0, 'codex_threads': 0}
+
+    projects_dir = home / '.claude' / 'projects'
+    per_project = _split(spec.sessions, spec.projects)
+    serial = 0
+    for p, count in enumerate(per_project):
+        project_path = f"/home/bench/work/project-{p:04d}"
+        project_dir = projects_dir / project_path.replace('/', '-')
+        project_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for _ in range(count):
+            serial += 1
+            session_id = _uuid(rng)
+            modified = _EPOCH - timedelta(minutes=serial * 7)
+            path = project_dir / f"{session_id}.jsonl"
+            turns = min(spec.max_turns, max(1, int(rng.lognormvariate(math.log(spec.median_turns),
+                                                                     spec.turns_sigma))))
+            huge = rng.random() < spec.huge_line_rate
+            size, prompt = _write_transcript(path, rng, session_id, project_path, turns, modified,
+                                             spec.huge_line_bytes if huge else 0)
+            mtime = modified.timestamp()
+            os.utime(path, (mtime, mtime))
+            totals['transcripts'] += 1
+            totals['transcript_bytes'] += size
+
+            if rng.random() < spec.index_coverage:
+                stale = rng.random() < spec.stale_index_rate
+                index_mtime = mtime - 3600 if stale else mtime
+                entries.append({
+                    'sessionId': session_id,
+                    'fullPath': str(path),
+                    'fileMtime': int(index_mtime * 1000),
+                    'firstPrompt': prompt,
+                    'summary': prompt[:40].title() if rng.random() < 0.7 else '',
+                    'messageCount': turns,
+                    'created': (modified - timedelta(minutes=turns)).isoformat().replace('+00:00', 'Z'),
+                    'modified': modified.isoformat().replace('+00:00', 'Z'),
+                    'gitBranch': rng.choice(('main', 'main', 'develop', f'feature/{p}-{serial}')),
+                    'projectPath': project_path,
+                    'isSidechain': False,
+                })
+        if entries:
+            totals['indexed'] += len(entries)
+            with open(project_dir / 'sessions-index.json', 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+
+    totals['codex_threads'] = _write_codex(home / '.codex', rng, spec)
+    return totals
+
+
+def _write_transcript(path: Path, rng: random.Random, session_id: str, cwd: str, turns: int,
+                      modified: datetime, huge_bytes: int) -> Tuple[int, str]:
+    """Write one Claude transcript; returns (bytes written, first prompt)."""
+    model = rng.choice(CLAUDE_MODELS)
+    start = modified - timedelta(minutes=turns)
+    prompt = _sentence(rng, 6, 18)
+    huge_turn = rng.randrange(turns) if huge_bytes else -1
+    lines = [{'type': 'summary', 'summary': prompt[:50], 'leafUuid': _uuid(rng), 'cwd': cwd}]
+    parent = None
+    for turn in range(turns):
+        stamp = (start + timedelta(minutes=turn)).isoformat().replace('+00:00', 'Z')
+        user_uuid = _uuid(rng)
+        lines.append({
+            'parentUuid': parent, 'isSidechain': False, 'userType': 'external', 'cwd': cwd,
+            'sessionId': session_id, 'version': '2.0.14', 'gitBranch': 'main', 'type': 'user',
+            'message': {'role': 'user', 'content': prompt if turn == 0 else _sentence(rng, 4, 30)},
+            'uuid': user_uuid, 'timestamp': stamp,
+        })
+        assistant_uuid = _uuid(rng)
+        content: List[Dict[str, Any]] = [{'type': 'text', 'text': _sentence(rng, 20, 120)}]
+        if rng.random() < 0.4:
+            content.append({'type': 'tool_use', 'id': f"toolu_{_uuid(rng)[:12]}", 'name': 'Bash',
+                            'input': {'command': 'pytest -q', 'description': 'Run tests'}})
+        lines.append({
+            'parentUuid': user_uuid, 'isSidechain': False, 'cwd': cwd, 'sessionId': session_id,
+            'type': 'assistant', 'uuid': assistant_uuid, 'timestamp': stamp,
+            'message': {
+                'id': f"msg_{_uuid(rng)[:20]}", 'type': 'message', 'role': 'assistant', 'model': model,
+                'content': content, 'stop_reason': 'end_turn',
+                'usage': {
+                    'input_tokens': rng.randint(5, 4000),
+                    'cache_creation_input_tokens': rng.randint(0, 20000),
+                    'cache_read_input_tokens': rng.randint(0, 200000),
+                    'output_tokens': rng.randint(20, 3000),
+                },
+            },
+        })
+        parent = assistant_uuid
+        if turn == huge_turn:
+            lines.append({
+                'parentUuid': parent, 'cwd': cwd, 'sessionId': session_id, 'type': 'user',
+                'message': {'role': 'user', 'content': [{
+                    'type': 'tool_result', 'tool_use_id': f"toolu_{_uuid(rng)[:12]}",
+                    'content': ('test output line ' * (huge_bytes // 17 + 1))[:huge_bytes],
+                }]},
+                'uuid': _uuid(rng), 'timestamp': stamp,
+            })
+
+    data = ''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data), prompt
+
+
+def _write_codex(codex_dir: Path, rng: random.Random, spec: CorpusSpec) -> int:
+    """Write state_5.sqlite with spec.codex_threads threads and their rollouts."""
+    if spec.codex_threads <= 0:
+        return 0
+    sessions_dir = codex_dir / 'sessions'
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(codex_dir / 'state_5.sqlite'))
+    db.execute('''
+        CREATE TABLE threads (
+            id TEXT PRIMARY KEY, rollout_path TEXT, created_at INTEGER, updated_at INTEGER,
+            source TEXT, model_provider TEXT, cwd TEXT, title TEXT, sandbox_policy TEXT,
+            approval_mode TEXT, tokens_used INTEGER, has_user_event INTEGER, archived INTEGER,
+            archived_at INTEGER, git_sha TEXT, git_branch TEXT, git_origin_url TEXT,
+            cli_version TEXT, first_user_message TEXT
+        )
+    ''')
+    db.execute('CREATE INDEX threads_updated_at ON threads(updated_at)')
+    rows = []
+    for i in range(spec.codex_threads):
+        thread_id = _uuid(rng)
+        updated = int((_EPOCH - timedelta(minutes=i * 11)).timestamp())
+        rollout = sessions_dir / f"rollout-{i:06d}-{thread_id}.jsonl"
+        model = rng.choice(CODEX_MODELS)
+        with open(rollout, 'w', encoding='utf-8') as f:
+            for n in range(spec.codex_rollout_lines):
+                if n % 10 == 0:
+                    entry = {'type': 'turn_context', 'payload': {'cwd': '/home/bench/codex', 'model': model}}
+                else:
+                    entry = {'type': 'response_item', 'payload': {'type': 'message', 'role': 'assistant',
+                                                                  'content': _sentence(rng, 10, 80)}}
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        rows.append((thread_id, str(rollout), updated - 600, updated, 'cli', 'openai',
+                     f"/home/bench/codex/repo-{i % 25}", _sentence(rng, 3, 8), 'workspace-write',
+                     'on-request', rng.randint(1000, 2_000_000), 1, 1 if rng.random() < 0.05 else 0,
+                     None, 'abc123', 'main', None, '0.46.0', _sentence(rng, 5, 15)))
+    db.executemany(f"INSERT INTO threads VALUES ({', '.join('?' * 19)})", rows)
+    db.commit()
+    db.close()
+    return len(rows)
+
+
+def _split(total: int, parts: int) -> List[int]:
+    """Split total into parts counts differing by at most one."""
+    base, extra = divmod(total, max(1, parts))
+    return [base + (1 if i < extra else 0) for i in range(max(1, parts))]
+
+
+def _uuid(rng: random.Random) -> str:
+    value = '%032x' % rng.getrandbits(128)
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _clear(home: Path):
+    """Remove a previously generated home (only the parts this module writes)."""
+    for part in ('.claude', '.codex', '.config'):
+        shutil.rmtree(home / part, ignore_errors=True)
+    home.mkdir(parents=True, exist_ok=True)
+
+
+def describe(spec: CorpusSpec, root: Optional[Path] = None) -> str:
+    """One-line summary of a spec."""
+    text = (f"{spec.sessions:,} sessions in {spec.projects:,} projects, "
+            f"{spec.index_coverage:.0%} indexed, {spec.codex_threads:,} Codex threads")
+    return f"{text} ({root})" if root else text
@@ -0,0 +1,190 @@
+"""
+Transcript reader benchmark for SessionForge (Linux).
+Times one full pass over single transcripts of several sizes with each way
+of reading them: text-mode open() iteration, binary open() iteration,
+JsonlScanner with read() calls and JsonlScanner over an mmap, plus the
+backwards model lookup with and without a mapping. Each reader decodes
+every line it keeps, as the transcript analyzer does. The mapped scanner
+is then timed once per installed JSON backend (orjson, ujson, json).
+
+  python -m bench.scan --sizes 1,16,128 --huge-line-mb 8
+  python -m bench.scan --cold    # evict each file from the page cache first
+  python -m bench.scan --json-backends orjson,json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+# The 'lib' package lives next to this one (linux/lib)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib import jsonbackend, jsonscan  # noqa: E402
+from lib.jsonscan import JsonlScanner  # noqa: E402
+from lib.transcript import ENTRY_KEYS  # noqa: E402
+from lib.session import _read_last_model  # noqa: E402
+from .corpus import _write_transcript  # noqa: E402
+from .suite import DEFAULT_CORPUS_DIR  # noqa: E402
+
+DEFAULT_SIZES = '1,16,128'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench.scan', description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Transcript sizes in MB (default: {DEFAULT_SIZES})')
+    parser.add_argument('--huge-line-mb', type=float, default=0.0,
+                        help='Also put one tool-output line of this many MB in each transcript')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes per reader; the fastest counts (default: 3)')
+    parser.add_argument('--cold', action='store_true',
+                        help='Drop each file from the page cache before every pass (posix_fadvise)')
+    parser.add_argument('--dir', type=Path, default=DEFAULT_CORPUS_DIR / 'scan',
+                        help=f"Where the transcripts are written (default: {DEFAULT_CORPUS_DIR / 'scan'})")
+    parser.add_argument('--json-backends', default='all',
+                        help=f"JSON backends to time the scanner with: {', '.join(jsonbackend.BACKENDS)} "
+                             f"or all installed (default: all)")
+    args = parser.parse_args(argv)
+    try:
+        sizes = [float(s) for s in args.sizes.split(',') if s.strip()]
+    except ValueError:
+        parser.error(f"invalid --sizes '{args.sizes}'")
+    installed = [b['name'] for b in jsonbackend.describe_backends() if b['installed']]
+    if args.json_backends == 'all':
+        backends = installed
+    else:
+        backends = [b.strip() for b in args.json_backends.split(',') if b.strip()]
+        missing = [b for b in backends if b not in installed]
+        if missing:
+            parser.error(f"JSON backend not installed or unknown: {', '.join(missing)}")
+
+    args.dir.mkdir(parents=True, exist_ok=True)
+    readers = _readers(backends)
+    print(f"  JSON backend: {jsonbackend.backend_name()} (scanner and model rows without one named)")
+    print(f"  {'file':<14} {'reader':<16} {'time':>10} {'MB/s':>8} {'peak heap':>10}")
+    for size_mb in sizes:
+        path = _transcript(args.dir, size_mb, args.huge_line_mb)
+        size = path.stat().st_size
+        label = f"{size / 1e6:.1f} MB"
+        for name, reader in readers.items():
+            seconds = min(_timed(reader, path, args.cold) for _ in range(max(1, args.repeat)))
+            peak = _peak_heap(reader, path)
+            print(f"  {label:<14} {name:<16} {seconds * 1000:>8.1f}ms {size / 1e6 / seconds:>8.0f} "
+                  f"{peak / 1e6:>8.1f}MB")
+    return 0
+
+
+def _readers(backends: List[str]) -> Dict[str, Callable[[Path], object]]:
+    def text_open(path: Path):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    pass
+
+    def binary_open(path: Path):
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    pass
+
+    def scanner(mmap_min_bytes: int):
+        def run(path: Path):
+            saved, jsonscan.MMAP_MIN_BYTES = jsonscan.MMAP_MIN_BYTES, mmap_min_bytes
+            try:
+                with open(path, 'rb') as f:
+                    for _ in JsonlScanner(f, ENTRY_KEYS):
+                        pass
+            finally:
+                jsonscan.MMAP_MIN_BYTES = saved
+        return run
+
+    def model_lookup(mmap_min_bytes: int):
+        def run(path: Path):
+            saved, jsonscan.MMAP_MIN_BYTES = jsonscan.MMAP_MIN_BYTES, mmap_min_bytes
+            try:
+                _read_last_model(path)
+            finally:
+                jsonscan.MMAP_MIN_BYTES = saved
+        return run
+
+    def with_backend(name: str, reader: Callable[[Path], object]):
+        def run(path: Path):
+            saved = jsonbackend.backend_name()
+            jsonbackend.set_backend(name)
+            try:
+                reader(path)
+            finally:
+                jsonbackend.set_backend(saved)
+        return run
+
+    never = sys.maxsize
+    readers = {
+        'open() text': text_open,
+        'open() binary': binary_open,
+        'scanner read()': scanner(never),
+        'scanner mmap': scanner(0),
+        'model blocks': model_lookup(never),
+        'model mmap': model_lookup(0),
+    }
+    for name in backends:
+        readers[f'scanner {name}'] = with_backend(name, scanner(0))
+    return readers
+
+
+def _transcript(directory: Path, size_mb: float, huge_line_mb: float) -> Path:
+    """Write (or reuse) a transcript of roughly size_mb from the corpus generator."""
+    path = directory / f"transcript-{size_mb:g}mb-{huge_line_mb:g}huge.jsonl"
+    if path.exists():
+        return path
+    huge_bytes = int(huge_line_mb * 1024 * 1024)
+    target = size_mb * 1024 * 1024
+    turns = max(1, int((target - huge_bytes) / 1200))
+    modified = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for _ in range(3):  # Turn sizes vary; correct the estimate from what was written
+        size, _prompt = _write_transcript(path, random.Random(1), 'bench-scan', '/home/bench/scan',
+                                          turns, modified, huge_bytes)
+        per_turn = max(1.0, (size - huge_bytes) / turns)
+        turns = max(1, int((target - huge_bytes) / per_turn))
+    return path
+
+
+def _timed(reader: Callable[[Path], object], path: Path, cold: bool) -> float:
+    if cold:
+        _evict(path)
+    start = time.perf_counter()
+    reader(path)
+    return time.perf_counter() - start
+
+
+def _peak_heap(reader: Callable[[Path], object], path: Path) -> int:
+    """Peak Python heap during one pass (mapped pages are page cache, not heap)."""
+    tracemalloc.start()
+    try:
+        reader(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _evict(path: Path):
+    """Ask the kernel to drop the file's clean pages from the page cache."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
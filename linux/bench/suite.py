@@ -0,0 +1,225 @@
+"""
+Benchmark runner for SessionForge (Linux).
+Generates (or reuses) a corpus per scale, runs bench.worker in a sandboxed
+HOME for a cold and a warm pass per repetition, keeps the fastest time of
+each measurement, writes the results as JSON and compares them with a
+baseline file.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from .corpus import CorpusSpec, ensure_corpus, describe
+
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+
+LINUX_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_CORPUS_DIR = Path(tempfile.gettempdir()) / 'sessionforge-bench'
+
+# A measurement regresses when it is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and by more than this, so sub-millisecond noise never fails a run
+NOISE_FLOOR_SECONDS = 0.005
+
+RESULTS_VERSION = 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m bench', description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--scales', default=','.join(SCALES),
+                        help=f"Comma-separated scales: {', '.join(SCALES)} or a session count (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help='Passes per scale; the fastest counts (default: 3)')
+    parser.add_argument('--corpus-dir', type=Path, default=DEFAULT_CORPUS_DIR,
+                        help=f'Where generated corpora are kept and reused (default: {DEFAULT_CORPUS_DIR})')
+    parser.add_argument('--output', type=Path, help='Write the results JSON here')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH,
+                        help=f'Baseline to compare with (default: {BASELINE_PATH.name} in this package)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed slowdown before a regression is reported (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--scan-workers', type=int, default=0,
+                        help="sf's scan_workers setting in the sandbox (default: 0 = one per CPU)")
+    parser.add_argument('--json-backend', choices=('auto', 'orjson', 'ujson', 'json'), default='auto',
+                        help="sf's json_backend setting in the sandbox (default: auto)")
+    corpus = parser.add_argument_group('corpus shape (applied to every scale)')
+    for name, value in asdict(CorpusSpec()).items():
+        if name != 'sessions':
+            corpus.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=None,
+                                help=f'(default: {value}' + (', scaled)' if name in ('projects', 'codex_threads') else ')'))
+    args = parser.parse_args(argv)
+
+    overrides = {name: getattr(args, name) for name in asdict(CorpusSpec())
+                 if name != 'sessions' and getattr(args, name) is not None}
+    try:
+        scales = [_parse_scale(s) for s in args.scales.split(',') if s.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+
+    results: Dict[str, Any] = {'version': RESULTS_VERSION, 'meta': _meta(args), 'scales': {}}
+    for label, sessions in scales:
+        spec = CorpusSpec.for_scale(sessions, **overrides)
+        results['scales'][label] = run_scale(label, spec, args.corpus_dir, args.repeat, args.scan_workers,
+                                             args.json_backend)
+
+    _print_results(results)
+    if args.output:
+        _write_json(args.output, results)
+        print(f"\nResults written to {args.output}")
+
+    status = 0
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(baseline, results, args.threshold)
+        status = 1 if regressions else 0
+    else:
+        print(f"\nNo baseline at {args.baseline} (create one with --save-baseline)")
+    return status
+
+
+def _parse_scale(text: str) -> Tuple[str, int]:
+    text = text.strip()
+    if text in SCALES:
+        return text, SCALES[text]
+    if text.isdigit() and int(text) > 0:
+        return text, int(text)
+    raise ValueError(f"unknown scale '{text}'")
+
+
+def run_scale(label: str, spec: CorpusSpec, corpus_dir: Path, repeat: int, scan_workers: int,
+              json_backend: str) -> Dict[str, Any]:
+    """Generate the scale's corpus if needed and time it repeat times."""
+    root = corpus_dir / f"{label}-{spec.key()}"
+    print(f"[{label}] {describe(spec, root)}")
+    start = time.perf_counter()
+    home, totals = ensure_corpus(root, spec)
+    print(f"[{label}] corpus ready in {time.perf_counter() - start:.1f}s: "
+          f"{totals['transcripts']:,} transcripts, {totals['transcript_bytes'] / 1e6:,.1f} MB")
+    env = _sandbox_env(root, home, scan_workers, json_backend)
+
+    runs: Dict[str, List[float]] = {}
+    counters: Dict[str, Dict[str, int]] = {}
+    sessions = 0
+    backend = ''
+    for n in range(repeat):
+        for mode in ('cold', 'warm'):
+            result = _run_worker(mode, env)
+            sessions = result['sessions']
+            backend = result['json_backend']
+            counters[mode] = result['counters']
+            for name, seconds in result['timings'].items():
+                runs.setdefault(f"{mode}.{name}", []).append(seconds)
+        print(f"[{label}] pass {n + 1}/{repeat}: cold discovery {runs['cold.discovery'][-1]:.3f}s, "
+              f"warm discovery {runs['warm.discovery'][-1]:.3f}s")
+
+    return {
+        'spec': asdict(spec),
+        'corpus': totals,
+        'sessions': sessions,
+        'json_backend': backend,  # The one actually used ('auto' resolved)
+        'timings': {name: min(values) for name, values in runs.items()},
+        'runs': runs,
+        'counters': counters,
+    }
+
+
+def _sandbox_env(root: Path, home: Path, scan_workers: int, json_backend: str) -> Dict[str, str]:
+    """Environment for the worker: HOME is the corpus, nothing points at the real user."""
+    config_dir = home / '.config' / 'claude-menu'
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / 'config.json').write_text(json.dumps({'config': {
+        'claude_path': str(home / '.claude'),
+        'menu_path': str(config_dir),
+        'scan_workers': scan_workers,
+        'json_backend': json_backend,
+    }}))
+    runtime_dir = root / 'run'
+    runtime_dir.mkdir(exist_ok=True)
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith(('GIT_', 'CLAUDE_', 'CODEX_'))}
+    env.update(HOME=str(home), XDG_RUNTIME_DIR=str(runtime_dir), XDG_CONFIG_HOME=str(home / '.config'))
+    return env
+
+
+def _run_worker(mode: str, env: Dict[str, str]) -> Dict[str, Any]:
+    proc = subprocess.run([sys.executable, '-m', 'bench.worker', mode], cwd=str(LINUX_DIR), env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"bench.worker {mode} failed ({proc.returncode}):\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float) -> List[str]:
+    """Print each measurement against the baseline; returns the regressed ones."""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('meta', {}).get('timestamp', '?')}:")
+    print(f"  {'scale':<6} {'measurement':<22} {'baseline':>10} {'current':>10} {'change':>8}")
+    for label, scale in results['scales'].items():
+        base_scale = baseline.get('scales', {}).get(label)
+        if base_scale is None:
+            print(f"  {label:<6} (not in baseline)")
+            continue
+        if base_scale.get('spec') != scale['spec']:
+            print(f"  {label:<6} (corpus spec differs from the baseline's, comparing anyway)")
+        for name, seconds in scale['timings'].items():
+            base = base_scale.get('timings', {}).get(name)
+            if base is None:
+                continue
+            change = (seconds - base) / base if base else 0.0
+            regressed = change > threshold and seconds - base > NOISE_FLOOR_SECONDS
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {label:<6} {name:<22} {base:>9.3f}s {seconds:>9.3f}s {change:>+7.0%}{flag}")
+            if regressed:
+                regressions.append(f"{label} {name}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}")
+    else:
+        print(f"\nNo regressions over {threshold:.0%}")
+    return regressions
+
+
+def _print_results(results: Dict[str, Any]):
+    print()
+    for label, scale in results['scales'].items():
+        print(f"[{label}] {scale['sessions']:,} sessions (fastest of {len(next(iter(scale['runs'].values())))}):")
+        for name, seconds in scale['timings'].items():
+            print(f"  {name:<22} {seconds * 1000:>10.1f} ms")
+
+
+def _meta(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(LINUX_DIR),
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'host': socket.gethostname(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'scan_workers': args.scan_workers,
+        'json_backend': args.json_backend,
+    }
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + '\n')
@@ -0,0 +1,89 @@
+"""
+Benchmark worker for SessionForge (Linux).
+Runs one measured pass inside the sandboxed HOME set up by bench.suite
+and prints its timings as JSON on stdout. Every pass is a fresh process,
+so module singletons (session cache, git cache, Codex connection) start
+out empty just as they do when sf starts.
+
+  python -m bench.worker cold   # session cache deleted first
+  python -m bench.worker warm   # session cache left from the previous pass
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# The 'lib' package lives next to this one (linux/lib)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.config import get_config_manager, get_session_cache_path, get_snapshot_path  # noqa: E402
+from lib.jsonbackend import set_backend  # noqa: E402
+from lib.session import get_all_sessions, enrich_sessions  # noqa: E402
+from lib.table import SessionTable, SORT_KEYS  # noqa: E402
+from lib.perf import get_stats  # noqa: E402
+
+
+def _clear_caches():
+    """Delete the session cache (with its WAL files) and the startup snapshot."""
+    cache_path = get_session_cache_path()
+    for path in (cache_path, cache_path.with_name(cache_path.name + '-wal'),
+                 cache_path.with_name(cache_path.name + '-shm'), get_snapshot_path()):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def run(mode: str) -> Dict[str, Any]:
+    """Time discovery, enrichment, cost analysis and sorting once."""
+    backend = set_backend(get_config_manager().load().json_backend)
+    if mode == 'cold':
+        _clear_caches()
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    sessions = get_all_sessions()
+    timings['discovery'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    enrich_sessions(sessions)
+    timings['enrichment'] = time.perf_counter() - start
+
+    # What MenuAction.COST_ANALYSIS does before printing
+    table = SessionTable(sessions)
+    start = time.perf_counter()
+    enrich_sessions(list(table))
+    table.invalidate(s.session_id for s in table)
+    rows = [(table.display_name(s), s.cost) for s in table.sorted_by('cost', reverse=True) if s.cost > 0]
+    total_cost = sum(cost for _, cost in rows)
+    timings['cost_analysis'] = time.perf_counter() - start
+
+    # Every column both ways, as when the user cycles through sort columns
+    start = time.perf_counter()
+    for column in SORT_KEYS:
+        table.sort(column)
+        table.sort(column, reverse=True)
+    timings['sort'] = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'sessions': len(sessions),
+        'json_backend': backend,
+        'total_cost': round(total_cost, 4),
+        'timings': timings,
+        'counters': get_stats()['counters'],
+    }
+
+
+def main() -> int:
+    if len(sys.argv) != 2 or sys.argv[1] not in ('cold', 'warm'):
+        print("usage: python -m bench.worker cold|warm", file=sys.stderr)
+        return 2
+    print(json.dumps(run(sys.argv[1])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -29,8 +29,19 @@ from pathlib import Path
 lib_dir = Path(__file__).parent / 'lib'
 sys.path.insert(0, str(lib_dir))
 
-from lib.config import get_config_manager, get_config, get_claude_projects_path, get_all_claude_paths, setup_logging, log_debug, log_info, log_error, get_debug_log_path
-from lib.session import get_all_sessions, get_all_codex_sessions, get_git_branch, get_session_model, get_session_cost, Session
+from lib.config import get_config_manager, get_config, get_claude_projects_path, get_all_claude_paths, setup_logging, log_debug, log_info, log_error, get_debug_log_path, enable_tracing, trace_span
+from lib.session import get_all_sessions, get_all_codex_sessions, get_git_branch, enrich_sessions, read_head_lines, Session
+from lib.cache import get_session_cache
+from lib.enrichment import BackgroundEnricher
+from lib.table import SessionTable
+from lib.live import LiveSessionIndex
+from lib.daemon import fetch_sessions, run_daemon_command
+from lib.snapshot import load_snapshot, save_snapshot
+from lib.cli import add_cli_subcommands, run_cli
+from lib.perf import get_stats, format_stats
+from lib.budget import FileBudget, set_file_budget, get_file_budget, deferred_files
+from lib.jsonbackend import set_backend as set_json_backend, backend_name, describe_backends
+from lib.profiling import enable_profiling, profiling_enabled, profile_phase, write_profile, find_latest_profile, format_profile
 from lib.menu import SessionMenu, SessionActionMenu, MenuAction
 from lib.image import create_background_image, BackgroundInfo
 from lib.terminal import get_adapter, detect_terminal, is_wsl
@@ -95,6 +106,18 @@ def show_debug_menu():
         print("\n  ⚠ WARNING: No image library available!")
         print("    Background images will not work.")
 
+    print("\n[JSON Backend]")
+    print(f"  In use:       {backend_name()} (config: {config.json_backend})")
+    for backend in describe_backends():
+        label = f"{backend['name']}:"
+        if backend['name'] == 'json':
+            print(f"  {label:<13} ✓ Standard library")
+        elif backend['installed']:
+            print(f"  {label:<13} ✓ {backend['version'] or 'Available'}")
+        else:
+            print(f"  {label:<13} ✗ Not found (optional, faster transcript parsing)")
+            print(f"                Install: pip3 install {backend['name']}")
+
     print("\n[Terminal Emulators]")
     if deps['kitty']:
         print("  Kitty:        ✓ Available")
@@ -148,6 +171,27 @@ def show_debug_menu():
         log_size = debug_log.stat().st_size
         print(f"  Log size:     {log_size:,} bytes")
 
+    print("\n[Session Cache]")
+    cache = get_session_cache()
+    print(f"  Cache file:   {cache.db_path}")
+    if cache.db_path.exists():
+        print(f"  Cache size:   {cache.db_path.stat().st_size:,} bytes")
+        print(f"  Entries:      {cache.entry_count():,}")
+
+    print("\n[Parse Budget]")
+    budget = get_file_budget() or FileBudget.from_config(config)
+    print(f"  Per file:     {budget.describe()}")
+    deferred = deferred_files()
+    if not deferred:
+        print("  Deferred:     none")
+    for entry in deferred:
+        if entry.finished_at is None:
+            status = "queued in the background"
+        else:
+            status = f"finished after {entry.finished_at - entry.deferred_at:.1f}s"
+        print(f"  {entry.path.name}: {entry.reason} at byte {entry.parsed:,}, {status}")
+        print(f"    {entry.path.parent}")
+
     print("\n" + "=" * 50)
     print("\n[Actions]")
     print("  1. Re-detect terminal")
@@ -159,10 +203,13 @@ def show_debug_menu():
     print("  7. Scan for sessions (verbose)")
     print("  8. Dump raw session JSONL (debug parsing)")
     print("  9. Back to main menu")
+    print(" 10. Clear session cache")
+    print(" 11. Performance statistics")
+    print(" 12. Show last profile (--profile)")
     print("")
 
     try:
-        choice = input("Select [1-9]: ").strip()
+        choice = input("Select [1-12]: ").strip()
 
         if choice == '1':
             detected = detect_terminal()
@@ -208,7 +255,7 @@ def show_debug_menu():
             if config_mgr.config.debug:
                 debug_path = get_debug_log_path()
                 print(f"Log file: {debug_path}")
-                log_debug(f"Debug log: {debug_path}")
+                log_debug("Debug log: %s", debug_path)
             input("\nPress Enter to continue...")
 
         elif choice == '5':
@@ -226,6 +273,7 @@ def show_debug_menu():
         elif choice == '6':
             if debug_log.exists():
                 debug_log.unlink()
+                setup_logging(config.debug)  # Reopen, the log writer still had the old file open
                 print("\nDebug log cleared.")
             else:
                 print("\nNo debug log to clear.")
@@ -318,39 +366,73 @@ def show_debug_menu():
 
                     print("First 10 lines (formatted JSON):\n")
                     try:
-                        with open(session_file, 'r', encoding='utf-8') as f:
-                            for line_num, line in enumerate(f, 1):
-                                if line_num > 10:
-                                    print(f"\n... ({line_num - 1}+ more lines)")
-                                    break
-                                try:
-                                    entry = json.loads(line)
-                                    print(f"--- Line {line_num} ---")
-                                    print(f"Type: {entry.get('type', 'NO TYPE')}")
-                                    print(f"Keys: {list(entry.keys())}")
-
-                                    # Show relevant fields for debugging
-                                    if 'model' in entry:
-                                        print(f"model: {entry['model']}")
-                                    if 'message' in entry:
-                                        msg = entry['message']
-                                        if isinstance(msg, dict):
-                                            print(f"message keys: {list(msg.keys())}")
-                                            if 'model' in msg:
-                                                print(f"message.model: {msg['model']}")
-                                            if 'usage' in msg:
-                                                print(f"message.usage: {msg['usage']}")
-                                    if 'usage' in entry:
-                                        print(f"usage: {entry['usage']}")
-                                    print()
-                                except json.JSONDecodeError as e:
-                                    print(f"Line {line_num}: JSON ERROR: {e}")
-                                    print(f"  Raw: {line[:200]}...")
+                        # Bounded read - the first lines of a huge transcript are all we need
+                        head = read_head_lines(session_file, max_bytes=4 * 1024 * 1024, max_lines=11)
+                        for line_num, line in enumerate(head, 1):
+                            if line_num > 10:
+                                print(f"\n... ({line_num - 1}+ more lines)")
+                                break
+                            try:
+                                entry = json.loads(line)
+                                print(f"--- Line {line_num} ---")
+                                print(f"Type: {entry.get('type', 'NO TYPE')}")
+                                print(f"Keys: {list(entry.keys())}")
+
+                                # Show relevant fields for debugging
+                                if 'model' in entry:
+                                    print(f"model: {entry['model']}")
+                                if 'message' in entry:
+                                    msg = entry['message']
+                                    if isinstance(msg, dict):
+                                        print(f"message keys: {list(msg.keys())}")
+                                        if 'model' in msg:
+                                            print(f"message.model: {msg['model']}")
+                                        if 'usage' in msg:
+                                            print(f"message.usage: {msg['usage']}")
+                                if 'usage' in entry:
+                                    print(f"usage: {entry['usage']}")
+                                print()
+                            except json.JSONDecodeError as e:
+                                print(f"Line {line_num}: JSON ERROR: {e}")
+                                print(f"  Raw: {line[:200].decode('utf-8', 'replace')}...")
                     except IOError as e:
                         print(f"Error reading file: {e}")
 
                     input("\nPress Enter to continue...")
 
+        elif choice == '10':
+            get_session_cache().clear()
+            print("\nSession cache cleared. Sessions will be re-parsed on next load.")
+            input("\nPress Enter to continue...")
+
+        elif choice == '11':
+            stats = get_stats()
+            if not stats['counters']:
+                # Nothing measured in this process yet (e.g. 'sf --debug')
+                print("\nNo discovery has run yet, scanning sessions...")
+                enrich_sessions(get_all_sessions())
+                stats = get_stats()
+            print("\n" + "=" * 50)
+            print("Performance Statistics")
+            print("=" * 50 + "\n")
+            print("\n".join(format_stats(stats)))
+            input("\nPress Enter to continue...")
+
+        elif choice == '12':
+            latest = find_latest_profile()
+            if latest is None:
+                print("\nNo profile yet. Run 'claude-menu --profile', reproduce the slowness, then quit.")
+            else:
+                stamp, paths = latest
+                print(f"\n=== Profile {stamp} ===")
+                for path in paths:
+                    print(f"\n--- {path} ---")
+                    if path.suffix == '.pstats':
+                        print(format_profile(path))
+                    else:
+                        print(path.read_text(encoding='utf-8', errors='replace'))
+            input("\nPress Enter to continue...")
+
     except KeyboardInterrupt:
         print("\nCancelled.")
 
@@ -366,9 +448,25 @@ def main():
     parser.add_argument('--enable-debug', action='store_true', help='Enable debug logging to file')
     parser.add_argument('--terminal', choices=['kitty', 'konsole', 'direct'],
                         help='Terminal to use (kitty, konsole, or direct for WSL)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Record timing spans and write a Chrome/Perfetto trace to FILE on exit')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the load/enrich/render phases with cProfile (.pstats files in the logs directory)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Like --profile, plus a tracemalloc report of the top allocations per phase')
+    subparsers = parser.add_subparsers(dest='command')
+    daemon_parser = subparsers.add_parser(
+        'daemon', help='Run the session index daemon (the menu and CLI query it when running)'
+    )
+    daemon_parser.add_argument('action', nargs='?', choices=['run', 'status', 'stop'], default='run',
+                               help='run in the foreground (default), show status, or stop it')
+    add_cli_subcommands(subparsers)
 
     args = parser.parse_args()
 
+    if args.trace:
+        enable_tracing(args.trace)
+
     if args.version:
         print(f"SessionForge (sf) v{VERSION}")
         return 0
@@ -385,13 +483,19 @@ def main():
 
     # Setup logging based on config
     setup_logging(config.debug)
-    log_info(f"Claude Menu v{VERSION} starting")
-    log_debug(f"Terminal: {config.terminal}, Debug: {config.debug}")
+    log_info("Claude Menu v%s starting", VERSION)
+    set_json_backend(config.json_backend)
+    log_debug("Terminal: %s, Debug: %s", config.terminal, config.debug)
 
     if args.debug:
         show_debug_menu()
         return 0
 
+    if args.command == 'daemon':
+        return run_daemon_command(args.action)
+    if args.command in ('list', 'show', 'cost', 'stats'):
+        return run_cli(args)
+
     # Set terminal from args or auto-detect
     if args.terminal:
         config.terminal = args.terminal
@@ -408,7 +512,13 @@ def main():
         return 0
 
     # Run main menu loop
-    return run_menu_loop()
+    if args.profile or args.profile_memory:
+        enable_profiling(memory=args.profile_memory)
+    try:
+        return run_menu_loop()
+    finally:
+        for path in write_profile():
+            print(f"Profile written: {path}")
 
 
 def run_menu_loop() -> int:
@@ -416,47 +526,80 @@ def run_menu_loop() -> int:
     config = get_config()
     log_info("Entering main menu loop")
     hide_unnamed = False
-
+    # One pathological transcript must not hold up the menu; it is deferred instead
+    set_file_budget(FileBudget.from_config(config))
+
+    # A running 'sf daemon' already has every session loaded and enriched
+    daemon_sessions = fetch_sessions()
+    use_daemon = daemon_sessions is not None
+
+    # Otherwise paint from the last run's snapshot while discovery revalidates it
+    # in the background, then keep sessions current from file changes. A profile
+    # should measure the real discovery, so it skips the snapshot.
+    live = None
+    if not use_daemon:
+        snapshot = load_snapshot() if not profiling_enabled() else None
+        if snapshot is None:
+            print("Loading sessions...")
+        with profile_phase('load'):
+            live = LiveSessionIndex(watch=config.watch_sessions).start(seed=snapshot)
+
+    first_pass = True
     while True:
         # Load sessions
         log_debug("Loading sessions...")
-        print("Loading sessions...")
-        sessions = get_all_sessions()
-        log_info(f"Loaded {len(sessions)} sessions")
-
-        # Enrich sessions with additional info
-        log_debug(f"Enriching {len(sessions)} sessions with model/cost data...")
-        sessions_with_files = 0
-        sessions_with_model = 0
-        for session in sessions:
-            # Verify session file exists
-            if session._session_file and session._session_file.exists():
-                sessions_with_files += 1
-            else:
-                log_debug(f"Session {session.session_id[:8]} has no valid _session_file")
-
-            if not session.model:
-                session.model = get_session_model(session)
-            if session.model:
-                sessions_with_model += 1
-            if not session.git_branch:
-                session.git_branch = get_git_branch(session.project_path)
-            if session.cost == 0:
-                session.cost = get_session_cost(session)
-
-        log_debug(f"Enrichment complete: {sessions_with_files}/{len(sessions)} have valid files, {sessions_with_model}/{len(sessions)} have models")
-
-        # Filter unnamed if toggled
-        if hide_unnamed:
-            sessions = [s for s in sessions if s.custom_title or s.first_prompt]
+        with profile_phase('load'):
+            if use_daemon:
+                sessions = daemon_sessions if daemon_sessions is not None else fetch_sessions()
+                daemon_sessions = None
+                if sessions is None:
+                    log_info("Session daemon went away, discovering in-process")
+                    use_daemon = False
+                    print("Loading sessions...")
+                    live = LiveSessionIndex(watch=config.watch_sessions).start()
+            if not use_daemon:
+                if not live.watch and not first_pass:
+                    live.revalidate()  # Not watching: show what we have, rediscover behind it
+                sessions = live.sessions()
+            first_pass = False
+            all_sessions = sessions
+            log_info("Loaded %d sessions", len(sessions))
+
+            # Filter unnamed if toggled
+            if hide_unnamed:
+                sessions = [s for s in sessions if s.custom_title or s.first_prompt]
+            sessions = SessionTable(sessions)
+
+        if profiling_enabled():
+            # cProfile only sees the thread that enabled it, so enrich up front
+            log_debug("Enriching %d sessions with model/cost data (profiling)...", len(sessions))
+            with profile_phase('enrich'):
+                enrich_sessions(list(sessions))
+                sessions.invalidate(s.session_id for s in sessions)
+            enricher = None
+        else:
+            # Show the menu right away; model/cost/branch fill in on background threads
+            log_debug("Enriching %d sessions with model/cost data in the background...", len(sessions))
+            enricher = BackgroundEnricher(sessions).start()
 
         # Show main menu
         menu = SessionMenu()
         menu.show_hidden = not hide_unnamed
-        selected_session, action = menu.run(sessions)
+        with profile_phase('render'):
+            selected_session, action = menu.run(sessions, enricher=enricher, live=live)
+
+        # Whatever the user chose (launch, quit, refresh...), stop pending work
+        if enricher is not None:
+            enricher.cancel()
+
+        # Remember the list for an instant first frame next time (rows the
+        # enricher didn't reach are filled in then)
+        save_snapshot(live.sessions(consume_changes=False) if live else all_sessions)
 
         # Handle action
         if action == MenuAction.QUIT:
+            if live:
+                live.stop()
             print("Goodbye!")
             return 0
 
@@ -467,7 +610,7 @@ def run_menu_loop() -> int:
             handle_new_session()
 
         elif action == MenuAction.REFRESH:
-            continue  # Loop will reload sessions
+            continue  # Loop will reload sessions (from the live index or daemon)
 
         elif action == MenuAction.TOGGLE_HIDDEN:
             hide_unnamed = not hide_unnamed
@@ -475,6 +618,10 @@ def run_menu_loop() -> int:
             print(f"Unnamed sessions now {status}")
 
         elif action == MenuAction.COST_ANALYSIS:
+            # Cost analysis needs every row, so finish what the background missed
+            with profile_phase('enrich'):
+                enrich_sessions(list(sessions))
+                sessions.invalidate(s.session_id for s in sessions)
             show_cost_analysis(sessions)
 
         elif action == MenuAction.CONFIG:
@@ -548,10 +695,10 @@ def handle_new_session():
         if not directory:
             directory = os.getcwd()
 
-        log_debug(f"New session directory: {directory}")
+        log_debug("New session directory: %s", directory)
 
         if not os.path.isdir(directory):
-            log_error(f"Directory does not exist: {directory}")
+            log_error("Directory does not exist: %s", directory)
             print(f"Error: Directory does not exist: {directory}")
             input("Press Enter to continue...")
             return
@@ -559,7 +706,7 @@ def handle_new_session():
         # Codex: just launch in directory (skip model/profile workflow)
         if use_codex:
             codex_cmd = get_platform('codex')['new_cmd']
-            log_info(f"Launching {codex_cmd} in directory: {directory}")
+            log_info("Launching %s in directory: %s", codex_cmd, directory)
             original_dir = os.getcwd()
             os.chdir(directory)
             os.system(codex_cmd)
@@ -570,43 +717,44 @@ def handle_new_session():
         # Get optional session name
         print("Enter session name (optional):")
         name = input("> ").strip()
-        log_debug(f"Session name: {name or '(none)'}")
+        log_debug("Session name: %s", name or '(none)')
 
         # Launch Claude
         config = get_config()
         adapter = get_adapter(config.terminal)
-        log_debug(f"Using terminal adapter: {config.terminal}")
+        log_debug("Using terminal adapter: %s", config.terminal)
 
         if name:
             # Create profile with background
-            log_debug(f"Creating profile with background for: {name}")
+            log_debug("Creating profile with background for: %s", name)
             bg_info = BackgroundInfo(
                 session_name=name,
                 directory=directory,
                 git_branch=get_git_branch(directory),
             )
             bg_path = create_background_image(bg_info)
-            log_debug(f"Background image path: {bg_path}")
+            log_debug("Background image path: %s", bg_path)
 
             result = adapter.create_profile(name, directory, str(bg_path) if bg_path else None)
-            log_debug(f"create_profile result: {result}")
+            log_debug("create_profile result: %s", result)
 
             claude_cmd = get_platform('claude')['new_cmd']
-            log_info(f"Launching session '{name}' with command '{claude_cmd}'")
-            result = adapter.launch_session(name, command=claude_cmd, working_dir=directory)
-            log_debug(f"launch_session result: {result}")
+            log_info("Launching session '%s' with command '%s'", name, claude_cmd)
+            with trace_span('launch_session', adapter=adapter.name):
+                result = adapter.launch_session(name, command=claude_cmd, working_dir=directory)
+            log_debug("launch_session result: %s", result)
         else:
             # Just launch Claude without profile
-            log_info(f"Launching claude in directory: {directory}")
+            log_info("Launching claude in directory: %s", directory)
             original_dir = os.getcwd()
             os.chdir(directory)
-            log_debug(f"Changed to directory: {directory}")
+            log_debug("Changed to directory: %s", directory)
             claude_cmd = get_platform('claude')['new_cmd']
-            log_debug(f"Running: {claude_cmd}")
+            log_debug("Running: %s", claude_cmd)
             exit_code = os.system(claude_cmd)
-            log_debug(f"Claude exit code: {exit_code}")
+            log_debug("Claude exit code: %s", exit_code)
             os.chdir(original_dir)
-            log_debug(f"Restored directory: {original_dir}")
+            log_debug("Restored directory: %s", original_dir)
 
         log_info("handle_new_session() completed")
 
@@ -614,60 +762,61 @@ def handle_new_session():
         log_debug("handle_new_session() cancelled by user")
         print("\nCancelled.")
     except Exception as e:
-        log_error(f"handle_new_session() error: {e}")
+        log_error("handle_new_session() error: %s", e)
         print(f"\nError: {e}")
         input("Press Enter to continue...")
 
 
 def handle_continue(session: Session):
     """Continue an existing session (Claude or Codex)."""
-    log_info(f"handle_continue() called for session: {session.session_id[:8]} (source={session.source})")
+    log_info("handle_continue() called for session: %.8s (source=%s)", session.session_id, session.source)
     print(f"\nContinuing session: {session.display_name}")
 
     config = get_config()
-    log_debug(f"Terminal type: {config.terminal}")
+    log_debug("Terminal type: %s", config.terminal)
 
     adapter = get_adapter(config.terminal)
-    log_debug(f"Adapter: {adapter.name}, available: {adapter.is_available()}")
+    log_debug("Adapter: %s, available: %s", adapter.name, adapter.is_available())
 
     # Build resume command based on source (from PlatformRegistry)
     platform = get_platform(session.source)
     cmd = platform['resume_cmd'].format(session_id=session.session_id)
     if session.source == 'codex':
-        log_debug(f"Codex resume: dispatching to '{cmd}' in {session.project_path}")
-    log_debug(f"Command: {cmd}")
+        log_debug("Codex resume: dispatching to '%s' in %s", cmd, session.project_path)
+    log_debug("Command: %s", cmd)
 
     # For direct mode or if no profile exists, run directly
     if config.terminal == 'direct' or not adapter.is_available():
-        log_debug(f"Direct mode: chdir to {session.project_path}")
+        log_debug("Direct mode: chdir to %s", session.project_path)
         os.chdir(session.project_path)
-        log_debug(f"Running: {cmd}")
+        log_debug("Running: %s", cmd)
         os.system(cmd)
     elif session.custom_title and adapter.profile_exists(session.custom_title):
-        log_debug(f"Using existing profile: {session.custom_title}")
-        result = adapter.launch_session(session.custom_title, command=cmd, working_dir=session.project_path)
-        log_debug(f"Launch result: {result}")
+        log_debug("Using existing profile: %s", session.custom_title)
+        with trace_span('launch_session', adapter=adapter.name):
+            result = adapter.launch_session(session.custom_title, command=cmd, working_dir=session.project_path)
+        log_debug("Launch result: %s", result)
         if not result:
             log_error("Failed to launch, falling back to direct")
             os.chdir(session.project_path)
             os.system(cmd)
     else:
         # Launch directly
-        log_debug(f"No profile, running directly in {session.project_path}")
+        log_debug("No profile, running directly in %s", session.project_path)
         os.chdir(session.project_path)
         os.system(cmd)
 
 
 def handle_fork(session: Session):
     """Fork a session (Claude or Codex)."""
-    log_info(f"handle_fork() called for session: {session.session_id[:8]} (source={session.source})")
+    log_info("handle_fork() called for session: %.8s (source=%s)", session.session_id, session.source)
     print(f"\nForking session: {session.display_name}")
 
     # Codex has native fork command
     if session.source == 'codex':
         platform = get_platform(session.source)
         cmd = platform['fork_cmd'].format(session_id=session.session_id)
-        log_debug(f"Codex fork command: {cmd}")
+        log_debug("Codex fork command: %s", cmd)
         os.chdir(session.project_path)
         os.system(cmd)
         return
@@ -681,25 +830,25 @@ def handle_fork(session: Session):
             input("Press Enter to continue...")
             return
 
-        log_debug(f"Fork name: {name}")
+        log_debug("Fork name: %s", name)
         config = get_config()
-        log_debug(f"Terminal type: {config.terminal}")
+        log_debug("Terminal type: %s", config.terminal)
 
         adapter = get_adapter(config.terminal)
-        log_debug(f"Adapter: {adapter.name}, available: {adapter.is_available()}")
+        log_debug("Adapter: %s, available: %s", adapter.name, adapter.is_available())
 
         # Check if adapter is available
         if not adapter.is_available():
-            log_error(f"Terminal '{config.terminal}' is not available, falling back to direct mode")
+            log_error("Terminal '%s' is not available, falling back to direct mode", config.terminal)
             print(f"Warning: {config.terminal} not available, running in current terminal")
             cmd = get_platform('claude')['resume_cmd'].format(session_id=session.session_id)
             os.chdir(session.project_path)
-            log_debug(f"Running command: {cmd} in {session.project_path}")
+            log_debug("Running command: %s in %s", cmd, session.project_path)
             os.system(cmd)
             return
 
         # Create background image
-        log_debug(f"Creating background image for fork...")
+        log_debug("Creating background image for fork...")
         bg_info = BackgroundInfo(
             session_name=name,
             directory=session.project_path,
@@ -708,31 +857,32 @@ def handle_fork(session: Session):
             model=session.model,
         )
         bg_path = create_background_image(bg_info)
-        log_debug(f"Background image: {bg_path}")
+        log_debug("Background image: %s", bg_path)
 
         # Create profile
-        log_debug(f"Creating profile: {name}")
+        log_debug("Creating profile: %s", name)
         profile_result = adapter.create_profile(name, session.project_path, str(bg_path) if bg_path else None)
-        log_debug(f"Profile created: {profile_result}")
+        log_debug("Profile created: %s", profile_result)
 
         # Launch with Claude resume
         cmd = get_platform('claude')['resume_cmd'].format(session_id=session.session_id)
-        log_debug(f"Launch command: {cmd}")
+        log_debug("Launch command: %s", cmd)
 
         if config.terminal == 'direct':
             print(f"Forked session '{name}' ready.")
-            log_debug(f"Direct mode: chdir to {session.project_path}")
+            log_debug("Direct mode: chdir to %s", session.project_path)
             os.chdir(session.project_path)
-            log_debug(f"Running: {cmd}")
+            log_debug("Running: %s", cmd)
             os.system(cmd)
         else:
-            log_debug(f"Launching via adapter: {adapter.name}")
-            result = adapter.launch_session(name, command=cmd, working_dir=session.project_path)
-            log_debug(f"Launch result: {result}")
+            log_debug("Launching via adapter: %s", adapter.name)
+            with trace_span('launch_session', adapter=adapter.name):
+                result = adapter.launch_session(name, command=cmd, working_dir=session.project_path)
+            log_debug("Launch result: %s", result)
             if result:
                 print(f"Forked session '{name}' launched in new terminal.")
             else:
-                log_error(f"Failed to launch session, falling back to direct mode")
+                log_error("Failed to launch session, falling back to direct mode")
                 print(f"Failed to launch in {config.terminal}, running in current terminal...")
                 os.chdir(session.project_path)
                 os.system(cmd)
@@ -741,7 +891,7 @@ def handle_fork(session: Session):
     except KeyboardInterrupt:
         print("\nFork cancelled.")
     except Exception as e:
-        log_error(f"handle_fork() error: {e}")
+        log_error("handle_fork() error: %s", e)
         print(f"\nError during fork: {e}")
         import traceback
         traceback.print_exc()
@@ -839,7 +989,7 @@ Config file: ~/.config/claude-menu/config.json
 """)
 
 
-def show_cost_analysis(sessions):
+def show_cost_analysis(sessions: SessionTable):
     """Display cost analysis for all sessions."""
     print("\n" + "=" * 70)
     print("Cost Analysis")
@@ -848,9 +998,9 @@ def show_cost_analysis(sessions):
     print("-" * 70)
 
     total_cost = 0.0
-    for session in sorted(sessions, key=lambda s: s.cost, reverse=True):
+    for session in sessions.sorted_by('cost', reverse=True):
         if session.cost > 0:
-            name = session.display_name[:28]
+            name = sessions.display_name(session)[:28]
             print(f"{name:<30} ${session.cost:>8.2f} {session.model:<8} {session.message_count:>8}")
             total_cost += session.cost
 
@@ -858,6 +1008,11 @@ def show_cost_analysis(sessions):
     print(f"{'TOTAL':<30} ${total_cost:>8.2f}")
     print("=" * 70)
 
+    pending = sum(1 for entry in deferred_files() if entry.finished_at is None)
+    if pending:
+        print(f"\n{pending} transcript(s) over the per-file parse budget are not included yet;")
+        print("they are analyzed in the background (see Debug / System Information).")
+
     print("\nPricing (per 1M tokens):")
     print("  Sonnet: $3 input, $15 output, $3.75 cache write, $0.30 cache read")
     print("  Opus:   $15 input, $75 output, $18.75 cache write, $1.50 cache read")
@@ -0,0 +1,147 @@
+"""
+Per-file parse budgets for SessionForge (Linux).
+Caps the bytes, lines and time a single transcript may take to analyze
+while the menu waits for it. A file that goes over is shown with
+placeholder values and deferred: the background enricher finishes it in
+its lowest-priority band, without limits, and the debug menu lists it.
+
+Budgets only apply in a process that installs one (the menu does), so
+the CLI and the daemon always analyze files in full.
+"""
+
+import time
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Set, Any
+from dataclasses import dataclass, replace
+
+from .config import log_debug
+from . import perf
+
+
+@dataclass(frozen=True)
+class FileBudget:
+    """Limits on one analysis call for one file (0 = no limit)."""
+    max_bytes: int = 0
+    max_lines: int = 0
+    max_ms: int = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'FileBudget':
+        return cls(max(0, config.file_budget_bytes), max(0, config.file_budget_lines),
+                   max(0, config.file_budget_ms))
+
+    def __bool__(self) -> bool:
+        return bool(self.max_bytes or self.max_lines or self.max_ms)
+
+    def exceeded(self, parsed: int, lines: int, seconds: float) -> str:
+        """Which limit parsed bytes, lines and seconds have passed ('' if none)."""
+        if self.max_bytes and parsed >= self.max_bytes:
+            return f"over {self.max_bytes:,} bytes"
+        if self.max_lines and lines >= self.max_lines:
+            return f"over {self.max_lines:,} lines"
+        if self.max_ms and seconds * 1000 >= self.max_ms:
+            return f"over {self.max_ms:,} ms"
+        return ''
+
+    def describe(self) -> str:
+        limits = [f"{self.max_bytes:,} bytes" if self.max_bytes else '',
+                  f"{self.max_lines:,} lines" if self.max_lines else '',
+                  f"{self.max_ms:,} ms" if self.max_ms else '']
+        return ', '.join(limit for limit in limits if limit) or 'none'
+
+
+class OverBudget(Exception):
+    """
+    Raised by analyze_transcript when a file goes over its budget.
+    partial holds the stats up to where parsing stopped; it is a valid
+    resume point, so the next analysis carries on from there.
+    """
+
+    def __init__(self, reason: str, partial: Any):
+        super().__init__(reason, partial)  # Both in args, so it pickles across the process pool
+        self.reason = reason
+        self.partial = partial
+
+    def placeholder(self) -> Any:
+        """Stats to show meanwhile: the partial ones without model and cost."""
+        return replace(self.partial, last_model='', usage={})
+
+
+@dataclass
+class DeferredFile:
+    """A transcript that went over budget, as listed in the debug menu."""
+    path: Path
+    reason: str
+    parsed: int  # Bytes parsed when it was deferred (from the start of the file)
+    deferred_at: float
+    finished_at: Optional[float] = None
+
+
+_installed: Optional[FileBudget] = None
+
+_lock = threading.Lock()
+_deferred: Dict[Path, DeferredFile] = {}
+_partial: Dict[Path, Any] = {}
+
+
+def set_file_budget(budget: Optional[FileBudget]):
+    """Install the budget for this process (None or an empty budget: no limits)."""
+    global _installed
+    _installed = budget if budget else None
+
+
+def get_file_budget() -> Optional[FileBudget]:
+    """The installed budget, or None."""
+    return _installed
+
+
+def defer_file(path: Path, error: OverBudget):
+    """Record a file that went over budget, keeping its partial stats to resume from."""
+    with _lock:
+        entry = _deferred.get(path)
+        if entry is None or entry.finished_at is not None:
+            _deferred[path] = DeferredFile(path, error.reason, error.partial.offset, time.time())
+            perf.count('budget.deferred')
+        else:
+            entry.reason = error.reason
+            entry.parsed = error.partial.offset
+        _partial[path] = error.partial
+    log_debug("Budget: deferred %s (%s) at byte %d", path.name, error.reason, error.partial.offset)
+
+
+def take_partial(path: Path) -> Optional[Any]:
+    """The partial stats a deferred file stopped at (handed out once), or None."""
+    with _lock:
+        return _partial.pop(path, None)
+
+
+def finish_file(path: Path):
+    """Mark a deferred file as fully analyzed (no-op for any other file)."""
+    with _lock:
+        entry = _deferred.get(path)
+        if entry is None or entry.finished_at is not None:
+            return
+        entry.finished_at = time.time()
+        _partial.pop(path, None)
+    perf.count('budget.finished')
+    log_debug("Budget: finished %s after %.1fs", path.name, entry.finished_at - entry.deferred_at)
+
+
+def is_deferred(path: Optional[Path]) -> bool:
+    """True while a file is deferred and not yet fully analyzed."""
+    with _lock:
+        entry = _deferred.get(path) if path is not None else None
+        return entry is not None and entry.finished_at is None
+
+
+def deferred_paths() -> Set[Path]:
+    """The files currently deferred and not yet fully analyzed."""
+    with _lock:
+        return {path for path, entry in _deferred.items() if entry.finished_at is None}
+
+
+def deferred_files() -> List[DeferredFile]:
+    """Every file deferred so far, oldest first."""
+    with _lock:
+        return sorted((replace(entry) for entry in _deferred.values()), key=lambda e: e.deferred_at)
@@ -0,0 +1,284 @@
+"""
+Persistent session metadata cache for SessionForge (Linux).
+Stores the TranscriptStats parsed from session .jsonl files in
+~/.config/claude-menu/session-cache.sqlite, keyed by (path, size, mtime_ns),
+so unchanged transcripts are never opened again.
+
+Also holds the Codex thread sync state: the newest thread updated_at seen
+and the session fields derived from each thread, so only threads changed
+since the last sync are read again.
+"""
+
+import os
+import json
+import sqlite3
+import atexit
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Iterable
+
+from .config import get_session_cache_path, log_debug, log_error
+from .transcript import TranscriptStats
+from . import jsonbackend, perf
+
+
+# Bump when the table layout or the meaning of a stored field changes.
+# A mismatched cache file is dropped and rebuilt on open.
+SCHEMA_VERSION = 4
+
+
+class SessionCache:
+    """
+    SQLite-backed cache of per-file TranscriptStats.
+
+    An entry is only valid while the file's st_size and st_mtime_ns match
+    the stored values; any change invalidates it.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else get_session_cache_path()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the cache database, creating or rebuilding it as needed."""
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != SCHEMA_VERSION:
+                log_debug("Session cache: schema v%s != v%s, rebuilding", version, SCHEMA_VERSION)
+                for table in ('files', 'codex_sync', 'codex_threads'):
+                    conn.execute(f'DROP TABLE IF EXISTS {table}')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    stats TEXT NOT NULL
+                )
+            ''')
+            # watermark is untyped: Codex stores updated_at as epoch integers or ISO strings
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS codex_sync (
+                    db_path TEXT PRIMARY KEY,
+                    watermark
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS codex_threads (
+                    db_path TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (db_path, id)
+                )
+            ''')
+            conn.commit()
+            self._conn = conn
+            log_debug("Session cache: opened %s", self.db_path)
+        except sqlite3.Error as e:
+            # A broken cache must never break discovery - just run uncached
+            log_error("Session cache: disabled, could not open %s: %s", self.db_path, e)
+            self._disabled = True
+            self._conn = None
+        return self._conn
+
+    def lookup(self, path: Path, st: os.stat_result) -> Optional[TranscriptStats]:
+        """Return cached stats for a file if its size and mtime are unchanged."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT size, mtime_ns, stats FROM files WHERE path = ?', (str(path),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                log_error("Session cache: lookup failed for %s: %s", path, e)
+                return None
+
+        if row is None:
+            perf.count('cache.miss')
+            return None
+        if row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            perf.count('cache.miss')
+            perf.count('cache.stale')  # Entry is replaced once the file is parsed again
+            return None
+        stats = self._decode(path, row[2])
+        if stats is None:
+            perf.count('cache.miss')
+            perf.count('cache.corrupt')
+            return None
+        perf.count('cache.hit')
+        return stats
+
+    def lookup_stale(self, path: Path) -> Optional[TranscriptStats]:
+        """
+        Return the last stats stored for a file even if it has changed since.
+        Used to resume parsing from the previously parsed offset.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT stats FROM files WHERE path = ?', (str(path),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                log_error("Session cache: lookup failed for %s: %s", path, e)
+                return None
+        return self._decode(path, row[0]) if row else None
+
+    def _decode(self, path: Path, data: str) -> Optional[TranscriptStats]:
+        """Deserialize a stored stats blob, treating corrupt rows as missing."""
+        try:
+            return TranscriptStats.from_json(data)
+        except (ValueError, TypeError) as e:
+            log_error("Session cache: corrupt entry for %s: %s", path, e)
+            return None
+
+    def store(self, path: Path, st: os.stat_result, stats: TranscriptStats):
+        """Store the stats parsed from a file, replacing any older entry."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO files (path, size, mtime_ns, stats) VALUES (?, ?, ?, ?)',
+                    (str(path), st.st_size, st.st_mtime_ns, stats.to_json())
+                )
+                self._dirty = True
+            except sqlite3.Error as e:
+                log_error("Session cache: store failed for %s: %s", path, e)
+
+    def codex_state(self, db_path: Path) -> Optional[Tuple[Any, Dict[str, Dict[str, Any]]]]:
+        """
+        Return (watermark, thread id -> cached thread data) from the last
+        sync of a Codex database, or None if it must be synced in full.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT watermark FROM codex_sync WHERE db_path = ?', (str(db_path),)
+                ).fetchone()
+                if row is None or row[0] is None:
+                    return None
+                rows = conn.execute(
+                    'SELECT id, data FROM codex_threads WHERE db_path = ?', (str(db_path),)
+                ).fetchall()
+            except sqlite3.Error as e:
+                log_error("Session cache: Codex state lookup failed: %s", e)
+                return None
+
+        threads = {}
+        for thread_id, data in rows:
+            try:
+                threads[thread_id] = jsonbackend.loads(data)
+            except ValueError as e:
+                # One bad row poisons the whole state; resync from scratch
+                log_error("Session cache: corrupt Codex thread %s: %s", thread_id, e)
+                return None
+        return row[0], threads
+
+    def store_codex_state(self, db_path: Path, watermark: Any,
+                          changed: Dict[str, Dict[str, Any]], removed: Iterable[str],
+                          full: bool = False):
+        """
+        Record a Codex sync: upsert changed threads, drop removed ones and
+        advance the watermark. A full sync replaces all state, including
+        that of older Codex databases.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                if full:
+                    conn.execute('DELETE FROM codex_threads')
+                    conn.execute('DELETE FROM codex_sync')
+                conn.executemany(
+                    'DELETE FROM codex_threads WHERE db_path = ? AND id = ?',
+                    [(str(db_path), thread_id) for thread_id in removed]
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO codex_threads (db_path, id, data) VALUES (?, ?, ?)',
+                    [(str(db_path), thread_id, json.dumps(data, separators=(',', ':')))
+                     for thread_id, data in changed.items()]
+                )
+                conn.execute(
+                    'INSERT OR REPLACE INTO codex_sync (db_path, watermark) VALUES (?, ?)',
+                    (str(db_path), watermark)
+                )
+                conn.commit()
+                self._dirty = False
+            except sqlite3.Error as e:
+                log_error("Session cache: Codex state store failed: %s", e)
+
+    def flush(self):
+        """Commit pending writes to disk."""
+        with self._lock:
+            if self._conn is None or not self._dirty:
+                return
+            try:
+                self._conn.commit()
+                self._dirty = False
+            except sqlite3.Error as e:
+                log_error("Session cache: commit failed: %s", e)
+
+    def clear(self):
+        """Delete every cached entry, including the Codex sync state."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                for table in ('files', 'codex_sync', 'codex_threads'):
+                    conn.execute(f'DELETE FROM {table}')
+                conn.commit()
+                self._dirty = False
+            except sqlite3.Error as e:
+                log_error("Session cache: clear failed: %s", e)
+
+    def entry_count(self) -> int:
+        """Number of files with a cache entry."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            try:
+                return conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+            except sqlite3.Error:
+                return 0
+
+    def close(self):
+        """Flush and close the database."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Singleton instance
+_session_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> SessionCache:
+    """Get the singleton SessionCache instance."""
+    global _session_cache
+    if _session_cache is None:
+        _session_cache = SessionCache()
+        atexit.register(_session_cache.close)
+    return _session_cache
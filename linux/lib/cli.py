@@ -0,0 +1,277 @@
+"""
+Headless subcommands for SessionForge (Linux).
+'sf list', 'sf show' and 'sf cost' print session data for scripts,
+dashboards and cron jobs without starting the curses menu. Rows are
+written as soon as discovery yields them, as NDJSON, TSV or CSV.
+'sf stats' prints the performance counters of a discovery run.
+"""
+
+import re
+import csv
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import List, Dict, Any, Iterator, Optional
+
+from .config import log_debug
+from .session import (
+    Session, iter_sessions, enrich_session, get_session_by_id, session_to_dict, session_from_dict,
+)
+from .daemon import fetch_sessions, query_daemon, DaemonError
+from . import perf
+
+
+# Fields printed when --fields isn't given
+DEFAULT_FIELDS = ['session_id', 'source', 'name', 'project_path', 'modified', 'model', 'cost',
+                  'message_count', 'git_branch']
+
+# Computed fields available besides the Session attributes
+_EXTRA_FIELDS = {
+    'name': lambda s: s.display_name,
+    'short_id': lambda s: s.short_id,
+}
+
+FORMATS = ('ndjson', 'tsv', 'csv')
+
+_RELATIVE_SINCE = re.compile(r'^(\d+)([mhdw])$')
+_RELATIVE_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def add_cli_subcommands(subparsers):
+    """Register the list/show/cost subcommands on the main argument parser."""
+    list_parser = subparsers.add_parser('list', help='Print sessions (streamed as they are discovered)')
+    _add_filter_arguments(list_parser)
+    _add_output_arguments(list_parser)
+    list_parser.add_argument('--limit', type=int, help='Stop after this many sessions')
+    list_parser.add_argument('--no-enrich', action='store_true',
+                             help='Skip the model/cost/git branch lookups for every session '
+                                  '(only what discovery already knows is printed)')
+
+    show_parser = subparsers.add_parser('show', help='Print one session')
+    show_parser.add_argument('session_id', help='Session id or unique id prefix')
+    show_parser.add_argument('--format', choices=('json',) + FORMATS, default='json',
+                             help='Output format (default: indented json of every field)')
+    show_parser.add_argument('--fields', help='Comma-separated fields to print')
+
+    cost_parser = subparsers.add_parser('cost', help='Print cost totals')
+    _add_filter_arguments(cost_parser)
+    cost_parser.add_argument('--by', choices=('source', 'model', 'project', 'session'), default='source',
+                             help='Group totals by (default: source)')
+    cost_parser.add_argument('--format', choices=FORMATS, default='tsv', help='Output format (default: tsv)')
+
+    stats_parser = subparsers.add_parser(
+        'stats', help="Print performance counters (the daemon's if running, else of a fresh discovery)"
+    )
+    stats_parser.add_argument('--json', action='store_true', help='Print JSON instead of a report')
+    stats_parser.add_argument('--top', type=int, default=perf.DEFAULT_TOP,
+                              help=f'Rows in the slowest/largest lists (default: {perf.DEFAULT_TOP})')
+    stats_parser.add_argument('--local', action='store_true',
+                              help='Measure a discovery in this process even if the daemon is running')
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--since', type=parse_since,
+                        help='Only sessions modified since: ISO date/time or relative (30m, 12h, 7d, 2w)')
+    parser.add_argument('--source', choices=('claude', 'codex'), help='Only this source')
+    parser.add_argument('--project', help='Only projects whose path starts with this')
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--format', choices=FORMATS, default='ndjson', help='Output format (default: ndjson)')
+    parser.add_argument('--fields', help=f"Comma-separated fields (default: {','.join(DEFAULT_FIELDS)})")
+
+
+def parse_since(value: str) -> datetime:
+    """Parse --since: '7d'-style relative times or an ISO date/time (local time)."""
+    match = _RELATIVE_SINCE.match(value.strip())
+    if match:
+        amount, unit = match.groups()
+        return datetime.now() - timedelta(**{_RELATIVE_UNITS[unit]: int(amount)})
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time '{value}' (use e.g. 2025-01-31, 12h or 7d)")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def run_cli(args: argparse.Namespace) -> int:
+    """Dispatch a parsed list/show/cost command. Returns the exit code."""
+    try:
+        if args.command == 'list':
+            return _cmd_list(args)
+        if args.command == 'show':
+            return _cmd_show(args)
+        if args.command == 'stats':
+            return _cmd_stats(args)
+        return _cmd_cost(args)
+    except BrokenPipeError:
+        # Reader went away (e.g. '| head'); don't complain at interpreter exit either
+        sys.stdout = open('/dev/null', 'w')
+        return 0
+
+
+def _parse_fields(spec: Optional[str]) -> Optional[List[str]]:
+    """Validate --fields, printing an error and returning None if unknown."""
+    if not spec:
+        return list(DEFAULT_FIELDS)
+    names = [name.strip() for name in spec.split(',') if name.strip()]
+    known = set(_EXTRA_FIELDS) | set(_session_fields())
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        print(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(sorted(known))}", file=sys.stderr)
+        return None
+    return names
+
+
+def _session_fields() -> List[str]:
+    """Public Session field names (private '_' fields excluded)."""
+    return [name for name in Session.__dataclass_fields__ if not name.startswith('_')]
+
+
+def _iter_matching(args: argparse.Namespace, enrich: bool) -> Iterator[Session]:
+    """Sessions matching the filters: from the daemon if running, else streamed from discovery."""
+    sessions = fetch_sessions(source=args.source, project_prefix=args.project, modified_since=args.since)
+    if sessions is not None:
+        yield from sessions
+        return
+    for session in iter_sessions(source=args.source, project_prefix=args.project, modified_since=args.since):
+        if enrich:
+            enrich_session(session)
+        yield session
+
+
+def _cmd_list(args: argparse.Namespace) -> int:
+    names = _parse_fields(args.fields)
+    if names is None:
+        return 2
+    writer = _RowWriter(args.format, names)
+    if args.limit is not None and args.limit <= 0:
+        return 0  # Header only; nothing to discover
+    count = 0
+    sessions = _iter_matching(args, enrich=not args.no_enrich)
+    try:
+        for session in sessions:
+            writer.write(_row(session, names))
+            count += 1
+            if count == args.limit:
+                break  # Before the generator parses and enriches another session
+    finally:
+        sessions.close()  # Lets discovery flush the cache when stopped early
+    log_debug("CLI list: %d session(s)", count)
+    return 0
+
+
+def _cmd_show(args: argparse.Namespace) -> int:
+    session = None
+    try:
+        data = query_daemon('session', id=args.session_id)
+        if data is not None:
+            session = session_from_dict(data)
+    except (OSError, ValueError, DaemonError):
+        session = get_session_by_id(args.session_id)
+        if session is not None:
+            enrich_session(session)
+    if session is None:
+        print(f"No session matches '{args.session_id}' (or the prefix is ambiguous)", file=sys.stderr)
+        return 1
+
+    if args.format == 'json':
+        names = _parse_fields(args.fields) if args.fields else ['name', 'short_id'] + _session_fields()
+        if names is None:
+            return 2
+        print(json.dumps(_row(session, names), indent=2, ensure_ascii=False))
+        return 0
+    names = _parse_fields(args.fields)
+    if names is None:
+        return 2
+    _RowWriter(args.format, names).write(_row(session, names))
+    return 0
+
+
+def _cmd_cost(args: argparse.Namespace) -> int:
+    group_key = {
+        'source': lambda s: s.source,
+        'model': lambda s: s.model or 'unknown',
+        'project': lambda s: s.project_path,
+        'session': lambda s: s.session_id,
+    }[args.by]
+    costs: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for session in _iter_matching(args, enrich=True):
+        group = group_key(session)
+        costs[group] += session.cost
+        counts[group] += 1
+
+    writer = _RowWriter(args.format, [args.by, 'sessions', 'cost'])
+    for group in sorted(costs, key=lambda g: costs[g], reverse=True):
+        writer.write({args.by: group, 'sessions': counts[group], 'cost': round(costs[group], 6)})
+    writer.write({args.by: 'TOTAL', 'sessions': sum(counts.values()), 'cost': round(sum(costs.values()), 6)})
+    return 0
+
+
+def _cmd_stats(args: argparse.Namespace) -> int:
+    stats = None
+    if not args.local:
+        try:
+            stats = query_daemon('stats', top=args.top)
+        except (OSError, ValueError, DaemonError) as e:
+            log_debug("CLI stats: no daemon (%s), measuring in-process", e)
+    if stats is None:
+        for session in iter_sessions():
+            enrich_session(session)
+        stats = perf.get_stats(top=args.top)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print('\n'.join(perf.format_stats(stats)))
+    return 0
+
+
+def _row(session: Session, names: List[str]) -> Dict[str, Any]:
+    """The requested fields of a session as JSON-compatible values."""
+    data = session_to_dict(session)
+    row = {}
+    for name in names:
+        getter = _EXTRA_FIELDS.get(name)
+        value = getter(session) if getter else data[name]
+        if isinstance(value, float):
+            value = round(value, 6)
+        row[name] = value
+    return row
+
+
+class _RowWriter:
+    """Writes rows to stdout as NDJSON, TSV or CSV, flushing each one."""
+
+    def __init__(self, fmt: str, names: List[str]):
+        self.fmt = fmt
+        self.names = names
+        self._csv = csv.writer(sys.stdout, lineterminator='\n') if fmt == 'csv' else None
+        if fmt == 'tsv':
+            sys.stdout.write('\t'.join(names) + '\n')
+        elif fmt == 'csv':
+            self._csv.writerow(names)
+
+    def write(self, row: Dict[str, Any]):
+        if self.fmt == 'ndjson':
+            sys.stdout.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+        elif self.fmt == 'tsv':
+            sys.stdout.write('\t'.join(_cell(row[name]).replace('\t', ' ').replace('\n', ' ')
+                                       for name in self.names) + '\n')
+        else:
+            self._csv.writerow([_cell(row[name]) for name in self.names])
+        sys.stdout.flush()
+
+
+def _cell(value: Any) -> str:
+    """Text of a TSV/CSV cell (empty for None, lowercase booleans like JSON)."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
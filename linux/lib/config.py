@@ -6,16 +6,35 @@ Handles reading/writing config from ~/.config/claude-menu/config.yaml
 import os
 import sys
 import json
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
+import functools
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field, asdict
 
 
 # Global logger
 _logger: Optional[logging.Logger] = None
 
+# Rotate debug.log at this size, keeping this many old files (debug.log.1 ...)
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Per call site, log_debug() allows bursts of LOG_BURST messages and then
+# LOG_RATE_PER_SECOND; the rest are counted and reported as suppressed
+LOG_BURST = 200
+LOG_RATE_PER_SECOND = 20.0
+
+# Set by setup_logging(); log_debug() returns before doing anything when False
+_debug_enabled = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
 
 def get_logger() -> logging.Logger:
     """Get or create the debug logger."""
@@ -31,54 +50,321 @@ def get_logger() -> logging.Logger:
 
 
 def setup_logging(debug: bool = False):
-    """Configure logging based on debug setting."""
+    """
+    Configure logging based on debug setting.
+
+    With debug on, records go through a queue to a background thread that
+    writes them to a size-rotated debug.log and to stderr, so logging never
+    blocks discovery on disk I/O.
+    """
+    global _debug_enabled, _listener
     logger = get_logger()
 
+    # Report suppressed messages and flush the queue while it is still attached
+    _stop_log_listener()
     # Remove existing handlers
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    _debug_enabled = debug
 
     if debug:
-        # Create log directory
-        log_dir = Path.home() / '.config' / 'claude-menu' / 'logs'
-        log_dir.mkdir(parents=True, exist_ok=True)
-
-        # File handler with timestamp
-        log_file = log_dir / 'debug.log'
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        ))
-        logger.addHandler(file_handler)
-
-        # Also add console handler for immediate feedback
-        console_handler = logging.StreamHandler(sys.stderr)
-        console_handler.setLevel(logging.DEBUG)
-        console_handler.setFormatter(logging.Formatter('[DEBUG] %(message)s'))
-        logger.addHandler(console_handler)
+        log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *_debug_handlers(rotate=True))
+        _listener.start()
 
         logger.info("="*60)
-        logger.info(f"Debug logging started at {datetime.now()}")
+        logger.info("Debug logging started at %s", datetime.now())
         logger.info("="*60)
     else:
         logger.addHandler(logging.NullHandler())
 
 
-def log_debug(message: str):
-    """Log a debug message."""
-    get_logger().debug(message)
+def _debug_handlers(rotate: bool) -> List[logging.Handler]:
+    """
+    Handlers writing to debug.log (with a timestamp) and to stderr (for
+    immediate feedback). Only the menu rotates debug.log; pool workers
+    append to it directly so they never rotate it under the menu.
+    """
+    log_file = get_debug_log_path()
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    if rotate:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, mode='a', maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(logging.DEBUG)
+    console_handler.setFormatter(logging.Formatter('[DEBUG] %(message)s'))
+    return [file_handler, console_handler]
+
+
+def _stop_log_listener():
+    """Write out queued records and close the log files."""
+    global _listener
+    if _listener is None:
+        return
+    _report_suppressed()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(_stop_log_listener)
 
 
-def log_info(message: str):
+def debug_logging_enabled() -> bool:
+    """True when setup_logging() turned debug logging on."""
+    return _debug_enabled
+
+
+def setup_worker_logging(debug: bool):
+    """
+    Logging for a pool worker (a fresh process, not a fork of the menu):
+    with debug on it writes to debug.log and stderr directly, with no queue
+    and no listener thread.
+    """
+    global _debug_enabled
+    _debug_enabled = debug
+    if not debug:
+        return
+    logger = get_logger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    for handler in _debug_handlers(rotate=False):
+        logger.addHandler(handler)
+
+
+class _SiteRateLimiter:
+    """Token bucket per log_debug() call site (code object and line)."""
+
+    def __init__(self, burst: int, rate: float):
+        self.burst = burst
+        self.rate = rate
+        self._lock = threading.Lock()
+        # (code, line) -> [tokens, last refill time, suppressed count]
+        self._sites: Dict[Any, List[float]] = {}
+
+    def allow(self, site: Any) -> int:
+        """
+        -1 if a message from this site should be dropped, otherwise the
+        number of messages dropped since the last one that got through.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._sites.get(site)
+            if bucket is None:
+                self._sites[site] = [self.burst - 1, now, 0]
+                return 0
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return -1
+            bucket[0] -= 1
+            suppressed, bucket[2] = int(bucket[2]), 0
+            return suppressed
+
+    def pop_suppressed(self) -> List[Any]:
+        """(site, count) for every site with messages dropped since its last one."""
+        with self._lock:
+            pending = [(site, int(bucket[2])) for site, bucket in self._sites.items() if bucket[2]]
+            for bucket in self._sites.values():
+                bucket[2] = 0
+        return pending
+
+
+_rate_limiter = _SiteRateLimiter(LOG_BURST, LOG_RATE_PER_SECOND)
+
+
+def _report_suppressed():
+    for (code, line), count in _rate_limiter.pop_suppressed():
+        get_logger().debug("(%d message(s) from %s:%d suppressed by rate limit)",
+                           count, os.path.basename(code.co_filename), line)
+
+
+def log_debug(message: str, *args):
+    """
+    Log a debug message.
+
+    Pass values as %-style args ('log_debug("Parsed %s", name)') in hot paths:
+    they are only formatted when debug logging is on. Each call site is rate
+    limited, so per-entry and per-line messages can't flood the log.
+    """
+    if not _debug_enabled:
+        return
+    caller = sys._getframe(1)
+    suppressed = _rate_limiter.allow((caller.f_code, caller.f_lineno))
+    if suppressed < 0:
+        return
+    logger = get_logger()
+    if suppressed:
+        logger.debug("(%d message(s) from %s:%d suppressed by rate limit)",
+                     suppressed, os.path.basename(caller.f_code.co_filename), caller.f_lineno, stacklevel=2)
+    logger.debug(message, *args, stacklevel=2)
+
+
+def log_info(message: str, *args):
     """Log an info message."""
-    get_logger().info(message)
+    get_logger().info(message, *args, stacklevel=2)
 
 
-def log_error(message: str):
+def log_error(message: str, *args):
     """Log an error message."""
-    get_logger().error(message)
+    get_logger().error(message, *args, stacklevel=2)
+
+
+# Span tracing (--trace FILE). Disabled by default: trace_span() then returns
+# a shared no-op context manager and traced() adds one attribute check.
+
+class _Tracer:
+    """Collects completed spans as Chrome trace events ('X' phase, microseconds)."""
+
+    def __init__(self, path: Optional[Path], origin: Optional[float] = None):
+        self.path = path
+        self.events: List[Dict[str, Any]] = []
+        # perf_counter() is system-wide here, so workers can share the parent's origin
+        self.origin = time.perf_counter() if origin is None else origin
+        self._thread_names: Dict[int, str] = {}
+
+    def now_us(self) -> float:
+        return (time.perf_counter() - self.origin) * 1_000_000
+
+    def add(self, name: str, start_us: float, end_us: float, args: Dict[str, Any]):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        event = {'name': name, 'ph': 'X', 'ts': start_us, 'dur': end_us - start_us,
+                 'pid': os.getpid(), 'tid': tid}
+        if args:
+            event['args'] = args
+        self.events.append(event)  # list.append is atomic, no lock needed
+
+    def write(self):
+        """Write trace.json (loadable in chrome://tracing and ui.perfetto.dev)."""
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                    for tid, name in list(self._thread_names.items())]
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': metadata + self.events, 'displayTimeUnit': 'ms'}, f)
+            print(f"Trace written to {self.path} ({len(self.events)} spans)", file=sys.stderr)
+        except OSError as e:
+            print(f"Could not write trace {self.path}: {e}", file=sys.stderr)
+
+
+class _Span:
+    """An open span; records itself on exit."""
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> '_Span':
+        self.start = _tracer.now_us()
+        return self
+
+    def __exit__(self, *exc_info):
+        tracer = _tracer
+        if tracer is not None:
+            tracer.add(self.name, self.start, tracer.now_us(), self.args)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_tracer: Optional[_Tracer] = None
+
+
+def enable_tracing(path: Path):
+    """Start recording spans; the trace is written to path at exit."""
+    global _tracer
+    _tracer = _Tracer(Path(path))
+    atexit.register(_tracer.write)
+
+
+def enable_worker_tracing(origin: float):
+    """
+    Record spans in a pool worker started fresh, timed from the parent's
+    origin (see trace_origin), for trace_events_since() to hand back.
+    Nothing is written at exit.
+    """
+    global _tracer
+    _tracer = _Tracer(None, origin)
+
+
+def tracing_enabled() -> bool:
+    """True when --trace is active."""
+    return _tracer is not None
+
+
+def trace_origin() -> Optional[float]:
+    """The tracer's time origin (a perf_counter() value), or None if tracing is off."""
+    return _tracer.origin if _tracer is not None else None
+
+
+def trace_span(name: str, **args):
+    """
+    Context manager timing a block as a named span, e.g.
+    'with trace_span("scan_project", project=name):'.
+    Keyword arguments are attached to the span.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of trace_span (span named after the function by default)."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_mark() -> int:
+    """Position in the span list; pass to trace_events_since()."""
+    return len(_tracer.events) if _tracer is not None else 0
+
+
+def trace_events_since(mark: int) -> List[Dict[str, Any]]:
+    """
+    Spans recorded after mark. Used by pool workers (see
+    enable_worker_tracing) to hand their spans back to the parent process.
+    """
+    return _tracer.events[mark:] if _tracer is not None else []
+
+
+def add_trace_events(events: List[Dict[str, Any]]):
+    """Merge spans recorded in another process."""
+    if _tracer is not None and events:
+        _tracer.events.extend(events)
+
 
 # Use JSON instead of YAML to avoid extra dependency
 # YAML would require PyYAML which isn't always installed
@@ -111,6 +397,15 @@ class Config:
     sort_column: int = 0
     sort_descending: bool = True
     columns: Dict[str, bool] = field(default_factory=lambda: DEFAULT_COLUMNS.copy())
+    scan_workers: int = 0  # Transcript parsing processes (0 = one per CPU, 1 = serial)
+    parallel_min_bytes: int = 32 * 1024 * 1024  # Parse serially below this many unparsed bytes
+    split_min_bytes: int = 256 * 1024 * 1024  # Split a file across workers from this many unparsed bytes
+    # Per-file limits while the menu waits; files over them finish in the background (0 = no limit)
+    file_budget_bytes: int = 64 * 1024 * 1024
+    file_budget_lines: int = 250_000
+    file_budget_ms: int = 2000
+    json_backend: str = 'auto'  # 'auto' (orjson, then ujson, then json), or one of those to pin it
+    watch_sessions: bool = True  # Update the menu live from file changes (inotify, or polling)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Config':
@@ -213,7 +508,7 @@ def _get_windows_home() -> Optional[Path]:
             if user_dir.is_dir() and user_dir.name not in skip_dirs:
                 claude_dir = user_dir / '.claude'
                 if claude_dir.exists():
-                    log_debug(f"Found Windows Claude dir: {claude_dir}")
+                    log_debug("Found Windows Claude dir: %s", claude_dir)
                     return user_dir
 
     # Method 2: Try USERPROFILE or USERNAME from Windows env
@@ -269,11 +564,11 @@ def get_claude_projects_path() -> Path:
     # Return first existing path
     for path in candidates:
         if path.exists():
-            log_debug(f"Found Claude projects at: {path}")
+            log_debug("Found Claude projects at: %s", path)
             return path
 
     # Default to Linux path even if it doesn't exist
-    log_debug(f"No Claude projects found, defaulting to: {linux_path}")
+    log_debug("No Claude projects found, defaulting to: %s", linux_path)
     return linux_path
 
 
@@ -328,9 +623,30 @@ def get_background_tracking_path() -> Path:
     """Get the background tracking JSON file path."""
     return get_menu_path() / 'background-tracking.json'
 
+def get_logs_path() -> Path:
+    """Get the directory for logs and profiles."""
+    return get_menu_path() / 'logs'
+
 def get_debug_log_path() -> Path:
     """Get the debug log file path."""
-    return get_menu_path() / 'logs' / 'debug.log'
+    return get_logs_path() / 'debug.log'
+
+def get_session_cache_path() -> Path:
+    """Get the session metadata cache database path."""
+    return get_menu_path() / 'session-cache.sqlite'
+
+
+def get_snapshot_path() -> Path:
+    """Get the path of the session list snapshot painted at startup."""
+    return get_menu_path() / 'session-snapshot.bin'
+
+
+def get_daemon_socket_path() -> Path:
+    """Get the session daemon's Unix socket path (in XDG_RUNTIME_DIR when set)."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / 'sessionforge.sock'
+    return get_menu_path() / 'daemon.sock'
 
 
 # Singleton instance
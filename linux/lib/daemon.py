@@ -0,0 +1,295 @@
+"""
+Session index daemon for SessionForge (Linux).
+'sf daemon' keeps the session index, git branches and costs in memory and
+current through the file watcher, and answers queries over a Unix socket.
+The menu and CLI ask the daemon first and fall back to in-process
+discovery when it isn't running.
+
+Protocol: each message is a 4-byte big-endian length followed by that
+many bytes of UTF-8 JSON. A request is {"op": ..., ...}; a response is
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+"""
+
+import os
+import json
+import time
+import errno
+import signal
+import socket
+import struct
+import threading
+import socketserver
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from typing import Optional, List, Dict, Any
+
+from .config import get_daemon_socket_path, log_debug, log_info, log_error
+from .session import Session, SessionFilter, session_to_dict, session_from_dict
+from . import perf
+
+
+# Frame header: payload length, network byte order
+_HEADER = struct.Struct('!I')
+
+# Refuse frames larger than this (a corrupt or hostile length field)
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+# Clients give up on the daemon after this long and discover in-process
+CLIENT_TIMEOUT_SECONDS = 5.0
+
+
+class DaemonError(Exception):
+    """The daemon answered with an error."""
+
+
+def send_frame(sock: socket.socket, message: Dict[str, Any]):
+    """Send one length-prefixed JSON message."""
+    payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Receive one length-prefixed JSON message, or None if the peer closed."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"frame of {length:,} bytes exceeds limit")
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        raise ConnectionError("connection closed mid-frame")
+    message = json.loads(payload)
+    if not isinstance(message, dict):
+        raise ValueError("frame is not a JSON object")
+    return message
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes (None on a clean EOF before the first byte)."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("connection closed mid-frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def query_daemon(op: str, timeout: float = CLIENT_TIMEOUT_SECONDS, **params) -> Any:
+    """
+    Send one request to the daemon and return its result.
+    Raises OSError if no daemon is reachable and DaemonError if it refused.
+    """
+    path = get_daemon_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        send_frame(sock, dict(params, op=op))
+        response = recv_frame(sock)
+    if response is None:
+        raise ConnectionError("daemon closed the connection")
+    if not response.get('ok'):
+        raise DaemonError(response.get('error', 'unknown error'))
+    return response.get('result')
+
+
+def daemon_available() -> bool:
+    """True if a daemon answers on the socket."""
+    if not get_daemon_socket_path().exists():
+        return False
+    try:
+        return query_daemon('ping', timeout=1.0) == 'pong'
+    except (OSError, ValueError, DaemonError):
+        return False
+
+
+def fetch_sessions(source: Optional[str] = None,
+                   project_prefix: Optional[str] = None,
+                   modified_since: Optional[datetime] = None) -> Optional[List[Session]]:
+    """
+    Sessions (newest first, enriched) from the daemon, filtered like
+    iter_sessions, or None if there is no usable daemon and the caller
+    should discover in-process.
+    """
+    if not get_daemon_socket_path().exists():
+        return None
+    filters = {}
+    if source:
+        filters['source'] = source
+    if project_prefix:
+        filters['project_prefix'] = project_prefix
+    if modified_since:
+        filters['modified_since'] = modified_since.isoformat()
+    try:
+        result = query_daemon('sessions', **filters)
+        sessions = [session_from_dict(data) for data in result]
+    except (OSError, ValueError, TypeError, KeyError, DaemonError) as e:
+        log_debug("Daemon: unavailable (%s), discovering in-process", e)
+        return None
+    log_debug("Daemon: received %d session(s)", len(sessions))
+    return sessions
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Serves requests on one client connection until it closes."""
+
+    def handle(self):
+        daemon: 'SessionDaemon' = self.server.session_daemon
+        while True:
+            try:
+                request = recv_frame(self.request)
+            except (OSError, ValueError) as e:
+                log_debug("Daemon: dropping client: %s", e)
+                return
+            if request is None:
+                return
+            try:
+                response = {'ok': True, 'result': daemon.dispatch(request)}
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            try:
+                send_frame(self.request, response)
+            except OSError:
+                return
+            if request.get('op') == 'stop':
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SessionDaemon:
+    """Owns a LiveSessionIndex and serves it over the daemon socket."""
+
+    def __init__(self, socket_path: Optional[Path] = None):
+        self.socket_path = Path(socket_path) if socket_path else get_daemon_socket_path()
+        self.started = time.time()
+        self.requests = 0
+        self._live = None
+        self._server: Optional[_Server] = None
+
+    def dispatch(self, request: Dict[str, Any]) -> Any:
+        """Answer a single request."""
+        self.requests += 1
+        op = request.get('op')
+        if op == 'ping':
+            return 'pong'
+        if op == 'sessions':
+            since = request.get('modified_since')
+            session_filter = SessionFilter(
+                source=request.get('source'),
+                project_prefix=request.get('project_prefix'),
+                modified_since=datetime.fromisoformat(since) if since else None,
+            )
+            return [session_to_dict(s) for s in self._live.sessions() if session_filter.matches(s)]
+        if op == 'session':
+            session_id = request.get('id') or ''
+            matches = [s for s in self._live.sessions() if s.session_id.startswith(session_id)]
+            return session_to_dict(matches[0]) if session_id and len(matches) == 1 else None
+        if op == 'costs':
+            return _cost_totals(self._live.sessions())
+        if op == 'stats':
+            return perf.get_stats(top=int(request.get('top', perf.DEFAULT_TOP)))
+        if op == 'status':
+            return {
+                'pid': os.getpid(),
+                'uptime': time.time() - self.started,
+                'sessions': len(self._live.sessions()),
+                'requests': self.requests,
+            }
+        if op == 'stop':
+            return 'stopping'
+        raise ValueError(f"unknown op: {op!r}")
+
+    def serve(self) -> int:
+        """Discover, enrich and serve until stopped. Returns an exit code."""
+        from .live import LiveSessionIndex
+        from .session import enrich_sessions
+
+        if daemon_available():
+            print(f"Session daemon already running on {self.socket_path}")
+            return 1
+        self._remove_stale_socket()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        print("Loading sessions...")
+        self._live = LiveSessionIndex().start()
+        sessions = self._live.sessions()
+        enrich_sessions(sessions)
+        log_info("Daemon: %d session(s) loaded", len(sessions))
+
+        old_umask = os.umask(0o077)  # Socket readable by this user only
+        try:
+            self._server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.session_daemon = self
+
+        def _terminate(signum, frame):
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        signal.signal(signal.SIGTERM, _terminate)
+        signal.signal(signal.SIGINT, _terminate)
+
+        print(f"Session daemon listening on {self.socket_path} (pid {os.getpid()})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._remove_stale_socket()
+            self._live.stop()
+            log_info("Daemon: stopped")
+        return 0
+
+    def _remove_stale_socket(self):
+        try:
+            self.socket_path.unlink()
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                log_error("Daemon: could not remove %s: %s", self.socket_path, e)
+
+
+def _cost_totals(sessions: List[Session]) -> Dict[str, Any]:
+    """Total cost overall, per source and per model."""
+    by_source: Dict[str, float] = defaultdict(float)
+    by_model: Dict[str, float] = defaultdict(float)
+    for session in sessions:
+        by_source[session.source] += session.cost
+        by_model[session.model or 'unknown'] += session.cost
+    return {
+        'total': sum(by_source.values()),
+        'by_source': dict(by_source),
+        'by_model': dict(by_model),
+    }
+
+
+def run_daemon_command(action: str) -> int:
+    """Entry point for 'sf daemon [run|status|stop]'."""
+    if action == 'run':
+        return SessionDaemon().serve()
+    try:
+        result = query_daemon(action)
+    except (OSError, ValueError, DaemonError) as e:
+        print(f"Session daemon not running ({e})")
+        return 1
+    if action == 'status':
+        print(f"Session daemon pid {result['pid']}, up {result['uptime']:.0f}s, "
+              f"{result['sessions']} session(s), {result['requests']} request(s)")
+    else:
+        print("Session daemon stopping")
+    return 0
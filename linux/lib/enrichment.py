@@ -0,0 +1,186 @@
+"""
+Background session enrichment for SessionForge (Linux).
+Fills in model, cost and git branch on worker threads while the menu is
+already on screen. Rows in the current viewport are done first, then the
+most recently modified sessions, and last the transcripts that went over
+the per-file budget (lib/budget.py), which are then parsed in full.
+Rows the user scrolls away from are dropped from the queue until they
+come back into view.
+"""
+
+import heapq
+import threading
+from typing import List, Dict, Set, Iterable, Optional
+
+from .config import log_debug, log_error
+from .cache import get_session_cache
+from .session import Session, enrich_session
+from .budget import deferred_paths
+
+
+# Priority bands: rows on screen first, everything else after, and
+# transcripts deferred for going over budget at the very end
+_BAND_VISIBLE = 0
+_BAND_BACKGROUND = 1
+_BAND_DEFERRED = 2
+
+
+class BackgroundEnricher:
+    """
+    Enriches sessions on daemon threads in priority order.
+
+    The menu calls prioritize() with the rows it is showing, polls
+    pop_updated() to learn which rows to repaint, and cancel() when the
+    user launches a session, quits or refreshes.
+    """
+
+    def __init__(self, sessions: List[Session], workers: int = 2):
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Session] = {}
+        self._dropped: Dict[str, Session] = {}  # Scrolled out of view before their turn
+        self._heap: list = []
+        self._visible: Set[str] = set()
+        self._updated: Set[str] = set()
+        self._in_progress: Set[str] = set()
+        self._deferred: Set[str] = set()  # Ids whose transcript went over budget
+        self._cancelled = False
+        self._started = 0  # Worker threads started so far (for their names)
+        self._workers = workers
+        self._running = 0  # Worker threads still taking work
+
+        for session in sessions:
+            if _needs_enrichment(session):
+                self._pending[session.session_id] = session
+        self._rebuild_heap()
+
+    def start(self) -> 'BackgroundEnricher':
+        """Start the worker threads."""
+        with self._cond:
+            if self._pending:
+                log_debug("BackgroundEnricher: %d session(s) to enrich on %s thread(s)",
+                          len(self._pending), self._workers)
+                self._start_workers()
+        return self
+
+    def prioritize(self, session_ids: Iterable[str]):
+        """
+        Move the given (visible) sessions to the front of the queue.
+        Pending work for rows that scrolled out of view is dropped; it is
+        queued again if they come back. Transcripts deferred for going
+        over budget stay queued either way.
+        """
+        visible = set(session_ids)
+        with self._cond:
+            if visible == self._visible or self._cancelled:
+                return
+            for sid in self._visible - visible:
+                if sid in self._pending and sid not in self._deferred:
+                    self._dropped[sid] = self._pending.pop(sid)
+            returned = visible.intersection(self._dropped)
+            for sid in returned:
+                self._pending[sid] = self._dropped.pop(sid)
+            self._visible = visible
+            self._rebuild_heap()
+            if returned and self._running < self._workers:
+                self._start_workers()
+
+    def is_pending(self, session_id: str) -> bool:
+        """True while a session is queued or being enriched."""
+        with self._cond:
+            return session_id in self._pending or session_id in self._in_progress
+
+    @property
+    def pending_count(self) -> int:
+        """Sessions still waiting for enrichment."""
+        with self._cond:
+            return len(self._pending) + len(self._in_progress)
+
+    def pop_updated(self) -> Set[str]:
+        """Return (and clear) ids of sessions enriched since the last call."""
+        with self._cond:
+            updated, self._updated = self._updated, set()
+            return updated
+
+    def cancel(self):
+        """Drop all pending work. Work already in progress finishes in the background."""
+        with self._cond:
+            if not self._cancelled and self._pending:
+                log_debug("BackgroundEnricher: cancelled with %d session(s) pending", len(self._pending))
+            self._cancelled = True
+            self._pending.clear()
+            self._dropped.clear()
+            self._heap = []
+            self._cond.notify_all()
+        get_session_cache().flush()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued work is done. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._in_progress, timeout=timeout
+            )
+
+    def _start_workers(self):
+        """Start worker threads up to the configured count (caller holds the lock)."""
+        while self._running < self._workers:
+            thread = threading.Thread(target=self._worker, name=f'enrich-{self._started}', daemon=True)
+            self._started += 1
+            self._running += 1
+            thread.start()
+
+    def _rebuild_heap(self):
+        """Re-rank pending sessions (caller holds the lock or is __init__)."""
+        deferred = deferred_paths()
+        for sid, session in self._pending.items():
+            if session._session_file in deferred:
+                self._deferred.add(sid)  # Deferred during discovery
+        self._heap = [(self._band(sid), -session.modified.timestamp(), sid)
+                      for sid, session in self._pending.items()]
+        heapq.heapify(self._heap)
+
+    def _band(self, sid: str) -> int:
+        if sid in self._deferred:
+            return _BAND_DEFERRED
+        return _BAND_VISIBLE if sid in self._visible else _BAND_BACKGROUND
+
+    def _next(self) -> Optional[Session]:
+        """Take the highest-priority pending session, or None when finished."""
+        with self._cond:
+            while self._heap:
+                _, _, sid = heapq.heappop(self._heap)
+                session = self._pending.pop(sid, None)
+                if session is not None:
+                    self._in_progress.add(sid)
+                    return session
+            self._running -= 1  # Decided under the lock, so prioritize() knows to start another
+            return None
+
+    def _worker(self):
+        """Worker thread: enrich sessions until the queue is empty or cancelled."""
+        while True:
+            session = self._next()
+            if session is None:
+                break
+            sid = session.session_id
+            done = True
+            try:
+                # Deferred transcripts are finished here without a budget
+                done = enrich_session(session, budgeted=sid not in self._deferred)
+            except Exception as e:
+                log_error("BackgroundEnricher: failed to enrich %.8s: %s", sid, e)
+            with self._cond:
+                self._in_progress.discard(sid)
+                if not done and not self._cancelled:
+                    log_debug("BackgroundEnricher: %.8s is over budget, moved to the back of the queue", sid)
+                    self._deferred.add(sid)
+                    self._pending[sid] = session
+                    heapq.heappush(self._heap, (_BAND_DEFERRED, -session.modified.timestamp(), sid))
+                elif not self._cancelled:
+                    self._updated.add(sid)
+                self._cond.notify_all()
+        get_session_cache().flush()
+
+
+def _needs_enrichment(session: Session) -> bool:
+    """True if any field filled by enrich_session is still missing."""
+    return not session.model or not session.git_branch or session.cost == 0
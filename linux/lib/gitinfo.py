@@ -0,0 +1,155 @@
+"""
+Git branch lookup for SessionForge (Linux).
+Reads .git/HEAD directly instead of spawning 'git rev-parse' for every
+session. Results are cached per repository and invalidated when HEAD
+changes; unusual layouts fall back to the git subprocess.
+"""
+
+import os
+import time
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+from .config import log_debug, traced
+from . import perf
+
+
+# How long a "not a git repository" answer is trusted before re-checking
+NEGATIVE_CACHE_SECONDS = 60.0
+
+_lock = threading.Lock()
+# project path -> HEAD file of its repository (None = not a repository, with the time checked)
+_head_paths: Dict[str, Tuple[Optional[Path], float]] = {}
+# HEAD file -> (HEAD mtime_ns, branch)
+_branches: Dict[Path, Tuple[int, str]] = {}
+
+
+class _ExoticLayout(Exception):
+    """Raised when a repository can't be resolved without git itself."""
+
+
+@traced()
+def get_git_branch(project_path: str) -> str:
+    """Get the current git branch for a project directory ('HEAD' if detached)."""
+    if not project_path or not os.path.isdir(project_path):
+        return ''
+    if os.environ.get('GIT_DIR'):
+        # git would honour GIT_DIR over the directory layout
+        return _git_subprocess_branch(project_path)
+
+    try:
+        head_path = _find_head_path(project_path)
+        if head_path is None:
+            return ''
+        return _read_branch(head_path)
+    except _ExoticLayout as e:
+        log_debug("get_git_branch: %s: %s, using git subprocess", project_path, e)
+        return _git_subprocess_branch(project_path)
+
+
+def clear_git_cache():
+    """Forget all cached repository lookups."""
+    with _lock:
+        _head_paths.clear()
+        _branches.clear()
+
+
+def _find_head_path(project_path: str) -> Optional[Path]:
+    """Locate the HEAD file for the repository containing project_path (cached)."""
+    now = time.monotonic()
+    with _lock:
+        cached = _head_paths.get(project_path)
+    if cached is not None:
+        head_path, checked = cached
+        if head_path is not None and head_path.exists():
+            return head_path
+        if head_path is None and now - checked < NEGATIVE_CACHE_SECONDS:
+            return None
+
+    head_path = _resolve_head_path(Path(project_path))
+    with _lock:
+        _head_paths[project_path] = (head_path, now)
+    return head_path
+
+
+def _resolve_head_path(start: Path) -> Optional[Path]:
+    """Walk up from start to the nearest .git directory or 'gitdir:' file."""
+    directory = start.resolve()
+    while True:
+        dot_git = directory / '.git'
+        if dot_git.is_dir():
+            head = dot_git / 'HEAD'
+            if not head.is_file():
+                raise _ExoticLayout(f"no HEAD in {dot_git}")
+            return head
+        if dot_git.is_file():
+            # Worktrees and submodules: .git is a file pointing at the real git dir
+            try:
+                content = dot_git.read_text(encoding='utf-8').strip()
+            except (OSError, UnicodeDecodeError) as e:
+                raise _ExoticLayout(f"unreadable {dot_git}: {e}")
+            if not content.startswith('gitdir:'):
+                raise _ExoticLayout(f"unrecognized {dot_git}")
+            git_dir = Path(content[len('gitdir:'):].strip())
+            if not git_dir.is_absolute():
+                git_dir = directory / git_dir
+            head = git_dir / 'HEAD'
+            if not head.is_file():
+                raise _ExoticLayout(f"no HEAD in {git_dir}")
+            return head
+        if directory.parent == directory:
+            return None
+        directory = directory.parent
+
+
+def _read_branch(head_path: Path) -> str:
+    """Read the branch from a HEAD file, reusing the cached answer if HEAD is unchanged."""
+    try:
+        mtime_ns = head_path.stat().st_mtime_ns
+    except OSError as e:
+        raise _ExoticLayout(f"cannot stat {head_path}: {e}")
+
+    with _lock:
+        cached = _branches.get(head_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    try:
+        content = head_path.read_text(encoding='utf-8').strip()
+    except (OSError, UnicodeDecodeError) as e:
+        raise _ExoticLayout(f"unreadable {head_path}: {e}")
+
+    if content.startswith('ref:'):
+        ref = content[len('ref:'):].strip()
+        if not ref.startswith('refs/heads/'):
+            raise _ExoticLayout(f"HEAD points outside refs/heads: {ref}")
+        branch = ref[len('refs/heads/'):]
+    elif len(content) in (40, 64) and all(c in '0123456789abcdef' for c in content):
+        branch = 'HEAD'  # Detached, matching 'git rev-parse --abbrev-ref HEAD'
+    else:
+        raise _ExoticLayout(f"unrecognized HEAD content in {head_path}")
+
+    with _lock:
+        _branches[head_path] = (mtime_ns, branch)
+    return branch
+
+
+@traced('git_subprocess')
+def _git_subprocess_branch(project_path: str) -> str:
+    """Ask git itself (slow path for layouts the reader doesn't understand)."""
+    perf.count('subprocess.git')
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
+            cwd=project_path,
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+        pass
+    return ''
@@ -11,8 +11,9 @@ from datetime import datetime
 from typing import Optional, Dict
 from dataclasses import dataclass
 
-from .config import get_session_background_dir
+from .config import get_session_background_dir, traced
 from .registry import get_platform
+from . import perf
 
 
 @dataclass
@@ -32,6 +33,7 @@ class BackgroundInfo:
             self.computer_user = f"{socket.gethostname()}:{os.environ.get('USER', 'user')}"
 
 
+@traced()
 def create_background_image(
     info: BackgroundInfo,
     output_path: Optional[Path] = None
@@ -171,6 +173,7 @@ def _create_with_imagemagick(info: BackgroundInfo, output_path: Path) -> bool:
             str(output_path),
         ]
 
+        perf.count('subprocess.convert')
         result = subprocess.run(
             cmd,
             capture_output=True,
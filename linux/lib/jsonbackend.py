@@ -0,0 +1,102 @@
+"""
+JSON decoding backend for SessionForge (Linux).
+Decodes with orjson or ujson when one is installed (tried in that order)
+and with the standard library's json otherwise. The config option
+'json_backend' can pin one of them.
+
+loads() takes bytes or str under every backend and raises ValueError for
+anything it cannot decode. Input a fast backend rejects is retried with
+the standard library, so a BOM, NaN, or a lone surrogate escape decodes
+exactly as before. What is left differs only on input transcripts never
+hold: ujson accepts raw control characters inside strings, and orjson
+reads integers beyond 64 bits as floats.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .config import log_debug, log_error
+
+
+# In order of preference for 'auto'
+BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def _stdlib_loads(data: Union[bytes, str]) -> Any:
+    if isinstance(data, (bytes, bytearray)):
+        try:
+            # Decoding first skips json's pure-Python encoding detection
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            pass  # A BOM, lone surrogates or invalid UTF-8: let json decide
+    return json.loads(data)
+
+
+def _with_fallback(fast_loads: Callable[[Any], Any]) -> Callable[[Union[bytes, str]], Any]:
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return fast_loads(data)
+        except ValueError:
+            return _stdlib_loads(data)
+    return loads
+
+
+def _import(name: str) -> Optional[Tuple[Callable[[Union[bytes, str]], Any], str]]:
+    """(loads, version) for a backend, or None if it is not installed."""
+    if name == 'json':
+        return _stdlib_loads, ''
+    try:
+        module = __import__(name)
+    except ImportError:
+        return None
+    return _with_fallback(module.loads), getattr(module, '__version__', '')
+
+
+loads: Callable[[Union[bytes, str]], Any] = _stdlib_loads
+_name = 'json'
+_version = ''
+
+
+def set_backend(name: str = 'auto') -> str:
+    """
+    Select the backend: one of BACKENDS, or 'auto' for the first installed.
+    A backend that is unknown or not installed falls back to 'auto'.
+    Returns the name of the backend now in use.
+    """
+    global loads, _name, _version
+    candidates = BACKENDS
+    if name != 'auto':
+        if name in BACKENDS and _import(name) is not None:
+            candidates = (name,)
+        else:
+            log_error("JSON backend '%s' is not available, choosing automatically", name)
+    for candidate in candidates:
+        found = _import(candidate)
+        if found is not None:
+            loads, _version = found
+            _name = candidate
+            break
+    log_debug("JSON backend: %s %s", _name, _version)
+    return _name
+
+
+def backend_name() -> str:
+    """Name of the backend in use ('orjson', 'ujson' or 'json')."""
+    return _name
+
+
+def is_stdlib() -> bool:
+    """True if decoding uses the standard library json module."""
+    return _name == 'json'
+
+
+def describe_backends() -> List[Dict[str, Any]]:
+    """Every known backend with whether it is installed and its version."""
+    result = []
+    for name in BACKENDS:
+        found = _import(name)
+        result.append({'name': name, 'installed': found is not None, 'version': found[1] if found else ''})
+    return result
+
+
+set_backend()
@@ -0,0 +1,609 @@
+"""
+Streaming JSONL key extraction for SessionForge (Linux).
+Reads a .jsonl file in fixed-size chunks and pulls only the requested keys
+out of each line. Values nobody asked for are skipped with bytes.find()
+over the raw bytes and never decoded, so a line holding a multi-megabyte
+tool output costs one chunk of memory rather than the whole line twice
+(once as bytes, once as the decoded string).
+
+Lines shorter than LONG_LINE_BYTES are still decoded whole, by the
+selected JSON backend (see jsonbackend): for them that is several times
+faster than any pure-Python parse, and they are small enough that
+decoding them whole costs nothing worth saving.
+"""
+
+import io
+import os
+import re
+import json
+import json.scanner
+import mmap
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from . import jsonbackend
+
+
+# Bytes read from the file at a time
+CHUNK_BYTES = 256 * 1024
+# Lines at least this long are parsed for the wanted keys only; shorter ones
+# are decoded whole. The targeted parser skips escape-free strings
+# (base64 images) ~20x faster than json.loads decodes them but is 2-3x
+# slower on escape-heavy text, so it only takes over where memory matters.
+LONG_LINE_BYTES = 256 * 1024
+# Files at least this large are read through mmap (see map_file). Touching
+# a mapped page past EOF raises SIGBUS and kills the process, so the file
+# size is checked again (mapped_size) before each new window is read and
+# whenever a scan resumes after a yield; a file truncated or rewritten
+# meanwhile just ends early. A truncation in the moment between that check
+# and reading the window can still crash the process.
+MMAP_MIN_BYTES = 1024 * 1024
+# Scanned mapped pages are handed back to the kernel in steps of this much
+RELEASE_BYTES = 4 * 1024 * 1024
+# Largest value captured whole; longer values of a wanted key are dropped
+CAPTURE_MAX_BYTES = 64 * 1024
+# Raw bytes kept from the start of a prefix-captured string (enough for
+# a few hundred characters even if every one is a \uXXXX surrogate pair)
+PREFIX_BYTES = 2048
+
+# Yielded in place of an entry for a line that is not valid JSON
+INVALID = object()
+
+_SKIPPED = object()
+# json's C scanner, called directly: json.loads adds two regex matches and
+# a few type checks per call, a quarter of the time for a typical line
+_scan_once = json.scanner.make_scanner(json.JSONDecoder())
+_STRUCTURE = re.compile(rb'["{}\[\]\n]')
+_STRING_BODY = re.compile(rb'[^"\\\n]*(?:\\.[^"\\\n]*)*')
+_LITERAL_END = re.compile(rb'[,}\]\s]')
+_WHITESPACE = (0x20, 0x09, 0x0d)  # Newline ends the line, so it is not whitespace here
+
+
+class Field:
+    """
+    How to extract the value of a wanted key.
+
+    obj: key spec applied if the value is an object
+    arr: key spec applied to each object in the value if it is an array
+         (other elements become None)
+    prefix: if the value is a string, keep only its first PREFIX_BYTES
+    other: capture values not covered above whole (up to CAPTURE_MAX_BYTES);
+           if False they are left out as if the key were absent
+    """
+    __slots__ = ('obj', 'arr', 'prefix', 'other')
+
+    def __init__(self, obj: Optional[Dict[str, 'Field']] = None, arr: Optional[Dict[str, 'Field']] = None,
+                 prefix: bool = False, other: bool = True):
+        self.obj = obj
+        self.arr = arr
+        self.prefix = prefix
+        self.other = other
+
+
+# Capture the value whole, whatever its type
+CAPTURE = Field()
+
+Keys = Dict[str, Field]
+
+
+class _Malformed(ValueError):
+    """The line is not valid JSON (or ends before it is complete)."""
+
+
+class _Cursor:
+    """
+    Forward-only window over a file, a mapping of one or a single bytes
+    object; the parser only looks at buf[pos:end].
+
+    Reading from a file, more() appends the next chunk and drops the bytes
+    before pos, unless a capture in progress still needs them (keep). Over
+    a mapping (of f), more() moves end on by a chunk and lets the kernel
+    reclaim the pages left behind, so the process does not keep the whole
+    file resident either; it never moves end past the file's current size.
+
+    stop (a file offset) ends the data early, as if the file ended there.
+    """
+    __slots__ = ('f', 'buf', 'pos', 'end', 'base', 'keep', 'overflow', 'chunk_bytes', 'mapped', 'released',
+                 'stop')
+
+    def __init__(self, buf, f=None, base: int = 0, chunk_bytes: int = CHUNK_BYTES,
+                 mapped: bool = False, pos: int = 0, stop: Optional[int] = None):
+        self.f = f
+        self.buf = buf
+        self.pos = pos
+        if mapped:
+            size = mapped_size(f, buf)
+            self.stop = size if stop is None else min(stop, size)
+            self.end = min(self.stop, pos + chunk_bytes)
+        else:
+            self.stop = stop
+            self.end = len(buf)
+        self.base = base  # File offset of buf[0]
+        self.keep = -1
+        self.overflow = False
+        self.chunk_bytes = chunk_bytes
+        self.mapped = mapped
+        self.released = pos - pos % mmap.PAGESIZE  # Mapped pages before this were given back
+
+    def more(self) -> bool:
+        """Bring the next chunk into the window; False at EOF."""
+        if self.mapped:
+            self.recheck()
+            if self.end >= self.stop:
+                return False
+            self.end = min(self.stop, self.end + self.chunk_bytes)
+            self._release()
+            return True
+        if self.f is None:
+            return False
+        size = self.chunk_bytes
+        if self.stop is not None:
+            size = min(size, self.stop - self.base - len(self.buf))
+        data = self.f.read(size) if size > 0 else b''
+        if not data:
+            self.f = None
+            return False
+        drop = self.pos
+        if self.keep >= 0:
+            if self.pos - self.keep > CAPTURE_MAX_BYTES:
+                self.keep = -1
+                self.overflow = True
+            else:
+                drop = self.keep
+                self.keep = 0
+        if drop:
+            self.buf = self.buf[drop:] + data
+            self.base += drop
+            self.pos -= drop
+        else:
+            self.buf += data
+        self.end = len(self.buf)
+        return True
+
+    def recheck(self):
+        """Over a mapping, end the data at the file's current size (it may have been truncated)."""
+        if self.mapped:
+            self.stop = min(self.stop, mapped_size(self.f, self.buf))
+            self.end = min(self.end, self.stop)
+
+    def _release(self):
+        """Tell the kernel the mapped pages behind the window are done with."""
+        low = self.pos if self.keep < 0 else min(self.pos, self.keep)
+        low -= low % mmap.PAGESIZE
+        if low - self.released < RELEASE_BYTES or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        try:
+            self.buf.madvise(mmap.MADV_DONTNEED, self.released, low - self.released)
+        except (OSError, ValueError):
+            pass
+        self.released = low
+
+    def peek(self) -> int:
+        while self.pos >= self.end:
+            if not self.more():
+                raise _Malformed('unexpected end of data')
+        return self.buf[self.pos]
+
+    def skip_whitespace(self) -> int:
+        """Advance past whitespace and return the next byte."""
+        if self.pos < self.end:
+            c = self.buf[self.pos]
+            if c not in _WHITESPACE:
+                return c
+        c = self.peek()
+        while c in _WHITESPACE:
+            self.pos += 1
+            c = self.peek()
+        return c
+
+    def skip_string(self):
+        """Advance past the string starting at pos."""
+        self.pos += 1
+        while True:
+            buf, pos, end = self.buf, self.pos, self.end
+            quote = buf.find(b'"', pos, end)
+            limit = quote if quote >= 0 else end
+            if buf.find(b'\\', pos, limit) < 0:
+                # No escapes: the first quote (if any) ends the string
+                if buf.find(b'\n', pos, limit) >= 0:
+                    raise _Malformed('newline in string')
+                if quote >= 0:
+                    self.pos = quote + 1
+                    return
+                self.pos = end
+            else:
+                # Escapes: the regex finds the closing quote, a chunk at a
+                # time (re's bookkeeping grows with the escapes it matches)
+                stop = min(end, pos + self.chunk_bytes)
+                done = _STRING_BODY.match(buf, pos, stop).end()
+                if done < stop:
+                    c = buf[done]
+                    if c == 0x22:
+                        self.pos = done + 1
+                        return
+                    if c == 0x0a or done + 1 < stop:  # Newline, or a backslash before one
+                        raise _Malformed('newline in string')
+                # Out of window, possibly halfway through an escape
+                self.pos = done
+                if stop < end:
+                    continue
+            if not self.more():
+                raise _Malformed('unterminated string')
+
+    def skip_container(self):
+        """Advance past the object or array starting at pos."""
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos, self.end)
+            if match is None:
+                self.pos = self.end
+                if not self.more():
+                    raise _Malformed('unterminated container')
+                continue
+            self.pos = match.start()
+            c = self.buf[self.pos]
+            if c == 0x22:
+                self.skip_string()
+                continue
+            if c == 0x0a:
+                raise _Malformed('newline in container')
+            self.pos += 1
+            if c == 0x7b or c == 0x5b:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def skip_value(self):
+        c = self.skip_whitespace()
+        if c == 0x22:
+            self.skip_string()
+        elif c == 0x7b or c == 0x5b:
+            self.skip_container()
+        else:
+            start = self.base + self.pos
+            while True:
+                match = _LITERAL_END.search(self.buf, self.pos, self.end)
+                if match is not None:
+                    self.pos = match.start()
+                    break
+                self.pos = self.end
+                if not self.more():
+                    break
+            if self.base + self.pos == start:
+                raise _Malformed('value expected')
+
+    def capture(self) -> Any:
+        """Decode the value at pos, or return _SKIPPED if it is too long to keep."""
+        self.skip_whitespace()
+        self.keep = self.pos
+        self.overflow = False
+        try:
+            self.skip_value()
+        finally:
+            keep, self.keep = self.keep, -1
+        if self.overflow or self.pos - keep > CAPTURE_MAX_BYTES:
+            return _SKIPPED
+        return jsonbackend.loads(self.buf[keep:self.pos])
+
+    def capture_prefix(self) -> str:
+        """Decode the start of the string at pos and skip the rest of it."""
+        while self.end - self.pos < PREFIX_BYTES and self.more():
+            pass
+        start = self.base + self.pos
+        head = self.buf[self.pos:min(self.end, self.pos + PREFIX_BYTES)]
+        self.skip_string()
+        length = self.base + self.pos - start
+        if length <= len(head):
+            return json.loads(head[:length])
+        # Cut mid-string: drop bytes from the end until what is left decodes
+        # (it may end inside an escape sequence or a UTF-8 character)
+        raw = head[1:]
+        for cut in range(len(raw), max(0, len(raw) - 16), -1):
+            try:
+                return json.loads(b'"' + raw[:cut] + b'"')
+            except ValueError:
+                continue
+        raise _Malformed('undecodable string')
+
+    def key(self) -> Optional[str]:
+        """Decode the object key at pos and the ':' after it (None if the key is absurdly long)."""
+        if self.skip_whitespace() != 0x22:
+            raise _Malformed('key expected')
+        buf, pos = self.buf, self.pos
+        quote = buf.find(b'"', pos + 1, self.end)
+        if quote >= 0 and buf.find(b'\\', pos + 1, quote) < 0:
+            # Plain key, all in the window
+            try:
+                key = buf[pos + 1:quote].decode('utf-8')
+            except UnicodeDecodeError:
+                raise _Malformed('invalid UTF-8') from None
+            if '\n' in key:
+                raise _Malformed('newline in string')
+            self.pos = quote + 1
+        else:
+            key = self.capture()
+        if self.skip_whitespace() != 0x3a:
+            raise _Malformed("':' expected")
+        self.pos += 1
+        return key if isinstance(key, str) else None
+
+    def value(self, want: Field) -> Any:
+        c = self.skip_whitespace()
+        if c == 0x7b and want.obj is not None:
+            return self.object(want.obj)
+        if c == 0x5b and want.arr is not None:
+            return self.array(want.arr)
+        if c == 0x22 and want.prefix:
+            return self.capture_prefix()
+        if want.other:
+            return self.capture()
+        self.skip_value()
+        return _SKIPPED
+
+    def object(self, keys: Keys) -> Dict[str, Any]:
+        """Parse the object at pos, keeping only the given keys."""
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        if self.skip_whitespace() == 0x7d:
+            self.pos += 1
+            return result
+        while True:
+            key = self.key()
+            want = keys.get(key) if key is not None else None
+            if want is None:
+                self.skip_value()
+            else:
+                value = self.value(want)
+                if value is not _SKIPPED:
+                    result[key] = value
+            c = self.skip_whitespace()
+            if c != 0x2c and c != 0x7d:
+                raise _Malformed("',' or '}' expected")
+            self.pos += 1
+            if c == 0x7d:
+                return result
+
+    def array(self, keys: Keys) -> list:
+        """Parse the array at pos, reducing object elements to the given keys."""
+        self.pos += 1
+        result: list = []
+        if self.skip_whitespace() == 0x5d:
+            self.pos += 1
+            return result
+        while True:
+            if self.skip_whitespace() == 0x7b:
+                result.append(self.object(keys))
+            else:
+                self.skip_value()
+                result.append(None)
+            c = self.skip_whitespace()
+            if c != 0x2c and c != 0x5d:
+                raise _Malformed("',' or ']' expected")
+            self.pos += 1
+            if c == 0x5d:
+                return result
+
+    def line(self, keys: Keys) -> Any:
+        """
+        Parse one line starting at pos, stopping at its newline (not consumed).
+        Returns the reduced object, or None for a valid non-object line.
+        """
+        if self.skip_whitespace() == 0x7b:
+            entry = self.object(keys)
+        else:
+            self.capture()  # Still has to be valid JSON
+            entry = None
+        # Only whitespace may follow the value
+        while self.pos < self.end or self.more():
+            c = self.buf[self.pos]
+            if c == 0x0a:
+                break
+            if c not in _WHITESPACE:
+                raise _Malformed('extra data')
+            self.pos += 1
+        return entry
+
+    def skip_line(self) -> bool:
+        """Advance past the next newline; False if EOF came first."""
+        while True:
+            newline = self.buf.find(b'\n', self.pos, self.end)
+            if newline >= 0:
+                self.pos = newline + 1
+                return True
+            self.pos = self.end
+            if not self.more():
+                return False
+
+
+def map_file(f, start: int = 0, sequential: bool = True) -> Optional[mmap.mmap]:
+    """
+    Map an open binary file read-only if it is at least MMAP_MIN_BYTES.
+    Returns None for small files or where mapping is not possible.
+
+    With sequential set, the kernel is told the bytes from start on will be
+    read once, front to back (more read-ahead). Otherwise access is declared
+    random, which suits walking backwards from the end: without it a cold
+    page fault near EOF reads ahead past EOF and is ~10x slower.
+    """
+    try:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_MIN_BYTES:
+            return None
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, AttributeError, io.UnsupportedOperation):
+        return None
+    if not sequential:
+        start = 0
+    # Both are hints only; either may be missing on this platform
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), start, 0,
+                             os.POSIX_FADV_SEQUENTIAL if sequential else os.POSIX_FADV_RANDOM)
+        advice = getattr(mmap, 'MADV_SEQUENTIAL' if sequential else 'MADV_RANDOM', None)
+        if advice is not None and hasattr(mapping, 'madvise'):
+            page = start - start % mmap.PAGESIZE
+            mapping.madvise(advice, page, size - page)
+    except (OSError, ValueError):
+        pass
+    return mapping
+
+
+def mapped_size(f, mapping: mmap.mmap) -> int:
+    """
+    How much of a mapping of f is still backed by the file and safe to read
+    (the file may have been truncated since it was mapped).
+    """
+    try:
+        return min(len(mapping), os.fstat(f.fileno()).st_size)
+    except (OSError, ValueError):
+        return 0
+
+
+def _close_mapping(mapping: mmap.mmap):
+    try:
+        mapping.close()
+    except BufferError:  # A slice is still referenced; the mapping goes when it does
+        pass
+
+
+def extract(line: bytes, keys: Keys) -> Any:
+    """
+    Targeted parse of one line already in memory.
+    Returns the object reduced to the given keys, None for a valid
+    non-object line, or INVALID.
+    """
+    try:
+        return _Cursor(line).line(keys)
+    except ValueError:  # _Malformed, or a captured value that did not decode
+        return INVALID
+
+
+class JsonlScanner:
+    """
+    Scans a binary file from its current position, one line at a time.
+
+    Iterating yields (size, complete, entry) per line: the bytes the line
+    takes up including its newline, whether it ended with a newline (only
+    the last line can be incomplete), and its value. The value is the full
+    decoded object for a short line, the object reduced to keys for a
+    long line, None for a valid line that is not an object, or INVALID.
+
+    Files of MMAP_MIN_BYTES or more are scanned through a read-only mapping
+    (see map_file) instead of read() calls.
+
+    With stop set, scanning ends at that file offset as if it were EOF;
+    to split a file between scanners, stop just after a newline.
+    """
+
+    def __init__(self, f, keys: Keys, long_line_bytes: int = LONG_LINE_BYTES, chunk_bytes: int = CHUNK_BYTES,
+                 stop: Optional[int] = None):
+        self.f = f
+        self.keys = keys
+        self.stop = stop
+        self.long_line_bytes = long_line_bytes
+        self.chunk_bytes = chunk_bytes
+        self.mapped = False
+        self.lines = 0
+        self.loads = 0  # Lines decoded whole by the JSON backend
+        self.extracted = 0  # Long lines parsed for the wanted keys only
+
+    def __iter__(self) -> Iterator[Tuple[int, bool, Any]]:
+        start = self.f.tell()
+        mapping = map_file(self.f, start)
+        self.mapped = mapping is not None
+        if mapping is not None:
+            cursor = _Cursor(mapping, self.f, chunk_bytes=self.chunk_bytes, mapped=True, pos=start, stop=self.stop)
+        else:
+            cursor = _Cursor(b'', self.f, base=start, chunk_bytes=self.chunk_bytes, stop=self.stop)
+        try:
+            yield from self._scan(cursor)
+        finally:
+            if mapping is not None:
+                cursor.buf = b''
+                _close_mapping(mapping)
+
+    def _scan(self, cursor: _Cursor) -> Iterator[Tuple[int, bool, Any]]:
+        chunk_bytes, long_line_bytes = self.chunk_bytes, self.long_line_bytes
+        # orjson and ujson take bytes and decode UTF-8 as they parse, so
+        # decoding the chunk up front only pays off for the json module
+        raw_only = not jsonbackend.is_stdlib()
+        while True:
+            cursor.recheck()  # The file may have changed while we were suspended in a yield
+            buf, pos, end = cursor.buf, cursor.pos, cursor.end
+            # The complete lines in the next chunk, or failing that the one
+            # line starting at pos if it is short
+            last = buf.rfind(b'\n', pos, min(end, pos + chunk_bytes))
+            if last < 0:
+                last = buf.find(b'\n', pos, min(end, pos + long_line_bytes))
+            if last >= 0:
+                cursor.pos = last + 1
+                chunk = buf[pos:last]
+                if raw_only:
+                    for line in chunk.split(b'\n'):
+                        self.lines += 1
+                        yield len(line) + 1, True, self._parse(line)
+                    continue
+                try:
+                    # One decode per chunk beats one per line; newlines never
+                    # occur inside UTF-8 sequences, so both splits line up
+                    text = chunk.decode('utf-8')
+                except UnicodeDecodeError:
+                    for line in chunk.split(b'\n'):
+                        self.lines += 1
+                        yield len(line) + 1, True, self._parse(line)
+                    continue
+                raw_lines = chunk.split(b'\n')
+                for raw, line in zip(raw_lines, text.split('\n')):
+                    self.lines += 1
+                    yield len(raw) + 1, True, self._parse_text(line, raw)
+                continue
+            if end - pos < long_line_bytes:
+                if cursor.more():
+                    continue
+                if pos < end:  # Last line, without a newline
+                    cursor.pos = end
+                    self.lines += 1
+                    yield end - pos, False, self._parse(buf[pos:end])
+                return
+
+            # Long line: parse it in place (from the mapping, or from the
+            # chunks as they are read)
+            start = cursor.base + cursor.pos
+            self.lines += 1
+            self.extracted += 1
+            try:
+                entry = cursor.line(self.keys)
+            except ValueError:
+                entry = INVALID
+            complete = cursor.skip_line()
+            yield cursor.base + cursor.pos - start, complete, entry
+            if not complete:
+                return
+
+    def _parse_text(self, line: str, raw: bytes) -> Any:
+        if len(raw) >= self.long_line_bytes:
+            self.extracted += 1
+            return extract(raw, self.keys)
+        self.loads += 1
+        try:
+            value, end = _scan_once(line, 0)
+            if end == len(line):
+                return value
+        except (ValueError, StopIteration):
+            pass
+        try:
+            # Surrounding whitespace, a BOM, lone surrogates: let json decide
+            return json.loads(raw)
+        except ValueError:
+            return INVALID
+
+    def _parse(self, line: bytes) -> Any:
+        if len(line) >= self.long_line_bytes:
+            self.extracted += 1
+            return extract(line, self.keys)
+        self.loads += 1
+        try:
+            return jsonbackend.loads(line)
+        except ValueError:  # Any backend's decode error, or invalid UTF-8
+            return INVALID
@@ -0,0 +1,240 @@
+"""
+Live session index for SessionForge (Linux).
+Keeps the discovered sessions current while the menu runs: a file watcher
+reports changed transcripts, indexes and Codex databases, and only those
+are analyzed again. The menu applies the resulting changes in place, so a
+refresh no longer needs a full discovery.
+
+The index can also start from a saved snapshot and revalidate it against
+a full discovery in the background (stale-while-revalidate).
+"""
+
+import threading
+from pathlib import Path
+from typing import List, Dict, Set, Tuple, Optional, Iterable
+
+from .config import get_claude_projects_path, log_debug, log_error
+from .session import (
+    Session, get_all_sessions, get_all_codex_sessions, scan_project_dir,
+    load_session_file, enrich_session,
+)
+from .watcher import create_watcher
+
+
+# How long the watcher thread blocks before checking for stop()
+_WAIT_SECONDS = 1.0
+
+
+class LiveSessionIndex:
+    """
+    The current set of sessions, updated from file change events.
+
+    sessions() returns the current list (newest first); pop_changes() returns
+    the sessions added or changed, and the ids removed, since the last call.
+    With watch=False only explicit revalidate() calls update the index.
+    """
+
+    def __init__(self, watch: bool = True):
+        self.watch = watch
+        self.projects_path = get_claude_projects_path()
+        self.codex_path = Path.home() / '.codex'
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+        # Project directory -> its sessions-index.json entries by id
+        self._index_entries: Dict[Path, Dict[str, Session]] = {}
+        self._upserted: Dict[str, Session] = {}
+        self._removed: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher = None
+        self._revalidating = threading.Event()
+
+    def start(self, seed: Optional[List[Session]] = None) -> 'LiveSessionIndex':
+        """
+        Load the sessions and start watching for changes.
+
+        Without a seed this runs a full discovery first. With a seed (a
+        snapshot from a previous run) the index is usable immediately and
+        the discovery runs in the background; its differences arrive through
+        pop_changes() like any other change.
+        """
+        # Watch before discovering so nothing written in between is missed
+        if self.watch:
+            try:
+                self._watcher = create_watcher(self.projects_path, self.codex_path)
+            except Exception as e:
+                log_error("LiveSessionIndex: no file watcher, sessions will not update live: %s", e)
+
+        if seed is None:
+            sessions = get_all_sessions()
+        else:
+            sessions = seed
+            self._revalidating.set()
+        with self._lock:
+            self._sessions = {s.session_id: s for s in sessions}
+
+        if self._watcher is not None:
+            self._thread = threading.Thread(target=self._run, name='session-watcher', daemon=True)
+            self._thread.start()
+        elif seed is not None:
+            threading.Thread(target=self._revalidate, name='session-revalidate', daemon=True).start()
+        return self
+
+    def revalidate(self):
+        """Rediscover everything in the background (for a manual refresh without watching)."""
+        if self._revalidating.is_set():
+            return
+        self._revalidating.set()
+        if self._watcher is None:
+            threading.Thread(target=self._revalidate, name='session-revalidate', daemon=True).start()
+        # Otherwise the watcher thread picks it up within _WAIT_SECONDS
+
+    @property
+    def revalidating(self) -> bool:
+        """True while a background rediscovery is running."""
+        return self._revalidating.is_set()
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=_WAIT_SECONDS * 2)
+        if self._watcher is not None:
+            self._watcher.close()
+
+    def sessions(self, consume_changes: bool = True) -> List[Session]:
+        """
+        All current sessions, newest first. Pending changes are included,
+        and cleared unless consume_changes is False.
+        """
+        with self._lock:
+            if consume_changes:
+                self._upserted.clear()
+                self._removed.clear()
+            sessions = list(self._sessions.values())
+        sessions.sort(key=lambda s: (s.modified, s.session_id), reverse=True)
+        return sessions
+
+    def pop_changes(self) -> Tuple[List[Session], Set[str]]:
+        """Sessions added or changed, and ids removed, since the last call."""
+        with self._lock:
+            upserted, self._upserted = list(self._upserted.values()), {}
+            removed, self._removed = self._removed, set()
+        return upserted, removed
+
+    def _run(self):
+        """Watcher thread: revalidate when asked, and apply each batch of file changes."""
+        while not self._stop.is_set():
+            if self._revalidating.is_set():
+                self._revalidate()
+            try:
+                changed, rescan = self._watcher.wait(_WAIT_SECONDS)
+                if rescan:
+                    self._resync_all()
+                elif changed:
+                    self._apply(changed)
+            except Exception as e:
+                log_error("LiveSessionIndex: update failed: %s", e)
+                self._stop.wait(_WAIT_SECONDS)
+
+    def _revalidate(self):
+        """Run a requested full rediscovery and clear the flag."""
+        try:
+            self._resync_all()
+        except Exception as e:
+            log_error("LiveSessionIndex: revalidation failed: %s", e)
+        finally:
+            self._revalidating.clear()
+
+    def _apply(self, changed: Set[Path]):
+        """Re-analyze only what the changed paths affect."""
+        projects: Set[Path] = set()
+        files: List[Path] = []
+        codex = False
+        for path in changed:
+            if path.parent == self.codex_path:
+                codex = codex or path.name.startswith('state_')
+            elif path.parent == self.projects_path:
+                projects.add(path)  # Project directory created or removed
+            elif path.parent.parent == self.projects_path:
+                if path.name == 'sessions-index.json':
+                    projects.add(path.parent)
+                elif path.suffix == '.jsonl':
+                    files.append(path)
+
+        for project_dir in sorted(projects):
+            self._rescan_project(project_dir)
+        for path in sorted(files):
+            if path.parent not in projects:
+                self._reload_file(path)
+        if codex:
+            self._reload_codex()
+
+    def _rescan_project(self, project_dir: Path):
+        """Replace every session of one project directory."""
+        if project_dir.is_dir():
+            sessions, index_entries = scan_project_dir(project_dir)
+        else:
+            sessions, index_entries = [], {}
+        log_debug("LiveSessionIndex: rescanned %s, %d session(s)", project_dir.name, len(sessions))
+        self._index_entries[project_dir] = index_entries
+        old_ids = {sid for sid, s in self._snapshot_items()
+                   if s.source == 'claude' and s._session_file is not None
+                   and s._session_file.parent == project_dir}
+        self._publish(sessions, old_ids - {s.session_id for s in sessions})
+
+    def _reload_file(self, path: Path):
+        """Re-analyze one transcript (appended, created or deleted)."""
+        index_entries = self._index_entries.get(path.parent)
+        if index_entries is None:
+            self._rescan_project(path.parent)
+            return
+        session = load_session_file(path, index_entries.get(path.stem))
+        if session is None:
+            log_debug("LiveSessionIndex: %.8s deleted", path.stem)
+            self._publish([], {path.stem})
+        else:
+            self._publish([session], set())
+
+    def _reload_codex(self):
+        """Sync Codex threads (incremental, see get_all_codex_sessions)."""
+        sessions = get_all_codex_sessions()
+        old_ids = {sid for sid, s in self._snapshot_items() if s.source == 'codex'}
+        self._publish(sessions, old_ids - {s.session_id for s in sessions})
+
+    def _resync_all(self):
+        """Full discovery (revalidation, or after lost events)."""
+        sessions = get_all_sessions()
+        self._index_entries.clear()
+        old_ids = {sid for sid, _ in self._snapshot_items()}
+        self._publish(sessions, old_ids - {s.session_id for s in sessions})
+
+    def _snapshot_items(self) -> List[Tuple[str, Session]]:
+        with self._lock:
+            return list(self._sessions.items())
+
+    def _publish(self, sessions: Iterable[Session], removed: Set[str]):
+        """Enrich new or changed sessions and record them for the menu."""
+        changed = []
+        for session in sessions:
+            with self._lock:
+                current = self._sessions.get(session.session_id)
+            if current is session:
+                continue
+            enrich_session(session)
+            if current is not None and current == session:
+                continue
+            changed.append(session)
+
+        if not changed and not removed:
+            return
+        log_debug("LiveSessionIndex: %d changed, %d removed", len(changed), len(removed))
+        with self._lock:
+            for session in changed:
+                self._sessions[session.session_id] = session
+                self._upserted[session.session_id] = session
+                self._removed.discard(session.session_id)
+            for session_id in removed:
+                if self._sessions.pop(session_id, None) is not None:
+                    self._removed.add(session_id)
+                    self._upserted.pop(session_id, None)
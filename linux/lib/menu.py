@@ -4,14 +4,22 @@ Provides arrow-key navigation and session management interface.
 """
 
 import curses
-from typing import List, Optional, Callable, Tuple, Dict
+from typing import List, Optional, Callable, Tuple, Dict, Set, Union, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum, auto
 
 from .session import Session
+from .table import SessionTable
 from .config import get_config, DEFAULT_COLUMNS
 from .registry import get_platform
 
+if TYPE_CHECKING:
+    from .enrichment import BackgroundEnricher
+    from .live import LiveSessionIndex
+
+# How often (ms) the menu checks for rows enriched in the background
+BACKGROUND_POLL_MS = 100
+
 
 class MenuAction(Enum):
     """Actions that can be performed on a session."""
@@ -45,25 +53,38 @@ class SessionMenu:
     """
 
     def __init__(self):
-        self.sessions: List[Session] = []
+        self.sessions: SessionTable = SessionTable()
         self.selected_index: int = 0
         self.page_start: int = 0
         self.page_size: int = 10
         self.show_hidden: bool = False
         self.sort_column: int = 0
         self.sort_descending: bool = True
-
-    def run(self, sessions: List[Session]) -> Tuple[Optional[Session], MenuAction]:
+        self.enricher: Optional['BackgroundEnricher'] = None
+        self.live: Optional['LiveSessionIndex'] = None
+        self._revalidated: Set[str] = set()  # Rows changed by a revalidation still running
+        self._revalidation_shown: bool = False
+        self._enrichment_shown: bool = False
+
+    def run(self, sessions: 'Union[SessionTable, List[Session]]',
+            enricher: Optional['BackgroundEnricher'] = None,
+            live: Optional['LiveSessionIndex'] = None) -> Tuple[Optional[Session], MenuAction]:
         """
         Run the interactive menu.
 
         Args:
-            sessions: List of sessions to display
+            sessions: Sessions to display (a plain list is wrapped in a SessionTable)
+            enricher: Optional background enricher still filling in model/cost/branch;
+                      rows are repainted as it finishes them
+            live: Optional live index; sessions created, changed or deleted
+                  on disk are added, updated or removed in place
 
         Returns:
             Tuple of (selected session, action to perform)
         """
-        self.sessions = sessions
+        self.sessions = sessions if isinstance(sessions, SessionTable) else SessionTable(sessions)
+        self.enricher = enricher
+        self.live = live
 
         try:
             return curses.wrapper(self._main_loop)
@@ -81,20 +102,80 @@ class SessionMenu:
         max_y, _ = stdscr.getmaxyx()
         self.page_size = max(5, max_y - 10)  # Leave room for header/footer
 
+        # Wake up periodically for background enrichment and live changes
+        if self.enricher or self.live:
+            stdscr.timeout(BACKGROUND_POLL_MS)
+
+        needs_redraw = True
         while True:
-            stdscr.clear()
-            self._draw_header(stdscr)
-            self._draw_sessions(stdscr)
-            self._draw_footer(stdscr)
-            stdscr.refresh()
+            if needs_redraw:
+                stdscr.erase()
+                self._draw_header(stdscr)
+                self._draw_sessions(stdscr)
+                self._draw_footer(stdscr)
+                stdscr.refresh()
 
             # Handle input
             key = stdscr.getch()
+            if key == -1:
+                # Timeout: repaint only if background work changed something
+                live_changed = self._poll_live()
+                needs_redraw = self._poll_enricher() or live_changed
+                continue
+
             result = self._handle_key(key)
+            needs_redraw = True
 
             if result is not None:
                 return result
 
+    def _poll_enricher(self) -> bool:
+        """Check for background-enriched rows. Returns True if a repaint is needed."""
+        if not self.enricher:
+            return False
+        updated = self.enricher.pop_updated()
+        if updated:
+            self.sessions.invalidate(updated)
+        if not self.enricher.pending_count and not updated:
+            return self._enrichment_shown  # Repaint once more to clear the progress note
+        return bool(updated)
+
+    def _poll_live(self) -> bool:
+        """Apply sessions changed on disk. Returns True if a repaint is needed."""
+        if not self.live:
+            return False
+        upserted, removed = self.live.pop_changes()
+        if self.live.revalidating:
+            # Mark rows the revalidation corrected until it has finished
+            self._revalidated.update(s.session_id for s in upserted)
+        elif self._revalidated or self._revalidation_shown:
+            self._revalidated.clear()
+            if not upserted and not removed:
+                return True
+        if not upserted and not removed:
+            return False
+
+        selected_id = self.sessions[self.selected_index].session_id if self.sessions else None
+        for session_id in removed:
+            self.sessions.remove(session_id)
+        for session in upserted:
+            if self.show_hidden or session.custom_title or session.first_prompt:
+                self.sessions.add(session)
+            else:
+                self.sessions.remove(session.session_id)
+
+        visible_cols = self._get_visible_columns()
+        if 0 <= self.sort_column < len(visible_cols) and visible_cols[self.sort_column][0] != 'row_num':
+            self._sort_sessions()
+        else:
+            self.sessions.sort('modified', reverse=True)  # Default order: newest first
+
+        # Keep the cursor on the same session
+        row = self.sessions.index_of(selected_id) if selected_id else None
+        self.selected_index = row if row is not None else max(0, min(self.selected_index, len(self.sessions) - 1))
+        self._adjust_page()
+        return True
+
     def _init_colors(self):
         """Initialize color pairs."""
         curses.init_pair(1, curses.COLOR_CYAN, -1)      # Title / menu text
@@ -153,8 +234,15 @@ class SessionMenu:
         title = "S E S S I O N   F O R G E"
         stdscr.addstr(0, 2, title, curses.color_pair(1) | curses.A_BOLD)
 
-        # Session count
+        # Session count (plus background progress while enriching)
         count_str = f"Sessions: {len(self.sessions)}"
+        pending = self.enricher.pending_count if self.enricher else 0
+        self._enrichment_shown = pending > 0
+        if pending:
+            count_str = f"Enriching {pending}…  " + count_str
+        self._revalidation_shown = bool(self.live and self.live.revalidating)
+        if self._revalidation_shown:
+            count_str = "Revalidating…  " + count_str
         stdscr.addstr(0, max_x - len(count_str) - 2, count_str)
 
         # Column headers
@@ -173,6 +261,8 @@ class SessionMenu:
 
         # Get visible sessions
         visible = self._get_visible_sessions()
+        if self.enricher:
+            self.enricher.prioritize(s.session_id for s in visible)
 
         for i, session in enumerate(visible):
             if start_y + i >= max_y - (footer_lines + 1):
@@ -187,6 +277,7 @@ class SessionMenu:
         # Build row data dynamically based on visible columns
         visible_cols = self._get_visible_columns()
         row_data = []
+        pending = self.enricher is not None and self.enricher.is_pending(session.session_id)
 
         for key, header, width in visible_cols:
             if key == 'row_num':
@@ -194,13 +285,13 @@ class SessionMenu:
             elif key == 'source':
                 row_data.append(get_platform(session.source)['key'])
             elif key == 'session':
-                row_data.append(session.display_name[:width])
+                row_data.append(self.sessions.display_name(session)[:width])
             elif key == 'model':
-                row_data.append(session.model[:width] if session.model else '')
+                row_data.append(session.model[:width] if session.model else ('…' if pending else ''))
             elif key == 'messages':
                 row_data.append(str(session.message_count))
             elif key == 'cost':
-                row_data.append(f"${session.cost:.2f}" if session.cost > 0 else '')
+                row_data.append(f"${session.cost:.2f}" if session.cost > 0 else ('…' if pending else ''))
             elif key == 'created':
                 row_data.append(session.created.strftime('%m/%d %H:%M'))
             elif key == 'modified':
@@ -208,7 +299,7 @@ class SessionMenu:
             elif key == 'forked_from':
                 row_data.append(session.forked_from[:width] if session.forked_from else '')
             elif key == 'git_branch':
-                row_data.append(session.git_branch[:width] if session.git_branch else '')
+                row_data.append(session.git_branch[:width] if session.git_branch else ('…' if pending else ''))
             elif key == 'notes':
                 row_data.append(session.notes[:width] if session.notes else '')
             elif key == 'path':
@@ -227,6 +318,8 @@ class SessionMenu:
 
         try:
             stdscr.addstr(y, 2, row_str, attr)
+            if session.session_id in self._revalidated:
+                stdscr.addstr(y, 0, '*', curses.color_pair(3) | curses.A_BOLD)
         except curses.error:
             pass  # Ignore errors from writing at edge of screen
 
@@ -439,27 +532,10 @@ class SessionMenu:
 
     def _sort_sessions(self):
         """Sort sessions by the current sort column based on visible columns."""
-        # Map column keys to sort functions
-        sort_key_map = {
-            'row_num': lambda s: 0,  # No sort
-            'source': lambda s: s.source,
-            'session': lambda s: s.display_name.lower(),
-            'model': lambda s: s.model.lower() if s.model else '',
-            'messages': lambda s: s.message_count,
-            'cost': lambda s: s.cost,
-            'created': lambda s: s.created,
-            'modified': lambda s: s.modified,
-            'forked_from': lambda s: s.forked_from.lower() if s.forked_from else '',
-            'git_branch': lambda s: s.git_branch.lower() if s.git_branch else '',
-            'notes': lambda s: s.notes.lower() if s.notes else '',
-            'path': lambda s: s.project_path.lower(),
-        }
-
         visible_cols = self._get_visible_columns()
         if 0 <= self.sort_column < len(visible_cols):
             col_key = visible_cols[self.sort_column][0]
-            sort_fn = sort_key_map.get(col_key, lambda s: 0)
-            self.sessions.sort(key=sort_fn, reverse=self.sort_descending)
+            self.sessions.sort(col_key, reverse=self.sort_descending)
 
 
 class SessionActionMenu:
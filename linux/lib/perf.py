@@ -0,0 +1,199 @@
+"""
+Performance counters for SessionForge (Linux).
+Process-wide counters for bytes and lines read, JSON decodes, cache
+effectiveness, subprocesses and time per enrichment kind, plus per-file
+parse times. Shown by the debug menu's "Performance statistics" and by
+'sf stats'.
+
+Counters are updated once per file or call, never per line, so they stay
+on all the time.
+"""
+
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+_lock = threading.Lock()
+_started = time.time()
+_counters: Dict[str, int] = defaultdict(int)
+# Timing name -> [calls, seconds]
+_timings: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+# Transcript path -> [parse seconds, bytes parsed, file size]
+_files: Dict[str, List[float]] = {}
+
+# Rows shown in the slowest/largest lists
+DEFAULT_TOP = 10
+
+
+def count(name: str, amount: int = 1):
+    """Add to a counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def add_time(name: str, seconds: float):
+    """Record one timed call."""
+    with _lock:
+        timing = _timings[name]
+        timing[0] += 1
+        timing[1] += seconds
+
+
+@contextmanager
+def timed(name: str):
+    """Time a block, e.g. 'with timed("enrich.git_branch"):'."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start)
+
+
+def record_file(path: Path, seconds: float, bytes_parsed: int, lines: int, json_loads: int, size: int,
+                part: bool = False):
+    """
+    Record one transcript parse (counters plus the per-file entry).
+    part: only one range of the file was parsed (counted as a range, not a file).
+    """
+    key = str(path)
+    with _lock:
+        _counters['transcript.ranges' if part else 'transcript.files'] += 1
+        _counters['transcript.bytes'] += bytes_parsed
+        _counters['transcript.lines'] += lines
+        _counters['transcript.json_loads'] += json_loads
+        entry = _files.get(key)
+        if entry is None:
+            _files[key] = [seconds, bytes_parsed, size]
+        else:
+            entry[0] += seconds
+            entry[1] += bytes_parsed
+            entry[2] = size
+
+
+def note_file_size(path: Path, size: int):
+    """Remember a transcript's size even if it was served from the cache."""
+    key = str(path)
+    with _lock:
+        entry = _files.get(key)
+        if entry is None:
+            _files[key] = [0.0, 0, size]
+        else:
+            entry[2] = size
+
+
+def reset():
+    """Forget everything recorded so far."""
+    global _started
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+        _files.clear()
+        _started = time.time()
+
+
+def export_counters() -> Tuple[Dict[str, int], Dict[str, List[float]], Dict[str, List[float]]]:
+    """Raw copy of the counters (how pool workers hand theirs to the parent)."""
+    with _lock:
+        return (dict(_counters),
+                {name: list(timing) for name, timing in _timings.items()},
+                {path: list(entry) for path, entry in _files.items()})
+
+
+def merge_counters(exported: Tuple[Dict[str, int], Dict[str, List[float]], Dict[str, List[float]]]):
+    """Add counters exported by another process."""
+    counters, timings, files = exported
+    with _lock:
+        for name, value in counters.items():
+            _counters[name] += value
+        for name, (calls, seconds) in timings.items():
+            timing = _timings[name]
+            timing[0] += calls
+            timing[1] += seconds
+        for path, (seconds, bytes_parsed, size) in files.items():
+            entry = _files.get(path)
+            if entry is None:
+                _files[path] = [seconds, bytes_parsed, size]
+            else:
+                entry[0] += seconds
+                entry[1] += bytes_parsed
+                entry[2] = max(entry[2], size)
+
+
+def get_stats(top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """Everything recorded, as a JSON-compatible dict."""
+    counters, timings, files = export_counters()
+
+    lookups = counters.get('cache.hit', 0) + counters.get('cache.miss', 0)
+    cache = {
+        'hits': counters.get('cache.hit', 0),
+        'misses': counters.get('cache.miss', 0),
+        'evictions': counters.get('cache.stale', 0) + counters.get('cache.corrupt', 0),
+        'hit_rate': counters.get('cache.hit', 0) / lookups if lookups else None,
+    }
+
+    by_project: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    for path, (seconds, _, _) in files.items():
+        project = by_project[Path(path).parent.name]
+        project[0] += seconds
+        project[1] += 1
+
+    parsed = [(path, entry) for path, entry in files.items() if entry[0] > 0]
+    parsed.sort(key=lambda item: item[1][0], reverse=True)
+    largest = sorted(files.items(), key=lambda item: item[1][2], reverse=True)
+    projects = sorted(by_project.items(), key=lambda item: item[1][0], reverse=True)
+
+    return {
+        'uptime': time.time() - _started,
+        'counters': dict(sorted(counters.items())),
+        'cache': cache,
+        'timings': {name: {'calls': int(calls), 'seconds': seconds}
+                    for name, (calls, seconds) in sorted(timings.items())},
+        'slowest_files': [{'path': path, 'ms': entry[0] * 1000, 'bytes_parsed': int(entry[1]),
+                           'size': int(entry[2])} for path, entry in parsed[:top]],
+        'largest_files': [{'path': path, 'size': int(entry[2])} for path, entry in largest[:top]],
+        'slowest_projects': [{'project': name, 'ms': seconds * 1000, 'files': int(files_parsed)}
+                             for name, (seconds, files_parsed) in projects[:top] if seconds > 0],
+    }
+
+
+def format_stats(stats: Dict[str, Any]) -> List[str]:
+    """Human-readable report of get_stats() output."""
+    lines = [f"[Counters] (over {stats['uptime']:.0f}s)"]
+    counters = stats['counters']
+    if counters:
+        width = max(len(name) for name in counters)
+        lines += [f"  {name:<{width}}  {value:>14,}" for name, value in counters.items()]
+    else:
+        lines.append("  (nothing recorded yet)")
+
+    cache = stats['cache']
+    hit_rate = f"{cache['hit_rate']:.1%}" if cache['hit_rate'] is not None else 'n/a'
+    lines += ["", "[Session Cache]",
+              f"  Hits:         {cache['hits']:,}",
+              f"  Misses:       {cache['misses']:,}",
+              f"  Evictions:    {cache['evictions']:,}",
+              f"  Hit rate:     {hit_rate}"]
+
+    lines += ["", "[Time per kind]"]
+    if stats['timings']:
+        width = max(len(name) for name in stats['timings'])
+        for name, timing in stats['timings'].items():
+            calls = timing['calls']
+            avg_ms = timing['seconds'] * 1000 / calls if calls else 0.0
+            lines.append(f"  {name:<{width}}  {calls:>8,} call(s)  {timing['seconds'] * 1000:>10.1f} ms"
+                         f"  (avg {avg_ms:.2f} ms)")
+    else:
+        lines.append("  (nothing recorded yet)")
+
+    lines += ["", "[Slowest projects]"]
+    lines += [f"  {p['ms']:>10.1f} ms  {p['files']:>5} file(s)  {p['project']}"
+              for p in stats['slowest_projects']] or ["  (no transcripts parsed)"]
+    lines += ["", "[Slowest session files]"]
+    lines += [f"  {f['ms']:>10.1f} ms  {f['bytes_parsed']:>14,} B  {f['path']}"
+              for f in stats['slowest_files']] or ["  (no transcripts parsed)"]
+    lines += ["", "[Largest transcripts]"]
+    lines += [f"  {f['size']:>14,} B  {f['path']}" for f in stats['largest_files']] or ["  (none seen)"]
+    return lines
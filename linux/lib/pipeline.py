@@ -0,0 +1,287 @@
+"""
+Parallel transcript analysis for SessionForge (Linux).
+Runs analyze_transcript over many session files on a process pool,
+with work split into chunks of roughly equal byte size.
+Small corpora are analyzed serially, where pool startup would cost more
+than it saves. A file too large for one worker to get through in
+reasonable time is split into newline-aligned ranges that are parsed in
+parallel and merged in file order.
+
+With a FileBudget, files that go over it are deferred instead (see
+lib/budget.py) and yielded with placeholder stats.
+
+Pools are started from the menu's watcher and enricher threads, so their
+workers come from a fork server rather than a fork of this process: a
+fork would copy any lock another thread held at that moment (perf,
+budget, session cache) and the worker would wait on it forever. Each
+worker imports the main script and this package itself, which adds
+around a tenth of a second to a pool's startup.
+
+Under --profile everything is analyzed serially in this process, since
+cProfile would only see the parent waiting on its workers.
+"""
+
+import os
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Dict, Tuple, Iterator, Union
+
+from .config import (get_config, log_debug, log_error, trace_mark, trace_events_since, add_trace_events,
+                     debug_logging_enabled, setup_worker_logging, trace_origin, enable_worker_tracing)
+from .cache import get_session_cache
+from .transcript import (TranscriptStats, TranscriptPart, analyze_transcript, analyze_range,
+                         split_transcript, merge_parts)
+from .budget import FileBudget, OverBudget, defer_file, take_partial, finish_file
+from .profiling import profiling_enabled
+from . import jsonbackend, perf
+
+
+# Never make a chunk smaller than this; tiny chunks are dominated by IPC
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Aim for this many chunks per worker so fast workers can steal more work
+CHUNKS_PER_WORKER = 4
+
+# Never cut a split file into ranges smaller than this
+MIN_RANGE_BYTES = 64 * 1024 * 1024
+
+# A job is (file path, stale stats to resume from or None, bytes to parse)
+_Job = Tuple[Path, Optional[TranscriptStats], int]
+# A job's outcome: the stats, or OverBudget holding the stats so far
+_Result = Tuple[Path, Union[TranscriptStats, OverBudget]]
+
+
+def get_worker_count() -> int:
+    """
+    Number of worker processes to use (config 'scan_workers', 0 = one per CPU).
+    Always 1 while profiling, so the parse shows up in the profile.
+    """
+    if profiling_enabled():
+        return 1
+    workers = get_config().scan_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def iter_analyzed(files: List[Tuple[Path, os.stat_result]],
+                  budget: Optional[FileBudget] = None) -> Iterator[Tuple[Path, TranscriptStats]]:
+    """
+    Yield (path, stats) for each file, parsing only cache misses.
+
+    Cached files are yielded first, then parsed files in completion order.
+    Files that cannot be read are skipped. Parsed results are written back
+    to the session cache (the workers never touch it). Files that go over
+    budget are deferred and yielded with placeholder stats.
+    """
+    cache = get_session_cache()
+    stat_by_path: Dict[Path, os.stat_result] = {}
+    jobs: List[_Job] = []
+
+    for path, st in files:
+        perf.note_file_size(path, st.st_size)
+        stats = cache.lookup(path, st)
+        if stats is not None:
+            yield path, stats
+            continue
+        # A deferred file resumes where its budget ran out
+        stale = take_partial(path) or cache.lookup_stale(path)
+        stat_by_path[path] = st
+        jobs.append((path, stale, _pending_bytes(st, stale)))
+
+    if not jobs:
+        return
+
+    for path, result in _run_jobs(jobs, budget):
+        yield path, _settle(path, stat_by_path[path], result)
+
+
+def analyze_files(files: List[Tuple[Path, os.stat_result]],
+                  budget: Optional[FileBudget] = None) -> Dict[Path, TranscriptStats]:
+    """Analyze many session files, returning stats keyed by path."""
+    return dict(iter_analyzed(files, budget))
+
+
+def analyze_file(path: Path, st: os.stat_result,
+                 budget: Optional[FileBudget] = None) -> Optional[TranscriptStats]:
+    """
+    Analyze one session file that missed the cache, resuming from its last
+    parse, and store the result. Without a budget, a file with
+    split_min_bytes or more to parse is split across the process pool;
+    anything else is parsed right here. A file that goes over budget is
+    deferred and placeholder stats are returned.
+
+    Returns None if the file could not be read.
+    """
+    stale = take_partial(path) or get_session_cache().lookup_stale(path)
+    pending = _pending_bytes(st, stale)
+    if budget or pending < get_config().split_min_bytes or get_worker_count() <= 1:
+        try:
+            result = analyze_transcript(path, resume=stale, budget=budget)
+        except OverBudget as e:
+            result = e
+        return _settle(path, st, result) if result is not None else None
+    results = list(_run_jobs([(path, stale, pending)]))
+    return _settle(path, st, results[0][1]) if results else None
+
+
+def _settle(path: Path, st: os.stat_result, result: Union[TranscriptStats, OverBudget]) -> TranscriptStats:
+    """Cache a finished parse or defer a file over budget; returns the stats to show."""
+    if isinstance(result, OverBudget):
+        defer_file(path, result)
+        return result.placeholder()
+    get_session_cache().store(path, st, result)
+    finish_file(path)
+    return result
+
+
+def _pending_bytes(st: os.stat_result, stale: Optional[TranscriptStats]) -> int:
+    """Bytes left to parse: only those after a valid resume offset."""
+    return st.st_size - stale.offset if stale and stale.offset <= st.st_size else st.st_size
+
+
+def _run_jobs(jobs: List[_Job], budget: Optional[FileBudget] = None) -> Iterator[_Result]:
+    """Run analysis jobs serially or on a process pool, depending on size."""
+    workers = get_worker_count()
+    total_bytes = sum(pending for _, _, pending in jobs)
+    config = get_config()
+    # A budgeted pass stops each file early anyway, so nothing is split
+    split = [job for job in jobs if job[2] >= config.split_min_bytes] if workers > 1 and not budget else []
+
+    if workers <= 1 or (len(jobs) < 2 and not split) or total_bytes < config.parallel_min_bytes:
+        log_debug("Pipeline: analyzing %d file(s), %d bytes serially", len(jobs), total_bytes)
+        yield from _analyze_chunk(jobs, budget)
+        return
+
+    # Files too big for one worker go out as ranges, the rest in chunks
+    splits: Dict[Path, Tuple[TranscriptStats, int]] = {}  # Path -> (stats to merge into, ranges)
+    ranges: List[Tuple[Path, int, Optional[int]]] = []
+    for path, stale, pending in split:
+        plan = split_transcript(path, stale, max(2, min(workers, pending // MIN_RANGE_BYTES)))
+        if plan is not None:
+            base, file_ranges = plan
+            splits[path] = (base, len(file_ranges))
+            ranges += [(path, start, stop) for start, stop in file_ranges]
+    whole = [job for job in jobs if job not in split] if split else jobs
+    chunks = _make_chunks(whole, workers, sum(pending for _, _, pending in whole)) if whole else []
+    if not chunks and not ranges:
+        return
+    log_debug("Pipeline: analyzing %d file(s), %d bytes in %d chunk(s) and %d range(s) of %d split file(s) on %s "
+              "worker(s)", len(jobs), total_bytes, len(chunks), len(ranges), len(splits), workers)
+
+    remaining = {id(chunk): chunk for chunk in chunks}
+    parts: Dict[Path, List[Optional[TranscriptPart]]] = {path: [] for path in splits}
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks) + len(ranges)), mp_context=_pool_context(),
+                                 initializer=_init_worker,
+                                 initargs=(debug_logging_enabled(), trace_origin(), jsonbackend.backend_name())) as pool:
+            # Ranges first, since a split file is only done when all of its ranges are
+            futures = {pool.submit(_analyze_range_in_worker, *task): task for task in ranges}
+            futures.update((pool.submit(_analyze_chunk_in_worker, chunk, budget), chunk) for chunk in chunks)
+            for future in as_completed(futures):
+                result, events, counters = future.result()
+                add_trace_events(events)
+                perf.merge_counters(counters)
+                task = futures[future]
+                if isinstance(task, list):
+                    del remaining[id(task)]
+                    yield from result
+                    continue
+                path = task[0]
+                parts[path].append(result)
+                base, count = splits[path]
+                if len(parts[path]) == count:
+                    stats = _merge_split(path, base, parts.pop(path))
+                    if stats is not None:
+                        yield path, stats
+    except (BrokenProcessPool, OSError) as e:
+        # No usable pool (restricted /dev/shm, killed worker...) - finish serially
+        log_error("Pipeline: process pool failed (%s), finishing %d chunk(s) and %d split file(s) serially",
+                  e, len(remaining), len(parts))
+        for chunk in remaining.values():
+            yield from _analyze_chunk(chunk, budget)
+        yield from _analyze_chunk([(path, splits[path][0], 0) for path in parts])
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for pool workers: a fork server where there is one, else spawn."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _init_worker(debug: bool, origin: Optional[float], backend: str):
+    """Pool initializer: what a fresh worker would otherwise not inherit from the parent."""
+    setup_worker_logging(debug)
+    if origin is not None:
+        enable_worker_tracing(origin)
+    jsonbackend.set_backend(backend)
+
+
+def _merge_split(path: Path, base: TranscriptStats,
+                 parts: List[Optional[TranscriptPart]]) -> Optional[TranscriptStats]:
+    """Merge a split file's ranges; None if any of them could not be read."""
+    if any(part is None for part in parts):
+        return None
+    return merge_parts(path, base, parts)
+
+
+def _make_chunks(jobs: List[_Job], workers: int, total_bytes: int) -> List[List[_Job]]:
+    """
+    Split jobs into chunks of roughly equal byte size.
+    Largest files go first so one huge transcript doesn't finish last.
+    """
+    target = max(MIN_CHUNK_BYTES, total_bytes // (workers * CHUNKS_PER_WORKER))
+    chunks: List[List[_Job]] = []
+    current: List[_Job] = []
+    current_bytes = 0
+
+    for job in sorted(jobs, key=lambda j: (-j[2], str(j[0]))):
+        current.append(job)
+        current_bytes += job[2]
+        if current_bytes >= target:
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _analyze_chunk(jobs: List[_Job], budget: Optional[FileBudget] = None) -> List[_Result]:
+    """
+    Analyze every file in a chunk, dropping unreadable ones.
+    Runs in pool workers (through _analyze_chunk_in_worker), so it must stay
+    a top-level function.
+    """
+    results: List[_Result] = []
+    for path, stale, _ in jobs:
+        try:
+            stats = analyze_transcript(path, resume=stale, budget=budget)
+        except OverBudget as e:
+            results.append((path, e))
+            continue
+        if stats is not None:
+            results.append((path, stats))
+    return results
+
+
+def _analyze_chunk_in_worker(jobs: List[_Job], budget: Optional[FileBudget]) -> Tuple[List[_Result], list, tuple]:
+    """
+    Pool entry point: a chunk's results plus the trace spans and performance
+    counters recorded for it, which the parent merges into its own.
+    """
+    mark = trace_mark()
+    perf.reset()  # A worker runs several tasks; hand back only this one's counters
+    results = _analyze_chunk(jobs, budget)
+    return results, trace_events_since(mark), perf.export_counters()
+
+
+def _analyze_range_in_worker(path: Path, start: int,
+                             stop: Optional[int]) -> Tuple[Optional[TranscriptPart], list, tuple]:
+    """Pool entry point for one range of a split file (see _analyze_chunk_in_worker)."""
+    mark = trace_mark()
+    perf.reset()
+    part = analyze_range(path, start, stop)
+    return part, trace_events_since(mark), perf.export_counters()
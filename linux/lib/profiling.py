@@ -0,0 +1,160 @@
+"""
+Profiling mode for SessionForge (Linux).
+'--profile' runs cProfile around each phase of the menu loop (load,
+enrich, render) and writes one .pstats file per phase to the logs
+directory; '--profile-memory' adds a tracemalloc report of the top
+allocations per phase. The debug menu prints the newest profile, and the
+files can be attached to a "sf is slow" report as they are. Transcripts
+are parsed serially while profiling (see lib/pipeline.py), so the parse
+is in the profile rather than in worker processes it cannot see.
+"""
+
+import io
+import pstats
+import cProfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+from .config import get_logs_path, log_info, log_error
+
+
+PROFILE_PREFIX = 'profile-'
+
+# Rows in the memory report and the debug menu listing
+DEFAULT_TOP = 25
+
+# Frames kept per allocation traceback (1 = just the allocating line)
+TRACEMALLOC_FRAMES = 1
+
+
+class PhaseProfiler:
+    """One cProfile.Profile per phase, accumulated over every pass through it."""
+
+    def __init__(self, memory: bool = False, out_dir: Optional[Path] = None):
+        self.memory = memory
+        self.out_dir = Path(out_dir) if out_dir else get_logs_path()
+        self.stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._memory_report: List[str] = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profile a block as (part of) the named phase."""
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        # Snapshots are taken outside the profiled window so they don't show up in it
+        before = _take_memory_snapshot() if self.memory else None
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError as e:  # Another profiler is active (e.g. python -m cProfile)
+            log_error("Profiling: can't profile phase '%s': %s", name, e)
+            enabled = False
+        try:
+            yield
+        finally:
+            if enabled:
+                profile.disable()
+            if before is not None:
+                self._record_memory(name, before)
+
+    def _record_memory(self, name: str, before: tracemalloc.Snapshot):
+        """Append the phase's largest allocation growth to the memory report."""
+        after = _take_memory_snapshot()
+        diff = after.compare_to(before, 'lineno')
+        growth = sum(stat.size_diff for stat in diff)
+        self._memory_report.append(f"[{name}] {growth / 1024:+,.1f} KiB")
+        for stat in diff[:DEFAULT_TOP]:
+            if stat.size_diff <= 0:
+                break
+            self._memory_report.append(f"  {stat}")
+        self._memory_report.append("")
+
+    def write(self) -> List[Path]:
+        """Write the .pstats files (and memory report); returns the paths written."""
+        written = []
+        try:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            for name, profile in self._profiles.items():
+                path = self.out_dir / f"{PROFILE_PREFIX}{self.stamp}-{name}.pstats"
+                profile.dump_stats(str(path))
+                written.append(path)
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                path = self.out_dir / f"{PROFILE_PREFIX}{self.stamp}-memory.txt"
+                header = [f"Traced memory: {current / 1024:,.1f} KiB current, {peak / 1024:,.1f} KiB peak", ""]
+                path.write_text('\n'.join(header + self._memory_report), encoding='utf-8')
+                written.append(path)
+        except OSError as e:
+            log_error("Profiling: could not write profile to %s: %s", self.out_dir, e)
+        for path in written:
+            log_info("Profiling: wrote %s", path)
+        return written
+
+
+def _take_memory_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot without tracemalloc's and the import system's own allocations."""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+
+
+_profiler: Optional[PhaseProfiler] = None
+
+
+def enable_profiling(memory: bool = False):
+    """Start profiling the menu loop phases (--profile / --profile-memory)."""
+    global _profiler
+    _profiler = PhaseProfiler(memory=memory)
+
+
+def profiling_enabled() -> bool:
+    """True when --profile is active."""
+    return _profiler is not None
+
+
+def profile_phase(name: str):
+    """Context manager profiling a block as a phase; does nothing unless --profile is on."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.phase(name)
+
+
+def write_profile() -> List[Path]:
+    """Write the collected profile, if profiling is on."""
+    return _profiler.write() if _profiler is not None else []
+
+
+def find_latest_profile(directory: Optional[Path] = None) -> Optional[Tuple[str, List[Path]]]:
+    """The newest profile run in the logs directory: (timestamp, its files)."""
+    directory = Path(directory) if directory else get_logs_path()
+    runs: Dict[str, List[Path]] = {}
+    try:
+        for path in directory.glob(f'{PROFILE_PREFIX}*'):
+            stamp = path.name[len(PROFILE_PREFIX):len(PROFILE_PREFIX) + len('YYYYmmdd-HHMMSS')]
+            runs.setdefault(stamp, []).append(path)
+    except OSError:
+        return None
+    if not runs:
+        return None
+    stamp = max(runs)
+    return stamp, sorted(runs[stamp])
+
+
+def format_profile(path: Path, top: int = DEFAULT_TOP) -> str:
+    """Top cumulative functions of a .pstats file as printed by pstats."""
+    stream = io.StringIO()
+    try:
+        stats = pstats.Stats(str(path), stream=stream)
+    except (OSError, TypeError, ValueError, EOFError) as e:
+        return f"Could not read {path}: {e}"
+    stats.strip_dirs().sort_stats('cumulative').print_stats(top)
+    return stream.getvalue()
@@ -5,14 +5,23 @@ Also discovers Codex sessions from SQLite database.
 """
 
 import os
-import json
+import mmap
 import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
-
-from .config import get_claude_projects_path, log_debug, log_error
+from typing import List, Optional, Dict, Any, Tuple, Iterator
+from dataclasses import dataclass, field, fields, replace
+
+from .config import get_claude_projects_path, log_debug, log_error, trace_span, traced
+from .cache import get_session_cache
+from .transcript import TranscriptStats, entry_model, parse_entry, simplify_model_name
+from .jsonscan import map_file, mapped_size
+from .pipeline import analyze_file, analyze_files, iter_analyzed
+from .budget import get_file_budget, is_deferred
+from .gitinfo import get_git_branch
+from .table import SessionTable
+from . import jsonbackend, perf
 import re as _re
 
 
@@ -53,6 +62,8 @@ class Session:
     source: str = 'claude'  # 'claude' or 'codex'
     codex_tokens_used: int = 0  # Aggregate token count from Codex
     _session_file: Optional[Path] = None  # Actual path to session .jsonl file
+    _index_mtime: float = 0.0  # File mtime (epoch seconds) described by sessions-index.json
+    _partial_count: bool = False  # message_count is from a transcript parsed only up to its budget
 
     @property
     def display_name(self) -> str:
@@ -77,72 +88,316 @@ class Session:
         return self.session_id[:8]
 
 
+def session_to_dict(session: Session) -> Dict[str, Any]:
+    """Plain JSON-compatible dict of a session (for the daemon and CLI output)."""
+    data = {}
+    for f in fields(Session):
+        value = getattr(session, f.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Path):
+            value = str(value)
+        data[f.name] = value
+    return data
+
+
+def session_from_dict(data: Dict[str, Any]) -> Session:
+    """Rebuild a Session from session_to_dict output, ignoring unknown keys."""
+    kwargs = {}
+    for f in fields(Session):
+        if f.name not in data:
+            continue
+        value = data[f.name]
+        if f.name in ('created', 'modified'):
+            value = datetime.fromisoformat(value)
+        elif f.name == '_session_file' and value is not None:
+            value = Path(value)
+        kwargs[f.name] = value
+    return Session(**kwargs)
+
+
+@dataclass
+class SessionFilter:
+    """
+    Early filters for iter_sessions. Each is checked as soon as the value it
+    needs is known, so excluded projects and old transcripts are never parsed.
+    """
+    source: Optional[str] = None  # 'claude' or 'codex'
+    project_prefix: Optional[str] = None  # Project path must start with this
+    modified_since: Optional[datetime] = None  # Modified at or after this (naive local time)
+
+    def wants_source(self, source: str) -> bool:
+        return not self.source or self.source == source
+
+    def wants_project_dir(self, project_dir: Path) -> bool:
+        """
+        Cheap pre-check on Claude's encoded directory name. Both sides are
+        normalized because Claude replaces separators (and possibly other
+        punctuation) with '-', so only a definite mismatch is rejected.
+        """
+        if not self.project_prefix:
+            return True
+        normalized_prefix = _re.sub(r'[^a-zA-Z0-9]', '-', self.project_prefix.rstrip('/'))
+        return _re.sub(r'[^a-zA-Z0-9]', '-', project_dir.name).startswith(normalized_prefix)
+
+    def wants_mtime(self, mtime: float) -> bool:
+        return self.modified_since is None or mtime >= self.modified_since.timestamp()
+
+    def matches(self, session: Session) -> bool:
+        """Full check on a finished session."""
+        if not self.wants_source(session.source):
+            return False
+        if self.project_prefix and not session.project_path.startswith(self.project_prefix):
+            return False
+        return self.modified_since is None or session.modified >= self.modified_since
+
+
+def iter_sessions(source: Optional[str] = None,
+                  project_prefix: Optional[str] = None,
+                  modified_since: Optional[datetime] = None) -> Iterator[Session]:
+    """
+    Discover Claude Code and Codex sessions, yielding each as soon as it is known.
+
+    Indexed Claude sessions come first, project by project, then Codex
+    sessions, then sessions that needed their transcript parsed (cached ones
+    first). No particular order is guaranteed; callers sort if they need to.
+
+    Args:
+        source: Only 'claude' or only 'codex' sessions
+        project_prefix: Only sessions whose project path starts with this
+        modified_since: Only sessions modified at or after this time
+    """
+    session_filter = SessionFilter(source, project_prefix, modified_since)
+    try:
+        if session_filter.wants_source('claude'):
+            parsed = yield from _iter_indexed_claude_sessions(session_filter)
+        else:
+            parsed = []
+        if session_filter.wants_source('codex'):
+            for session in get_all_codex_sessions():
+                if session_filter.matches(session):
+                    yield session
+        yield from _iter_parsed_claude_sessions(parsed, session_filter)
+    finally:
+        get_session_cache().flush()
+
+
+@traced()
 def get_all_sessions() -> List[Session]:
     """
     Discover all Claude Code and Codex sessions.
     Scans ~/.claude/projects/ for Claude sessions and ~/.codex/ for Codex sessions.
     """
-    claude_sessions = _get_claude_sessions()
-    codex_sessions = get_all_codex_sessions()
-
-    sessions = claude_sessions + codex_sessions
+    sessions = list(iter_sessions())
 
-    # Sort merged list by modified date, newest first
-    sessions.sort(key=lambda s: s.modified, reverse=True)
+    # Sort merged list by modified date, newest first (id breaks ties so the
+    # order never depends on which worker finished first)
+    sessions.sort(key=lambda s: (s.modified, s.session_id), reverse=True)
 
-    log_debug(f"Total sessions found: {len(sessions)} (Claude: {len(claude_sessions)}, Codex: {len(codex_sessions)})")
+    codex_count = sum(1 for s in sessions if s.source == 'codex')
+    log_debug("Total sessions found: %d (Claude: %s, Codex: %s)",
+              len(sessions), len(sessions) - codex_count, codex_count)
     return sessions
 
 
-def _get_claude_sessions() -> List[Session]:
+# An index entry is trusted unless its transcript was modified more than this
+# many seconds after the time the index recorded
+INDEX_MTIME_SLACK_SECONDS = 5.0
+
+# Transcripts still to parse after the index pass: (project dir, index entries, files)
+_ParsePlan = List[Tuple[Path, Dict[str, Session], List[Tuple[Path, os.stat_result]]]]
+
+
+def _iter_indexed_claude_sessions(session_filter: SessionFilter):
     """
-    Discover all Claude Code sessions.
-    Scans ~/.claude/projects/ for session files.
+    Yield the Claude sessions that sessions-index.json describes up to date,
+    project by project, without opening any transcript.
+
+    Returns (as the generator's value) the transcripts that still need
+    parsing: files missing from the index or modified after their entry
+    was written.
     """
-    sessions = []
+    plan: _ParsePlan = []
     projects_path = get_claude_projects_path()
 
-    log_debug(f"Scanning for sessions in: {projects_path}")
+    log_debug("Scanning for sessions in: %s", projects_path)
 
     if not projects_path.exists():
-        log_debug(f"Projects path does not exist: {projects_path}")
-        return sessions
+        log_debug("Projects path does not exist: %s", projects_path)
+        return plan
 
     # Scan each project directory
-    project_dirs = list(projects_path.iterdir())
-    log_debug(f"Found {len(project_dirs)} items in projects directory")
+    project_dirs = []
+    with os.scandir(projects_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                project_dirs.append(Path(entry.path))
+            else:
+                log_debug("Skipping non-directory: %s", entry.name)
+    project_dirs.sort()
+    log_debug("Found %d project directories", len(project_dirs))
 
     for project_dir in project_dirs:
-        if not project_dir.is_dir():
-            log_debug(f"Skipping non-directory: {project_dir.name}")
+        if not session_filter.wants_project_dir(project_dir):
+            log_debug("Skipping project directory (filtered): %s", project_dir.name)
             continue
+        indexed_sessions, indexed_by_id, to_parse = _scan_project_dir(project_dir, session_filter)
+
+        stale_ids = {path.stem for path, _ in to_parse}
+        for session in indexed_sessions:
+            if session.session_id not in stale_ids and session_filter.matches(session):
+                yield session
+        plan.append((project_dir, indexed_by_id, to_parse))
+
+    return plan
 
-        log_debug(f"Scanning project directory: {project_dir.name}")
 
+def _scan_project_dir(project_dir: Path, session_filter: SessionFilter
+                      ) -> Tuple[List[Session], Dict[str, Session], List[Tuple[Path, os.stat_result]]]:
+    """
+    Read a project's sessions-index.json and list its transcripts.
+    Returns (indexed sessions, the same by id, transcripts that need parsing).
+    """
+    log_debug("Scanning project directory: %s", project_dir.name)
+
+    with trace_span('scan_project', project=project_dir.name):
         # Try to read sessions-index.json first (primary source)
         index_file = project_dir / 'sessions-index.json'
         indexed_sessions = []
         if index_file.exists():
-            log_debug(f"Found sessions-index.json in {project_dir.name}")
+            log_debug("Found sessions-index.json in %s", project_dir.name)
             indexed_sessions = _load_sessions_from_index(project_dir, index_file)
-            log_debug(f"Loaded {len(indexed_sessions)} sessions from index")
-            sessions.extend(indexed_sessions)
-
-        # Also scan for .jsonl files to find unindexed sessions
-        log_debug(f"Scanning for .jsonl files in {project_dir.name}")
-        jsonl_sessions = _scan_for_sessions(project_dir)
-        log_debug(f"Found {len(jsonl_sessions)} .jsonl files")
-
-        # Add unindexed sessions (those not in the index)
-        indexed_ids = {s.session_id for s in indexed_sessions}
-        for session in jsonl_sessions:
-            if session.session_id not in indexed_ids:
-                log_debug(f"Adding unindexed session: {session.session_id[:8]}")
-                session.is_unindexed = True
-                sessions.append(session)
+            log_debug("Loaded %d sessions from index", len(indexed_sessions))
 
-    log_debug(f"Claude sessions found: {len(sessions)}")
-    return sessions
+        # Only unindexed or stale transcripts need parsing
+        indexed_by_id = {s.session_id: s for s in indexed_sessions}
+        to_parse = [(path, stat) for path, stat in _list_unindexed_files(project_dir, indexed_by_id)
+                    if session_filter.wants_mtime(stat.st_mtime)]
+    log_debug("%d .jsonl file(s) in %s need parsing", len(to_parse), project_dir.name)
+    return indexed_sessions, indexed_by_id, to_parse
+
+
+def scan_project_dir(project_dir: Path) -> Tuple[List[Session], Dict[str, Session]]:
+    """
+    Discover the sessions of a single Claude project directory.
+    Returns (sessions, index entries by id); used to resync one project.
+    """
+    session_filter = SessionFilter()
+    indexed_sessions, indexed_by_id, to_parse = _scan_project_dir(project_dir, session_filter)
+    stale_ids = {path.stem for path, _ in to_parse}
+    sessions = [s for s in indexed_sessions if s.session_id not in stale_ids]
+    sessions.extend(_iter_parsed_claude_sessions([(project_dir, indexed_by_id, to_parse)], session_filter))
+    return sessions, indexed_by_id
+
+
+def load_session_file(jsonl_file: Path, indexed: Optional[Session] = None) -> Optional[Session]:
+    """
+    Build the session for one Claude transcript, e.g. after it changed on disk.
+    indexed is its sessions-index.json entry, if any. Only the bytes appended
+    since the last parse are read. Returns None if the file is gone.
+    """
+    try:
+        stat = jsonl_file.stat()
+    except OSError:
+        return None
+    if indexed is not None and stat.st_mtime <= indexed._index_mtime + INDEX_MTIME_SLACK_SECONDS:
+        return indexed
+    stats = _get_transcript_stats(jsonl_file, stat)
+    if stats is None:
+        return indexed
+    if indexed is not None:
+        session = replace(indexed)
+        _refresh_indexed_session(session, jsonl_file, stat, stats)
+        return session
+    return _session_from_stats(jsonl_file, stat, stats, jsonl_file.parent)
+
+
+def _iter_parsed_claude_sessions(plan: _ParsePlan, session_filter: SessionFilter) -> Iterator[Session]:
+    """
+    Analyze the transcripts left by the index pass (in parallel for large
+    corpora) and yield their sessions as results arrive.
+    """
+    files = [f for _, _, to_parse in plan for f in to_parse]
+    if not files:
+        return
+    owners = {path: (project_dir, indexed_by_id, stat)
+              for project_dir, indexed_by_id, to_parse in plan for path, stat in to_parse}
+
+    pending_stale = {}
+    for project_dir, indexed_by_id, to_parse in plan:
+        for path, _ in to_parse:
+            if path.stem in indexed_by_id:
+                pending_stale[path] = indexed_by_id[path.stem]
+
+    for jsonl_file, stats in iter_analyzed(files, get_file_budget()):
+        project_dir, indexed_by_id, stat = owners[jsonl_file]
+        indexed = pending_stale.pop(jsonl_file, None)
+        if indexed is not None:
+            log_debug("Index entry is stale, updating from transcript: %.8s", jsonl_file.stem)
+            _refresh_indexed_session(indexed, jsonl_file, stat, stats)
+            session = indexed
+        else:
+            log_debug("Adding unindexed session: %.8s", jsonl_file.stem)
+            session = _session_from_stats(jsonl_file, stat, stats, project_dir)
+        if session_filter.matches(session):
+            yield session
+
+    # Unreadable transcripts: keep what the index said about them
+    for session in pending_stale.values():
+        if session_filter.matches(session):
+            yield session
+
+
+def _list_unindexed_files(project_dir: Path,
+                          indexed_by_id: Dict[str, Session]) -> List[Tuple[Path, os.stat_result]]:
+    """
+    List the .jsonl files in a project directory that the index doesn't cover:
+    files with no index entry, and files modified after their entry was written.
+    """
+    files = []
+    trusted = 0
+    try:
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.jsonl') or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError as e:
+                    log_debug("Could not stat %s: %s", entry.path, e)
+                    continue
+                indexed = indexed_by_id.get(entry.name[:-len('.jsonl')])
+                if indexed is None or stat.st_mtime > indexed._index_mtime + INDEX_MTIME_SLACK_SECONDS:
+                    files.append((Path(entry.path), stat))
+                else:
+                    trusted += 1
+    except OSError as e:
+        log_error("Could not list %s: %s", project_dir, e)
+    perf.count('discovery.index_trusted', trusted)
+    files.sort()
+    return files
+
+
+def _refresh_indexed_session(session: Session, jsonl_file: Path, stat: os.stat_result, stats: TranscriptStats):
+    """Update an indexed session whose transcript has grown since the index was written."""
+    session.modified = datetime.fromtimestamp(stat.st_mtime)
+    session.message_count = stats.user_count
+    session._partial_count = is_deferred(jsonl_file)
+    if not session.first_prompt:
+        session.first_prompt = stats.first_prompt
+    session.model = stats.model
+    session.cost = stats.cost
+
+
+class _LazyKeys:
+    """Log argument showing a dict's keys (or the type of a non-dict), built only if logged."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return str(list(self.value)) if isinstance(self.value, dict) else str(type(self.value))
 
 
 def _load_sessions_from_index(project_dir: Path, index_file: Path) -> List[Session]:
@@ -150,25 +405,26 @@ def _load_sessions_from_index(project_dir: Path, index_file: Path) -> List[Sessi
     sessions = []
 
     try:
-        with open(index_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = jsonbackend.loads(index_file.read_bytes())
 
-        log_debug(f"Index file keys: {list(data.keys())}")
+        log_debug("Index file keys: %s", _LazyKeys(data))
 
         # Try 'entries' first (Claude's format), then 'sessions' as fallback
         entries = data.get('entries', data.get('sessions', []))
-        log_debug(f"Found {len(entries)} entries in index")
+        log_debug("Found %d entries in index", len(entries))
+        perf.count('index.files')
+        perf.count('index.entries', len(entries))
 
         for i, entry in enumerate(entries):
-            log_debug(f"Entry {i}: keys={list(entry.keys()) if isinstance(entry, dict) else type(entry)}")
+            log_debug("Entry %d: keys=%s", i, _LazyKeys(entry))
             session = _parse_session_entry(entry, project_dir)
             if session:
                 sessions.append(session)
             else:
-                log_debug(f"Entry {i} rejected (no valid session)")
+                log_debug("Entry %d rejected (no valid session)", i)
 
-    except (json.JSONDecodeError, IOError) as e:
-        log_error(f"Could not read {index_file}: {e}")
+    except (ValueError, IOError) as e:
+        log_error("Could not read %s: %s", index_file, e)
         print(f"Warning: Could not read {index_file}: {e}")
 
     return sessions
@@ -180,10 +436,10 @@ def _parse_session_entry(entry: Dict[str, Any], project_dir: Path) -> Optional[S
         # Try multiple possible key names for session ID
         session_id = entry.get('sessionId') or entry.get('session_id') or entry.get('id', '')
         if not session_id:
-            log_debug(f"No sessionId found in entry with keys: {list(entry.keys())}")
+            log_debug("No sessionId found in entry with keys: %s", _LazyKeys(entry))
             return None
 
-        log_debug(f"Parsing session: {session_id[:8]}...")
+        log_debug("Parsing session: %.8s...", session_id)
 
         # Parse timestamps - try multiple formats
         created_str = entry.get('created') or entry.get('createdAt') or entry.get('timestamp', '')
@@ -200,6 +456,14 @@ def _parse_session_entry(entry: Dict[str, Any], project_dir: Path) -> Optional[S
         # Build actual session file path
         session_file = project_dir / f"{session_id}.jsonl"
 
+        # Transcript mtime the entry describes: Claude's fileMtime (epoch ms)
+        # when present, otherwise the entry's modified date
+        file_mtime = entry.get('fileMtime')
+        if isinstance(file_mtime, (int, float)) and file_mtime > 0:
+            index_mtime = file_mtime / 1000.0
+        else:
+            index_mtime = modified.timestamp()
+
         return Session(
             session_id=session_id,
             project_path=project_path,
@@ -210,70 +474,45 @@ def _parse_session_entry(entry: Dict[str, Any], project_dir: Path) -> Optional[S
             message_count=entry.get('messageCount') or entry.get('message_count', 0),
             git_branch=entry.get('gitBranch') or entry.get('git_branch', ''),
             _session_file=session_file,  # Store actual file path
+            _index_mtime=index_mtime,
         )
 
     except Exception as e:
-        log_error(f"Could not parse session entry: {e}")
+        log_error("Could not parse session entry: %s", e)
         print(f"Warning: Could not parse session entry: {e}")
         return None
 
 
-def _scan_for_sessions(project_dir: Path) -> List[Session]:
-    """Scan a project directory for .jsonl session files."""
-    sessions = []
-
-    for jsonl_file in project_dir.glob('*.jsonl'):
-        session = _parse_session_file(jsonl_file, project_dir)
-        if session:
-            sessions.append(session)
-
-    return sessions
-
-
-def _parse_session_file(jsonl_file: Path, project_dir: Path) -> Optional[Session]:
-    """Parse a session directly from a .jsonl file."""
-    try:
-        session_id = jsonl_file.stem  # Filename without extension
-        stat = jsonl_file.stat()
-
-        # Try to extract project path from first line
-        project_path = _decode_project_path(project_dir.name)
-        first_prompt = ''
-        message_count = 0
-
-        with open(jsonl_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    # Look for cwd in summary entries
-                    if entry.get('type') == 'summary' and 'cwd' in entry:
-                        project_path = entry['cwd']
-                    # Count user messages
-                    if entry.get('type') == 'user':
-                        message_count += 1
-                        if not first_prompt and entry.get('message'):
-                            msg = entry['message']
-                            if isinstance(msg, list) and msg:
-                                first_prompt = str(msg[0].get('text', ''))[:100]
-                            elif isinstance(msg, str):
-                                first_prompt = msg[:100]
-                except json.JSONDecodeError:
-                    continue
-
-        return Session(
-            session_id=session_id,
-            project_path=project_path,
-            created=datetime.fromtimestamp(stat.st_ctime),
-            modified=datetime.fromtimestamp(stat.st_mtime),
-            first_prompt=first_prompt,
-            message_count=message_count,
-            is_unindexed=True,
-            _session_file=jsonl_file,  # Store actual file path
-        )
-
-    except Exception as e:
-        print(f"Warning: Could not parse {jsonl_file}: {e}")
-        return None
+def _session_from_stats(jsonl_file: Path, stat: os.stat_result,
+                        stats: TranscriptStats, project_dir: Path) -> Session:
+    """Build an unindexed Session from a transcript's analyzed stats."""
+    return Session(
+        session_id=jsonl_file.stem,  # Filename without extension
+        project_path=stats.cwd or _decode_project_path(project_dir.name),
+        created=datetime.fromtimestamp(stat.st_ctime),
+        modified=datetime.fromtimestamp(stat.st_mtime),
+        first_prompt=stats.first_prompt,
+        message_count=stats.user_count,
+        model=stats.model,
+        cost=stats.cost,
+        is_unindexed=True,
+        _session_file=jsonl_file,  # Store actual file path
+        _partial_count=is_deferred(jsonl_file),
+    )
+
+
+def _get_transcript_stats(session_file: Path, stat: os.stat_result,
+                          budgeted: bool = True) -> Optional[TranscriptStats]:
+    """
+    Get the analyzed stats for a session file, parsing it only on a cache miss.
+    Discovery and enrichment share this so each file is read at most once.
+    The installed file budget applies unless budgeted is False.
+    """
+    stats = get_session_cache().lookup(session_file, stat)
+    if stats is not None:
+        return stats
+    # Changed since last time - Claude appends, so parse only the new tail
+    return analyze_file(session_file, stat, get_file_budget() if budgeted else None)
 
 
 def _decode_project_path(encoded_name: str) -> str:
@@ -288,7 +527,7 @@ def _decode_project_path(encoded_name: str) -> str:
         '-home-user-project' -> '/home/user/project'
         'home-user-project'  -> '/home/user/project' (fallback without leading hyphen)
     """
-    log_debug(f"Decoding project path from: {encoded_name}")
+    log_debug("Decoding project path from: %s", encoded_name)
 
     # Remove leading hyphen if present (Claude's format)
     if encoded_name.startswith('-'):
@@ -297,7 +536,7 @@ def _decode_project_path(encoded_name: str) -> str:
     # Replace hyphens with slashes
     decoded = '/' + encoded_name.replace('-', '/')
 
-    log_debug(f"Decoded project path: {decoded}")
+    log_debug("Decoded project path: %s", decoded)
     return decoded
 
 
@@ -314,29 +553,39 @@ def _encode_project_path(path: str) -> str:
     """
     # Remove leading slash and replace path separators, then add leading hyphen
     encoded = '-' + path.lstrip('/').replace('/', '-')
-    log_debug(f"Encoded '{path}' -> '{encoded}'")
+    log_debug("Encoded '%s' -> '%s'", path, encoded)
     return encoded
 
 
 def _parse_datetime(value: str) -> datetime:
-    """Parse an ISO datetime string."""
+    """Parse an ISO datetime string into naive local time."""
     if not value:
         return datetime.now()
     try:
         # Handle ISO format with timezone
         if value.endswith('Z'):
             value = value[:-1] + '+00:00'
-        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
     except ValueError:
         return datetime.now()
+    # Convert to naive local time so index dates sort against file mtimes
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
 
 
-def get_session_by_id(session_id: str) -> Optional[Session]:
-    """Find a specific session by ID."""
-    for session in get_all_sessions():
-        if session.session_id == session_id:
-            return session
-    return None
+def get_session_by_id(session_id: str, table: Optional[SessionTable] = None) -> Optional[Session]:
+    """
+    Find a specific session by ID, or by an unambiguous ID prefix (short_id).
+    Looks in table if given, otherwise discovers all sessions first.
+    """
+    if table is None:
+        table = SessionTable(get_all_sessions())
+    session = table.get(session_id)
+    if session is not None:
+        return session
+    matches = table.find_prefix(session_id) if session_id else []
+    return matches[0] if len(matches) == 1 else None
 
 
 def get_session_file_path(session: Session) -> Path:
@@ -345,22 +594,21 @@ def get_session_file_path(session: Session) -> Path:
     return get_claude_projects_path() / encoded_path / f"{session.session_id}.jsonl"
 
 
-def get_git_branch(project_path: str) -> str:
-    """Get the current git branch for a project directory."""
-    import subprocess
-    try:
-        result = subprocess.run(
-            ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-        pass
-    return ''
+def _stat_session_file(session: Session) -> Tuple[Path, Optional[os.stat_result]]:
+    """
+    Locate a session's .jsonl file with a single stat() call.
+    Returns (path, stat) where stat is None if the file does not exist.
+    """
+    candidates = []
+    if session._session_file:
+        candidates.append(session._session_file)
+    candidates.append(get_session_file_path(session))
+    for candidate in candidates:
+        try:
+            return candidate, candidate.stat()
+        except OSError:
+            continue
+    return candidates[-1], None
 
 
 def get_session_model(session: Session) -> str:
@@ -372,101 +620,121 @@ def get_session_model(session: Session) -> str:
         from .registry import get_platform
         return session.model or get_platform('codex')['cli_name']
 
-    # Use stored session file path if available, otherwise reconstruct
-    if session._session_file and session._session_file.exists():
-        session_file = session._session_file
-        log_debug(f"get_session_model: Using stored _session_file: {session_file}")
-    else:
-        session_file = get_session_file_path(session)
-        log_debug(f"get_session_model: Reconstructed path: {session_file}")
+    session_file, stat = _stat_session_file(session)
+    log_debug("get_session_model: Session ID: %.8s, File: %s", session.session_id, session_file)
 
-    log_debug(f"get_session_model: Session ID: {session.session_id[:8]}, Project: {session.project_path}")
-
-    if not session_file.exists():
-        log_debug(f"get_session_model: File does not exist: {session_file}")
+    if stat is None:
+        log_debug("get_session_model: File does not exist: %s", session_file)
         return ''
 
-    # Check file size
-    try:
-        file_size = session_file.stat().st_size
-        log_debug(f"get_session_model: File size: {file_size:,} bytes")
-        if file_size == 0:
-            log_debug(f"get_session_model: File is empty!")
-            return ''
-    except OSError as e:
-        log_debug(f"get_session_model: Cannot stat file: {e}")
+    log_debug("get_session_model: File size: %d bytes", stat.st_size)
+    if stat.st_size == 0:
+        log_debug("get_session_model: File is empty!")
         return ''
 
-    model = ''
-    entry_types_seen = {}
-    assistant_count = 0
-    total_lines = 0
-
-    try:
-        with open(session_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                total_lines = line_num
-                try:
-                    entry = json.loads(line)
-                    entry_type = entry.get('type', 'unknown')
-                    entry_types_seen[entry_type] = entry_types_seen.get(entry_type, 0) + 1
-
-                    # Look for model in various places Claude might store it
-                    if entry_type == 'assistant':
-                        assistant_count += 1
-                        msg = entry.get('message', {})
-                        if isinstance(msg, dict):
-                            # Try message.model
-                            if 'model' in msg:
-                                model = msg['model']
-                                log_debug(f"get_session_model: Found model in assistant entry #{assistant_count}: '{model}'")
-                            # Try message.content for model info
-                            elif 'content' in msg and isinstance(msg.get('content'), list):
-                                for block in msg['content']:
-                                    if isinstance(block, dict) and 'model' in block:
-                                        model = block['model']
-                                        log_debug(f"get_session_model: Found in content block: '{model}'")
-                        # Try entry.model directly
-                        if not model and 'model' in entry:
-                            model = entry['model']
-                            log_debug(f"get_session_model: Found in entry.model: '{model}'")
-
-                    # Also check 'result' type entries (Claude Code might use this)
-                    elif entry_type == 'result':
-                        if 'model' in entry:
-                            model = entry['model']
-                            log_debug(f"get_session_model: Found in result.model: '{model}'")
-
-                    # Check for model at top level of any entry
-                    if not model and 'model' in entry:
-                        model = entry['model']
-                        log_debug(f"get_session_model: Found at top level: '{model}'")
-
-                except json.JSONDecodeError as e:
-                    log_debug(f"get_session_model: JSON decode error on line {line_num}: {e}")
-                    continue
+    # Cached stats have it; otherwise read backwards from EOF to the newest
+    # assistant entry instead of parsing the whole transcript
+    stats = get_session_cache().lookup(session_file, stat)
+    model = stats.model if stats is not None else _read_last_model(session_file)
+    if not model:
+        log_debug("get_session_model: No model found, returning empty")
+    return model
 
-        log_debug(f"get_session_model: Parsed {total_lines} lines, {assistant_count} assistant entries")
-        log_debug(f"get_session_model: Entry types: {entry_types_seen}")
 
+def _read_last_model(session_file: Path) -> str:
+    """Find the newest model named in a transcript by reading it backwards."""
+    fallback = ''
+    try:
+        for line in iter_lines_reverse(session_file, contains=b'"model"'):
+            entry = parse_entry(line)
+            if not isinstance(entry, dict):
+                continue
+            model = entry_model(entry)
+            if model:
+                return simplify_model_name(model)
+            # A bare top-level model only counts if no entry names one properly,
+            # and then it is the oldest such entry that wins
+            if isinstance(entry.get('model'), str) and entry['model']:
+                fallback = entry['model']
     except IOError as e:
-        log_error(f"get_session_model: IOError reading {session_file}: {e}")
+        log_error("get_session_model: IOError reading %s: %s", session_file, e)
         return ''
+    return simplify_model_name(fallback)
 
-    # Simplify model name
-    if model:
-        model_lower = model.lower()
-        if 'opus' in model_lower:
-            return 'opus'
-        if 'sonnet' in model_lower:
-            return 'sonnet'
-        if 'haiku' in model_lower:
-            return 'haiku'
-        log_debug(f"get_session_model: Unknown model format: '{model}'")
-        return model
 
-    log_debug(f"get_session_model: No model found, returning empty")
-    return ''
+def iter_lines_reverse(path: Path, block_size: int = 64 * 1024,
+                       contains: Optional[bytes] = None) -> Iterator[bytes]:
+    """
+    Yield the non-empty lines of a file from last to first (without newlines).
+    If contains is given, only lines containing those bytes are yielded.
+
+    Reads fixed-size blocks backwards from EOF, so finding the newest entry
+    costs a few KB of I/O regardless of file size. A line longer than a block
+    is assembled from its pieces without repeated copying. Files of
+    MMAP_MIN_BYTES or more are walked through a read-only mapping instead,
+    and only the lines passing the contains check are copied out of it.
+    """
+    with open(path, 'rb') as f:
+        mapping = map_file(f, sequential=False)
+        if mapping is not None:
+            with mapping:
+                yield from _iter_mapped_lines_reverse(f, mapping, contains)
+            return
+
+        pos = f.seek(0, 2)
+        pieces: List[bytes] = []  # Parts of the line being assembled, newest first
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            block = f.read(read_size)
+
+            newline = block.rfind(b'\n')
+            if newline == -1:
+                pieces.append(block)
+                continue
+
+            pieces.append(block[newline + 1:])
+            line = b''.join(reversed(pieces))
+            if line and (contains is None or contains in line):
+                yield line
+
+            lines = block[:newline].split(b'\n')
+            pieces = [lines[0]]
+            for line in reversed(lines[1:]):
+                if line and (contains is None or contains in line):
+                    yield line
+
+        line = b''.join(reversed(pieces))
+        if line and (contains is None or contains in line):
+            yield line
+
+
+def _iter_mapped_lines_reverse(f, mapping: mmap.mmap, contains: Optional[bytes]) -> Iterator[bytes]:
+    end = len(mapping)
+    while end > 0:
+        # Lines past a truncation are gone, and reading them would raise SIGBUS
+        end = min(end, mapped_size(f, mapping))
+        newline = mapping.rfind(b'\n', 0, end)
+        start = newline + 1
+        if start < end and (contains is None or mapping.find(contains, start, end) >= 0):
+            yield mapping[start:end]
+        end = max(newline, 0)
+
+
+def read_head_lines(path: Path, max_bytes: int = 64 * 1024, max_lines: Optional[int] = None) -> List[bytes]:
+    """
+    Read complete lines from the start of a file, never more than max_bytes.
+    For fields that only need the oldest entries (cwd, first prompt).
+    """
+    with open(path, 'rb') as f:
+        data = f.read(max_bytes + 1)
+    truncated = len(data) > max_bytes
+    lines = data[:max_bytes].split(b'\n')
+    if truncated or not data.endswith(b'\n'):
+        lines = lines[:-1]  # Last piece may be cut off mid-line
+    lines = [line for line in lines if line]
+    return lines[:max_lines] if max_lines is not None else lines
 
 
 def get_session_cost(session: Session) -> float:
@@ -475,7 +743,7 @@ def get_session_cost(session: Session) -> float:
 
     For Codex sessions, uses aggregate tokens_used with a blended rate estimate.
 
-    Pricing (per 1M tokens):
+    Each model's tokens are priced at that model's rates (per 1M tokens):
     - Claude Sonnet: $3 input, $15 output, $3.75 cache write, $0.30 cache read
     - Claude Opus: $15 input, $75 output, $18.75 cache write, $1.50 cache read
     - Claude Haiku: $0.25 input, $1.25 output, $0.3125 cache write, $0.025 cache read
@@ -485,119 +753,109 @@ def get_session_cost(session: Session) -> float:
             return round(session.codex_tokens_used * 9.0 / 1_000_000, 4)
         return 0.0
 
-    # Use stored session file path if available, otherwise reconstruct
-    if session._session_file and session._session_file.exists():
-        session_file = session._session_file
-        log_debug(f"get_session_cost: Using stored _session_file")
-    else:
-        session_file = get_session_file_path(session)
-        log_debug(f"get_session_cost: Using reconstructed path")
+    session_file, stat = _stat_session_file(session)
+    log_debug("get_session_cost: File: %s", session_file)
 
-    log_debug(f"get_session_cost: File: {session_file}")
+    if stat is None:
+        log_debug("get_session_cost: File does not exist: %s", session_file)
+        return 0.0
 
-    if not session_file.exists():
-        log_debug(f"get_session_cost: File does not exist: {session_file}")
+    stats = _get_transcript_stats(session_file, stat)
+    if stats is None:
         return 0.0
 
-    total_input = 0
-    total_output = 0
-    total_cache_creation = 0
-    total_cache_read = 0
-    model = 'sonnet'  # Default
-    usage_entries_found = 0
+    cost = stats.cost
+    log_debug("get_session_cost: Calculated cost $%.4f from %s usage", cost, _LazyKeys(stats.usage))
+    return cost
 
-    try:
-        with open(session_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    entry = json.loads(line)
-                    entry_type = entry.get('type', 'unknown')
-
-                    # Look for usage data in assistant entries
-                    if entry_type == 'assistant':
-                        msg = entry.get('message', {})
-                        if isinstance(msg, dict):
-                            # Get model
-                            if 'model' in msg:
-                                model_name = msg['model'].lower()
-                                if 'opus' in model_name:
-                                    model = 'opus'
-                                elif 'haiku' in model_name:
-                                    model = 'haiku'
-                                else:
-                                    model = 'sonnet'
-
-                            # Get usage - try different locations
-                            usage = msg.get('usage', {})
-                            if usage:
-                                usage_entries_found += 1
-                                total_input += usage.get('input_tokens', 0)
-                                total_output += usage.get('output_tokens', 0)
-                                total_cache_creation += usage.get('cache_creation_input_tokens', 0)
-                                total_cache_read += usage.get('cache_read_input_tokens', 0)
-
-                    # Also check for usage at entry level
-                    if 'usage' in entry:
-                        usage = entry['usage']
-                        if isinstance(usage, dict):
-                            usage_entries_found += 1
-                            total_input += usage.get('input_tokens', 0)
-                            total_output += usage.get('output_tokens', 0)
-                            total_cache_creation += usage.get('cache_creation_input_tokens', 0)
-                            total_cache_read += usage.get('cache_read_input_tokens', 0)
-
-                    # Debug: Show first entry with potential cost data
-                    if line_num <= 5 and ('usage' in entry or 'costUSD' in entry or 'cost' in entry):
-                        log_debug(f"get_session_cost: Line {line_num} has cost data: {list(entry.keys())}")
-
-                except json.JSONDecodeError:
-                    continue
 
-        log_debug(f"get_session_cost: Found {usage_entries_found} entries with usage data")
-        log_debug(f"get_session_cost: Totals - input:{total_input}, output:{total_output}, cache_create:{total_cache_creation}, cache_read:{total_cache_read}")
+@traced()
+def enrich_sessions(sessions: List[Session]):
+    """
+    Fill in model, git branch and cost for every session.
+    Transcripts that are not cached yet are analyzed in parallel first.
+    """
+    files = []
+    session_files: Dict[str, Path] = {}
+    for session in sessions:
+        if session.source != 'claude':
+            continue
+        session_file, stat = _stat_session_file(session)
+        if stat is None:
+            log_debug("Session %.8s has no valid session file", session.session_id)
+            continue
+        files.append((session_file, stat))
+        session_files[session.session_id] = session_file
 
-    except IOError as e:
-        log_error(f"get_session_cost: IOError: {e}")
-        return 0.0
+    with perf.timed('enrich.transcripts_batch'):
+        stats_by_path = analyze_files(files, get_file_budget())
 
-    # Calculate cost based on model
-    if model == 'opus':
-        cost = (
-            (total_input / 1_000_000) * 15.00 +
-            (total_output / 1_000_000) * 75.00 +
-            (total_cache_creation / 1_000_000) * 18.75 +
-            (total_cache_read / 1_000_000) * 1.50
-        )
-    elif model == 'haiku':
-        cost = (
-            (total_input / 1_000_000) * 0.25 +
-            (total_output / 1_000_000) * 1.25 +
-            (total_cache_creation / 1_000_000) * 0.3125 +
-            (total_cache_read / 1_000_000) * 0.025
-        )
-    else:  # sonnet
-        cost = (
-            (total_input / 1_000_000) * 3.00 +
-            (total_output / 1_000_000) * 15.00 +
-            (total_cache_creation / 1_000_000) * 3.75 +
-            (total_cache_read / 1_000_000) * 0.30
-        )
+    sessions_with_model = 0
+    for session in sessions:
+        _apply_enrichment(session, stats_by_path.get(session_files.get(session.session_id)))
+        if session.model:
+            sessions_with_model += 1
 
-    log_debug(f"get_session_cost: Calculated cost ${cost:.4f} for model {model}")
-    return cost
+    get_session_cache().flush()
+    log_debug("Enrichment complete: %d/%d have valid files, %s/%d have models",
+              len(files), len(sessions), sessions_with_model, len(sessions))
+
+
+@traced()
+def enrich_session(session: Session, budgeted: bool = True) -> bool:
+    """
+    Fill in model, cost and git branch for a single session.
+    Returns False if its transcript went over the installed file budget and
+    was deferred (model and cost stay empty); budgeted=False parses it in full.
+    """
+    stats = None
+    deferred = False
+    if session.source == 'claude' and (not session.model or session.cost == 0):
+        session_file, stat = _stat_session_file(session)
+        if stat is not None:
+            with perf.timed('enrich.transcript'):
+                stats = _get_transcript_stats(session_file, stat, budgeted)
+            deferred = is_deferred(session_file)
+            if session._partial_count and not deferred and stats is not None:
+                # Discovery only saw the part parsed within budget
+                session.message_count = stats.user_count
+                session._partial_count = False
+                if not session.first_prompt:
+                    session.first_prompt = stats.first_prompt
+    _apply_enrichment(session, stats)
+    return not deferred
+
+
+def _apply_enrichment(session: Session, stats: Optional[TranscriptStats]):
+    """Copy model and cost from a session's transcript stats and look up its git branch."""
+    if stats is not None:
+        if not session.model:
+            session.model = stats.model
+        if session.cost == 0:
+            session.cost = stats.cost
+    elif session.source != 'claude':
+        if not session.model:
+            with perf.timed('enrich.model'):
+                session.model = get_session_model(session)
+        if session.cost == 0:
+            with perf.timed('enrich.cost'):
+                session.cost = get_session_cost(session)
+    if not session.git_branch:
+        with perf.timed('enrich.git_branch'):
+            session.git_branch = get_git_branch(session.project_path)
 
 
 def _get_codex_db_path() -> Optional[Path]:
     """Find the Codex SQLite database path (highest numbered state_*.sqlite)."""
     codex_dir = Path.home() / '.codex'
     if not codex_dir.exists():
-        log_debug(f"Codex: Directory does not exist: {codex_dir}")
+        log_debug("Codex: Directory does not exist: %s", codex_dir)
         return None
     db_files = sorted(codex_dir.glob('state_*.sqlite'), reverse=True)
     if db_files:
-        log_debug(f"Codex: Found {len(db_files)} database file(s), using: {db_files[0].name}")
+        log_debug("Codex: Found %d database file(s), using: %s", len(db_files), db_files[0].name)
         return db_files[0]
-    log_debug(f"Codex: Directory exists but no state_*.sqlite files found in {codex_dir}")
+    log_debug("Codex: Directory exists but no state_*.sqlite files found in %s", codex_dir)
     return None
 
 
@@ -606,17 +864,17 @@ def _get_codex_default_model() -> str:
     import re
     config_path = Path.home() / '.codex' / 'config.toml'
     if not config_path.exists():
-        log_debug(f"Codex: No config.toml at {config_path}, defaulting model to 'codex'")
+        log_debug("Codex: No config.toml at %s, defaulting model to 'codex'", config_path)
         return 'codex'
     try:
         content = config_path.read_text()
         match = re.search(r'model\s*=\s*"([^"]+)"', content)
         if match:
-            log_debug(f"Codex: Default model from config.toml: {match.group(1)}")
+            log_debug("Codex: Default model from config.toml: %s", match.group(1))
             return match.group(1)
         log_debug("Codex: config.toml exists but no model= line found")
     except Exception as e:
-        log_debug(f"Codex: Error reading config.toml: {e}")
+        log_debug("Codex: Error reading config.toml: %s", e)
     return 'codex'
 
 
@@ -634,93 +892,212 @@ def _parse_codex_timestamp(value, thread_id: str, field_name: str) -> Optional[d
     except (ValueError, TypeError, OSError):
         pass
     try:
-        # Try as ISO format string
-        return datetime.fromisoformat(str(value))
+        # Try as ISO format string (naive local time, like the epoch values)
+        parsed = datetime.fromisoformat(str(value))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
     except (ValueError, TypeError):
-        log_debug(f"Codex: Could not parse {field_name} '{value}' for thread {thread_id}")
+        log_debug("Codex: Could not parse %s '%s' for thread %s", field_name, value, thread_id)
         return None
 
 
+@traced('codex_rollout')
+def _read_codex_rollout_model(rollout_path: str) -> Optional[str]:
+    """Get the model from the newest turn_context entry of a Codex rollout, reading backwards."""
+    perf.count('codex.rollout_reads')
+    try:
+        for line in iter_lines_reverse(Path(rollout_path), contains=b'turn_context'):
+            try:
+                entry = jsonbackend.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get('type') == 'turn_context':
+                payload = entry.get('payload', {})
+                if isinstance(payload, dict) and 'model' in payload:
+                    return payload['model']
+    except OSError:
+        pass
+    return None
+
+
+# Codex writes its state database while we read it; wait this long for its locks
+CODEX_BUSY_TIMEOUT_MS = 2000
+
+# Thread columns read from the Codex database (and cached per thread)
+_CODEX_COLUMNS = ('id, cwd, created_at, updated_at, title, first_user_message, '
+                  'tokens_used, git_branch, git_sha, model_provider, archived, rollout_path')
+
+_codex_lock = threading.Lock()
+_codex_conn: Optional[Tuple[Path, sqlite3.Connection]] = None
+
+
+def _get_codex_connection(db_path: Path) -> sqlite3.Connection:
+    """
+    Open the Codex database read-only, once per process.
+    The connection is reopened only if a newer state_*.sqlite appears.
+    """
+    global _codex_conn
+    if _codex_conn is not None:
+        if _codex_conn[0] == db_path:
+            return _codex_conn[1]
+        _codex_conn[1].close()
+        _codex_conn = None
+
+    log_debug("Codex: Opening database read-only: %s", db_path)
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA query_only = 1')
+    conn.execute(f'PRAGMA busy_timeout = {CODEX_BUSY_TIMEOUT_MS}')
+    _codex_conn = (db_path, conn)
+    return conn
+
+
+def _sync_codex_threads(conn: sqlite3.Connection, db_path: Path) -> List[Dict[str, Any]]:
+    """
+    Bring the cached Codex threads up to date and return the non-archived ones.
+
+    Only threads with updated_at at or past the stored watermark are read,
+    and only their rollouts are reopened. Rows at the watermark itself are
+    read again because a thread can be updated within the same timestamp
+    after a sync. Deleted (or otherwise missed) threads are caught by
+    comparing the non-archived count and, on mismatch, the thread ids.
+    """
+    cache = get_session_cache()
+    state = cache.codex_state(db_path)
+    # Fix the upper bound first so threads written during the sync are picked up next time
+    watermark = conn.execute('SELECT MAX(updated_at) FROM threads').fetchone()[0]
+
+    if state is None:
+        rows = conn.execute(f'SELECT {_CODEX_COLUMNS} FROM threads WHERE archived = 0 OR archived IS NULL').fetchall()
+        log_debug("Codex: Full sync, query returned %d non-archived thread(s)", len(rows))
+        perf.count('codex.rows_read', len(rows))
+        threads = {row['id']: _codex_thread_data(row) for row in rows}
+        cache.store_codex_state(db_path, watermark, threads, (), full=True)
+        return list(threads.values())
+
+    last_watermark, threads = state
+    rows = conn.execute(
+        f'SELECT {_CODEX_COLUMNS} FROM threads WHERE updated_at >= ? AND updated_at <= ?',
+        (last_watermark, watermark)
+    ).fetchall()
+    perf.count('codex.rows_read', len(rows))
+    changed: Dict[str, Dict[str, Any]] = {}
+    removed = set()
+    for row in rows:
+        if row['archived']:
+            removed.add(row['id'])
+        elif row['id'] in threads and threads[row['id']]['updated_at'] == row['updated_at']:
+            continue  # Unchanged row at the watermark
+        else:
+            changed[row['id']] = _codex_thread_data(row)
+    for thread_id in removed:
+        threads.pop(thread_id, None)
+    threads.update(changed)
+
+    active_count = conn.execute(
+        'SELECT COUNT(*) FROM threads WHERE archived = 0 OR archived IS NULL'
+    ).fetchone()[0]
+    if active_count != len(threads):
+        active_ids = {row[0] for row in conn.execute(
+            'SELECT id FROM threads WHERE archived = 0 OR archived IS NULL')}
+        gone = set(threads) - active_ids
+        missing = list(active_ids - set(threads))
+        log_debug("Codex: %d thread(s) deleted, %d missed since last sync", len(gone), len(missing))
+        for thread_id in gone:
+            del threads[thread_id]
+        removed |= gone
+        for row in _fetch_codex_threads(conn, missing):
+            changed[row['id']] = threads[row['id']] = _codex_thread_data(row)
+
+    log_debug("Codex: Incremental sync, %d changed, %d removed, %d non-archived thread(s)",
+              len(changed), len(removed), len(threads))
+    if changed or removed or watermark != last_watermark:
+        cache.store_codex_state(db_path, watermark, changed, removed)
+    return list(threads.values())
+
+
+def _fetch_codex_threads(conn: sqlite3.Connection, thread_ids: List[str]) -> List[sqlite3.Row]:
+    """Read specific thread rows by id (in batches under SQLite's variable limit)."""
+    rows = []
+    for start in range(0, len(thread_ids), 500):
+        batch = thread_ids[start:start + 500]
+        placeholders = ','.join('?' * len(batch))
+        rows.extend(conn.execute(
+            f'SELECT {_CODEX_COLUMNS} FROM threads WHERE id IN ({placeholders})', batch
+        ).fetchall())
+    return rows
+
+
+def _codex_thread_data(row: sqlite3.Row) -> Dict[str, Any]:
+    """Cacheable data for a thread: its columns plus the model from its rollout."""
+    data = dict(row)
+    # Extract actual model from rollout JSONL (turn_context entries have 'model')
+    rollout_path = row['rollout_path'] if row['rollout_path'] else None
+    data['actual_model'] = _read_codex_rollout_model(rollout_path) if rollout_path else None
+    return data
+
+
+def _codex_session_from_thread(thread: Dict[str, Any], default_model: str) -> Session:
+    """Build a Session from cached Codex thread data."""
+    # Codex stores timestamps as Unix epoch integers or ISO strings
+    created = _parse_codex_timestamp(thread['created_at'], thread['id'][:8], 'created_at')
+    modified = _parse_codex_timestamp(thread['updated_at'], thread['id'][:8], 'updated_at') or created
+
+    # Prefer actual model from rollout, then config.toml default, then provider name
+    model = (thread['actual_model'] or (default_model if default_model != 'codex' else None)
+             or thread['model_provider'] or 'codex')
+    if model == 'openai':
+        model = 'codex'  # "openai" is just a provider name, not useful as model display
+    cwd = thread['cwd'] if thread['cwd'] else os.getcwd()
+
+    if not thread['cwd']:
+        log_debug("Codex: Thread %.8s has no cwd, falling back to %s", thread['id'], os.getcwd())
+
+    session = Session(
+        session_id=thread['id'],
+        project_path=cwd,
+        created=created,
+        modified=modified,
+        custom_title='',  # Codex auto-generates titles; store in first_prompt instead
+        first_prompt=thread['title'] or thread['first_user_message'] or '',
+        model=model,
+        git_branch=thread['git_branch'] or '',
+        source='codex',
+        codex_tokens_used=int(thread['tokens_used']) if thread['tokens_used'] else 0,
+    )
+    log_debug("  Codex session: %.8s... model=%s tokens=%s cwd=%s", thread['id'], model, session.codex_tokens_used, cwd)
+    return session
+
+
+@traced()
 def get_all_codex_sessions() -> List[Session]:
     """
     Discover all Codex sessions from the SQLite database.
-    Uses Python's built-in sqlite3 module for read-only access.
+    Uses Python's built-in sqlite3 module for read-only access, and only
+    reads the threads that changed since the previous call (or run).
     """
     db_path = _get_codex_db_path()
     if not db_path:
         log_debug("Codex: No database found")
         return []
 
-    log_debug(f"Codex: Found database at {db_path}")
+    log_debug("Codex: Found database at %s", db_path)
     default_model = _get_codex_default_model()
 
     sessions = []
     try:
-        log_debug(f"Codex: Opening database read-only: {db_path}")
-        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute('''
-            SELECT id, cwd, created_at, updated_at, title, first_user_message,
-                   tokens_used, git_branch, git_sha, model_provider, archived, rollout_path
-            FROM threads
-            WHERE archived = 0 OR archived IS NULL
-        ''')
-
-        rows = cursor.fetchall()
-        log_debug(f"Codex: Query returned {len(rows)} non-archived thread(s)")
-
-        for row in rows:
-            # Codex stores timestamps as Unix epoch integers or ISO strings
-            created = _parse_codex_timestamp(row['created_at'], row['id'][:8], 'created_at')
-            modified = _parse_codex_timestamp(row['updated_at'], row['id'][:8], 'updated_at') or created
-
-            # Extract actual model from rollout JSONL (turn_context entries have 'model')
-            actual_model = None
-            rollout_path = row['rollout_path'] if row['rollout_path'] else None
-            if rollout_path and Path(rollout_path).exists():
-                try:
-                    with open(rollout_path, 'r', encoding='utf-8') as rf:
-                        for rline in rf:
-                            rentry = json.loads(rline)
-                            if rentry.get('type') == 'turn_context':
-                                payload = rentry.get('payload', {})
-                                if isinstance(payload, dict) and 'model' in payload:
-                                    actual_model = payload['model']
-                except Exception:
-                    pass
-
-            # Prefer actual model from rollout, then config.toml default, then provider name
-            model = actual_model or (default_model if default_model != 'codex' else None) or row['model_provider'] or 'codex'
-            if model == 'openai':
-                model = 'codex'  # "openai" is just a provider name, not useful as model display
-            cwd = row['cwd'] if row['cwd'] else os.getcwd()
-
-            if not row['cwd']:
-                log_debug(f"Codex: Thread {row['id'][:8]} has no cwd, falling back to {os.getcwd()}")
-
-            session = Session(
-                session_id=row['id'],
-                project_path=cwd,
-                created=created,
-                modified=modified,
-                custom_title='',  # Codex auto-generates titles; store in first_prompt instead
-                first_prompt=row['title'] or row['first_user_message'] or '',
-                model=model,
-                git_branch=row['git_branch'] or '',
-                source='codex',
-                codex_tokens_used=int(row['tokens_used']) if row['tokens_used'] else 0,
-            )
-            sessions.append(session)
-            log_debug(f"  Codex session: {row['id'][:8]}... model={model} tokens={session.codex_tokens_used} cwd={cwd}")
-
-        conn.close()
-        log_debug(f"Codex: Returning {len(sessions)} session(s)")
+        with _codex_lock:
+            conn = _get_codex_connection(db_path)
+            threads = _sync_codex_threads(conn, db_path)
+        sessions = [_codex_session_from_thread(thread, default_model) for thread in threads]
+        log_debug("Codex: Returning %d session(s)", len(sessions))
 
     except sqlite3.OperationalError as e:
-        log_error(f"Codex: SQLite error (database locked or corrupt?): {e}")
+        log_error("Codex: SQLite error (database locked or corrupt?): %s", e)
     except Exception as e:
-        log_error(f"Codex: Error reading sessions: {e}")
+        log_error("Codex: Error reading sessions: %s", e)
         import traceback
-        log_debug(f"Codex: Traceback: {traceback.format_exc()}")
+        log_debug("Codex: Traceback: %s", traceback.format_exc())
 
     return sessions
@@ -0,0 +1,101 @@
+"""
+Session list snapshot for SessionForge (Linux).
+Saves the last enriched session list in a compact binary file so the next
+start can paint the menu before discovery has run. The live index then
+revalidates in the background and the menu applies the differences.
+
+File layout: 4-byte magic, 1-byte format version, then a zlib-compressed
+marshal payload of (field names, rows). Rows are tuples in field-name
+order, so Session fields can be added without invalidating old files.
+"""
+
+import os
+import zlib
+import struct
+import marshal
+from pathlib import Path
+from datetime import datetime
+from dataclasses import fields
+from typing import List, Optional
+
+from .config import get_snapshot_path, log_debug, log_error
+from .session import Session
+
+
+SNAPSHOT_MAGIC = b'SFSS'
+
+# Bump when the payload layout (not the set of Session fields) changes
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct('!4sB')
+
+# Fields stored as ISO strings / str and converted back on load
+_DATETIME_FIELDS = ('created', 'modified')
+_PATH_FIELDS = ('_session_file',)
+
+
+def save_snapshot(sessions: List[Session], path: Optional[Path] = None):
+    """Write the session list, replacing the previous snapshot atomically."""
+    path = Path(path) if path else get_snapshot_path()
+    names = tuple(f.name for f in fields(Session))
+    rows = []
+    for session in sessions:
+        row = []
+        for name in names:
+            value = getattr(session, name)
+            if name in _DATETIME_FIELDS:
+                value = value.isoformat()
+            elif name in _PATH_FIELDS and value is not None:
+                value = str(value)
+            row.append(value)
+        rows.append(tuple(row))
+
+    data = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION) + zlib.compress(marshal.dumps((names, rows)), 1)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        log_debug("Snapshot: saved %d session(s), %d bytes", len(rows), len(data))
+    except (OSError, ValueError) as e:
+        log_error("Snapshot: could not save %s: %s", path, e)
+
+
+def load_snapshot(path: Optional[Path] = None) -> Optional[List[Session]]:
+    """Read the last snapshot, or None if there is none or it can't be used."""
+    path = Path(path) if path else get_snapshot_path()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        log_error("Snapshot: could not read %s: %s", path, e)
+        return None
+
+    if len(data) < _HEADER.size:
+        return None
+    magic, version = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        log_debug("Snapshot: ignoring %s (format %r v%s)", path, magic, version)
+        return None
+
+    try:
+        names, rows = marshal.loads(zlib.decompress(data[_HEADER.size:]))
+        known = {f.name for f in fields(Session)}
+        sessions = []
+        for row in rows:
+            kwargs = {name: value for name, value in zip(names, row) if name in known}
+            for name in _DATETIME_FIELDS:
+                kwargs[name] = datetime.fromisoformat(kwargs[name])
+            for name in _PATH_FIELDS:
+                if kwargs.get(name) is not None:
+                    kwargs[name] = Path(kwargs[name])
+            sessions.append(Session(**kwargs))
+    except (zlib.error, ValueError, EOFError, TypeError, KeyError) as e:
+        log_error("Snapshot: corrupt %s: %s", path, e)
+        return None
+
+    log_debug("Snapshot: loaded %d session(s)", len(sessions))
+    return sessions
@@ -0,0 +1,161 @@
+"""
+Session table for SessionForge (Linux).
+Holds the discovered sessions in display order with an id index, id-prefix
+lookup and cached display/sort keys, so the menu never recomputes display
+names or rescans the list while the user navigates.
+"""
+
+import sys
+from bisect import bisect_left
+from typing import List, Dict, Optional, Callable, Any, Iterable, Iterator, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .session import Session
+
+
+# Sort key per column (menu column keys from SessionMenu.COLUMN_DEFS)
+SORT_KEYS: Dict[str, Callable[['Session'], Any]] = {
+    'row_num': lambda s: 0,  # No sort
+    'source': lambda s: s.source,
+    'session': lambda s: s.display_name.lower(),
+    'model': lambda s: s.model.lower() if s.model else '',
+    'messages': lambda s: s.message_count,
+    'cost': lambda s: s.cost,
+    'created': lambda s: s.created,
+    'modified': lambda s: s.modified,
+    'forked_from': lambda s: s.forked_from.lower() if s.forked_from else '',
+    'git_branch': lambda s: s.git_branch.lower() if s.git_branch else '',
+    'notes': lambda s: s.notes.lower() if s.notes else '',
+    'path': lambda s: s.project_path.lower(),
+}
+
+
+def _intern(value: str) -> str:
+    """Intern a repeated string (paths, models, branches) so rows share one copy."""
+    return sys.intern(value) if value else value
+
+
+class SessionTable:
+    """
+    Ordered collection of sessions.
+
+    Behaves like a read-only list (len, iteration, indexing and slicing) and
+    adds get() by id, find_prefix() by short id, sort() by column and
+    display_name() with cached results. Derived values are computed once per
+    session and dropped by invalidate() when the session changes, e.g. after
+    background enrichment.
+    """
+
+    __slots__ = ('_rows', '_index', '_sorted_ids', '_display', '_keys')
+
+    def __init__(self, sessions: Iterable['Session'] = ()):
+        self._rows: List['Session'] = []
+        self._index: Dict[str, int] = {}
+        self._sorted_ids: Optional[List[str]] = None
+        self._display: Dict[str, str] = {}
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        for session in sessions:
+            self.add(session)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator['Session']:
+        return iter(self._rows)
+
+    def __getitem__(self, item: Union[int, slice]):
+        return self._rows[item]
+
+    def __bool__(self) -> bool:
+        return bool(self._rows)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._index
+
+    def add(self, session: 'Session'):
+        """Append a session, or replace the row holding the same id."""
+        session.project_path = _intern(session.project_path)
+        session.model = _intern(session.model)
+        session.git_branch = _intern(session.git_branch)
+        session.source = _intern(session.source)
+
+        row = self._index.get(session.session_id)
+        if row is None:
+            self._index[session.session_id] = len(self._rows)
+            self._rows.append(session)
+            self._sorted_ids = None
+        else:
+            self._rows[row] = session
+            self.invalidate(session.session_id)
+
+    def remove(self, session_id: str) -> bool:
+        """Drop a session. Returns False if it wasn't in the table."""
+        row = self._index.pop(session_id, None)
+        if row is None:
+            return False
+        del self._rows[row]
+        for later in self._rows[row:]:
+            self._index[later.session_id] -= 1
+        self._sorted_ids = None
+        self.invalidate(session_id)
+        return True
+
+    def get(self, session_id: str) -> Optional['Session']:
+        """Session with exactly this id, or None."""
+        row = self._index.get(session_id)
+        return self._rows[row] if row is not None else None
+
+    def find_prefix(self, prefix: str) -> List['Session']:
+        """All sessions whose id starts with prefix (e.g. a short_id), in id order."""
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._index)
+        ids = self._sorted_ids
+        matches = []
+        i = bisect_left(ids, prefix)
+        while i < len(ids) and ids[i].startswith(prefix):
+            matches.append(self.get(ids[i]))
+            i += 1
+        return matches
+
+    def index_of(self, session_id: str) -> Optional[int]:
+        """Current row of a session, or None."""
+        return self._index.get(session_id)
+
+    def display_name(self, session: 'Session') -> str:
+        """Cached Session.display_name."""
+        name = self._display.get(session.session_id)
+        if name is None:
+            name = self._display[session.session_id] = session.display_name
+        return name
+
+    def sort_key(self, column: str, session: 'Session') -> Any:
+        """Cached sort key of a session for a column."""
+        keys = self._keys.get(column)
+        if keys is None:
+            keys = self._keys[column] = {}
+        key = keys.get(session.session_id)
+        if key is None:
+            key = keys[session.session_id] = SORT_KEYS.get(column, SORT_KEYS['row_num'])(session)
+        return key
+
+    def sort(self, column: str, reverse: bool = False):
+        """Reorder rows by a column's sort key (stable, like list.sort)."""
+        self._rows.sort(key=lambda s: self.sort_key(column, s), reverse=reverse)
+        self._index = {s.session_id: row for row, s in enumerate(self._rows)}
+
+    def sorted_by(self, column: str, reverse: bool = False) -> List['Session']:
+        """Rows ordered by a column, leaving the table order untouched."""
+        return sorted(self._rows, key=lambda s: self.sort_key(column, s), reverse=reverse)
+
+    def invalidate(self, session_ids: Union[str, Iterable[str]]):
+        """Forget derived values of sessions that changed."""
+        if isinstance(session_ids, str):
+            session_ids = (session_ids,)
+        for session_id in session_ids:
+            self._display.pop(session_id, None)
+            for keys in self._keys.values():
+                keys.pop(session_id, None)
+            session = self.get(session_id)
+            if session is not None:
+                session.model = _intern(session.model)
+                session.git_branch = _intern(session.git_branch)
@@ -0,0 +1,487 @@
+"""
+Transcript analysis for SessionForge (Linux).
+Reads a Claude session .jsonl file once and derives every field that
+discovery and enrichment need (first prompt, counts, cwd, model, usage).
+
+Claude only ever appends to session files, so a previous result can be
+resumed from its byte offset and only the newly written lines parsed.
+A very large file can also be cut into newline-aligned ranges that are
+analyzed independently (analyze_range) and merged in order (merge_parts).
+"""
+
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple
+from dataclasses import dataclass, field, asdict
+
+from .config import log_debug, log_error, trace_span
+from .jsonscan import JsonlScanner, Field, CAPTURE, INVALID, LONG_LINE_BYTES, extract
+from .budget import FileBudget, OverBudget
+from . import jsonbackend, perf
+
+
+# Order of the per-model token totals stored in TranscriptStats.usage
+USAGE_KEYS = (
+    'input_tokens',
+    'output_tokens',
+    'cache_creation_input_tokens',
+    'cache_read_input_tokens',
+)
+
+# Bytes from the start of the file, and just before the resume offset,
+# that must be unchanged for an incremental parse to be trusted
+SIGNATURE_HEAD_BYTES = 1024
+SIGNATURE_TAIL_BYTES = 64
+
+# Read size when looking for the newline that ends a range
+_BOUNDARY_READ_BYTES = 64 * 1024
+
+# A FileBudget is checked after this many lines (and after every long line)
+_BUDGET_CHECK_LINES = 64
+
+# The parts of an entry _analyze_entry reads; long lines are parsed for
+# these alone, so a huge tool output or file attachment is never decoded
+_PROMPT_BLOCK_KEYS = {'text': Field(prefix=True)}
+_MESSAGE_KEYS = {
+    'model': CAPTURE,
+    'usage': CAPTURE,
+    'content': Field(arr={'model': CAPTURE}, other=False),
+}
+ENTRY_KEYS = {
+    'type': CAPTURE,
+    'timestamp': CAPTURE,
+    'cwd': CAPTURE,
+    'model': CAPTURE,
+    'usage': CAPTURE,
+    'message': Field(obj=_MESSAGE_KEYS, arr=_PROMPT_BLOCK_KEYS, prefix=True),
+}
+
+
+@dataclass
+class TranscriptStats:
+    """Everything derived from a single pass over a session transcript."""
+    first_prompt: str = ''
+    user_count: int = 0
+    assistant_count: int = 0
+    cwd: str = ''
+    last_model: str = ''  # Raw model id of the newest entry that named one
+    usage: Dict[str, List[int]] = field(default_factory=dict)  # Pricing tier -> totals in USAGE_KEYS order
+    first_timestamp: str = ''
+    last_timestamp: str = ''
+    # Resume state for incremental parsing of appended lines
+    offset: int = 0  # Bytes fully parsed from the start of the file
+    signature: int = 0  # CRC of the file head and the bytes just before offset
+    tier: str = 'sonnet'  # Pricing tier in effect at offset
+
+    @property
+    def model(self) -> str:
+        """Simplified model name for display (opus/sonnet/haiku or raw id)."""
+        return simplify_model_name(self.last_model)
+
+    @property
+    def cost(self) -> float:
+        """Total cost, pricing each model's tokens at that model's rates."""
+        return sum(calculate_cost(tier, *totals) for tier, totals in self.usage.items())
+
+    def to_json(self) -> str:
+        """Serialize for the session cache."""
+        return json.dumps(asdict(self), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data: str) -> 'TranscriptStats':
+        """Deserialize from the session cache, ignoring unknown keys."""
+        raw = jsonbackend.loads(data)
+        valid_keys = {f.name for f in cls.__dataclass_fields__.values()}
+        return cls(**{k: v for k, v in raw.items() if k in valid_keys})
+
+
+@dataclass
+class TranscriptPart:
+    """
+    Stats for one byte range of a transcript, before merge_parts.
+
+    The fields that depend on what came before the range are left open:
+    stats.usage[''] holds the usage priced at the tier the previous range
+    ended in, stats.tier is '' if no entry in the range set one, stats.cwd
+    is None if no summary set it, and found_model tells a model id from an
+    assistant or result entry apart from a top-level fallback.
+    """
+    start: int  # File offset of the range; stats.offset counts from here
+    stats: TranscriptStats
+    found_model: bool = False
+
+
+def simplify_model_name(model: str) -> str:
+    """Reduce a full model id like 'claude-opus-4-1' to 'opus'."""
+    if not model:
+        return ''
+    model_lower = model.lower()
+    if 'opus' in model_lower:
+        return 'opus'
+    if 'sonnet' in model_lower:
+        return 'sonnet'
+    if 'haiku' in model_lower:
+        return 'haiku'
+    return model
+
+
+def pricing_tier(model: str) -> str:
+    """Map a model id to the tier used for pricing (unknown models price as sonnet)."""
+    model_lower = model.lower()
+    if 'opus' in model_lower:
+        return 'opus'
+    if 'haiku' in model_lower:
+        return 'haiku'
+    return 'sonnet'
+
+
+def calculate_cost(tier: str, total_input: int, total_output: int,
+                   total_cache_creation: int, total_cache_read: int) -> float:
+    """Convert token totals to a dollar cost for a pricing tier."""
+    if tier == 'opus':
+        cost = (
+            (total_input / 1_000_000) * 15.00 +
+            (total_output / 1_000_000) * 75.00 +
+            (total_cache_creation / 1_000_000) * 18.75 +
+            (total_cache_read / 1_000_000) * 1.50
+        )
+    elif tier == 'haiku':
+        cost = (
+            (total_input / 1_000_000) * 0.25 +
+            (total_output / 1_000_000) * 1.25 +
+            (total_cache_creation / 1_000_000) * 0.3125 +
+            (total_cache_read / 1_000_000) * 0.025
+        )
+    else:  # sonnet
+        cost = (
+            (total_input / 1_000_000) * 3.00 +
+            (total_output / 1_000_000) * 15.00 +
+            (total_cache_creation / 1_000_000) * 3.75 +
+            (total_cache_read / 1_000_000) * 0.30
+        )
+    return cost
+
+
+def _add_usage(stats: TranscriptStats, tier: str, usage: Dict[str, Any]):
+    """Accumulate one usage block into the totals for a pricing tier."""
+    totals = stats.usage.get(tier)
+    if totals is None:
+        totals = stats.usage[tier] = [0] * len(USAGE_KEYS)
+    for i, key in enumerate(USAGE_KEYS):
+        totals[i] += usage.get(key, 0) or 0
+
+
+def _resume_signature(f, offset: int) -> int:
+    """CRC over the first bytes of the file and the bytes just before offset."""
+    f.seek(0)
+    data = f.read(min(offset, SIGNATURE_HEAD_BYTES))
+    tail_start = max(0, offset - SIGNATURE_TAIL_BYTES)
+    f.seek(tail_start)
+    data += f.read(offset - tail_start)
+    return zlib.crc32(data)
+
+
+def analyze_transcript(session_file: Path, resume: Optional[TranscriptStats] = None,
+                       budget: Optional[FileBudget] = None) -> Optional[TranscriptStats]:
+    """
+    Parse a session .jsonl file and return all derived fields.
+
+    If resume is given (a previous result for the same file) it is updated in
+    place by parsing only the bytes appended after resume.offset. A file that
+    was truncated or rewritten since then is detected by its signature and
+    rescanned from the start. A trailing line without a newline is only
+    consumed if it is already complete JSON, so a line Claude is still writing
+    is picked up by the next call.
+
+    With a budget, parsing stops once this call has gone through more bytes,
+    lines or time than it allows, and OverBudget is raised with the stats
+    so far (resume from them to carry on).
+
+    Returns None if the file could not be read.
+    """
+    with trace_span('analyze_transcript', file=session_file.name,
+                    resume_offset=resume.offset if resume else 0):
+        return _analyze_transcript(session_file, resume, budget)
+
+
+def _analyze_transcript(session_file: Path, resume: Optional[TranscriptStats],
+                        budget: Optional[FileBudget]) -> Optional[TranscriptStats]:
+    """analyze_transcript without the trace span."""
+    started = time.perf_counter()
+    try:
+        with open(session_file, 'rb') as f:
+            size = f.seek(0, 2)
+            stats = _resume_point(f, size, session_file, resume)
+            start = stats.offset
+
+            f.seek(start)
+            scanner = JsonlScanner(f, ENTRY_KEYS)
+            over = ''
+            limited = bool(budget)
+            check_at = _BUDGET_CHECK_LINES
+            for length, complete, entry in scanner:
+                if not complete and entry is INVALID:
+                    break  # Partial last line that Claude is still writing
+                stats.offset += length
+                if isinstance(entry, dict):
+                    stats.tier = _analyze_entry(stats, entry, stats.tier)
+                if limited and (scanner.lines >= check_at or length >= LONG_LINE_BYTES):
+                    check_at = scanner.lines + _BUDGET_CHECK_LINES
+                    if stats.offset < size:  # Nothing is left to defer once the end is reached
+                        over = budget.exceeded(stats.offset - start, scanner.lines, time.perf_counter() - started)
+                        if over:
+                            break
+
+            if stats.offset != start:
+                stats.signature = _resume_signature(f, stats.offset)
+    except IOError as e:
+        log_error("analyze_transcript: Could not read %s: %s", session_file, e)
+        return None
+
+    perf.record_file(session_file, time.perf_counter() - started, stats.offset - start,
+                     scanner.lines, scanner.loads, size)
+    if scanner.extracted:
+        perf.count('transcript.extracted', scanner.extracted)
+
+    if over:
+        log_debug("analyze_transcript: %s: stopped at byte %d of %d, %s", session_file.name, stats.offset, size, over)
+        raise OverBudget(over, stats)
+
+    log_debug("analyze_transcript: %s: parsed bytes %d-%d of %d, %d user, %d assistant, model '%s'",
+              session_file.name, start, stats.offset, size,
+              stats.user_count, stats.assistant_count, stats.last_model)
+    return stats
+
+
+def _resume_point(f, size: int, session_file: Path, resume: Optional[TranscriptStats]) -> TranscriptStats:
+    """resume if it is still valid for the file, otherwise empty stats."""
+    if resume is not None and resume.offset:
+        if resume.offset > size or _resume_signature(f, resume.offset) != resume.signature:
+            log_debug("analyze_transcript: %s was truncated or rewritten, rescanning", session_file.name)
+            return TranscriptStats()
+    return resume if resume is not None else TranscriptStats()
+
+
+def split_transcript(session_file: Path, resume: Optional[TranscriptStats],
+                     parts: int) -> Optional[Tuple[TranscriptStats, List[Tuple[int, Optional[int]]]]]:
+    """
+    Plan a parse of a transcript in up to parts ranges of similar size.
+
+    Returns the stats to merge the ranges into (resume if it is still
+    valid, as in analyze_transcript) and the (start, stop) byte ranges
+    covering everything after its offset. Each stop is just after a
+    newline; the last range has stop None and runs to EOF. A line longer
+    than a range leaves fewer, larger ranges.
+
+    Returns None if the file could not be read.
+    """
+    try:
+        with open(session_file, 'rb') as f:
+            size = f.seek(0, 2)
+            base = _resume_point(f, size, session_file, resume)
+            start = base.offset
+            ranges: List[Tuple[int, Optional[int]]] = []
+            for i in range(1, parts):
+                target = start + (size - start) * i // parts
+                begin = ranges[-1][1] if ranges else start
+                if target < begin:
+                    continue
+                boundary = _next_line_start(f, target)
+                if boundary is None or boundary >= size:
+                    break
+                ranges.append((begin, boundary))
+            ranges.append((ranges[-1][1] if ranges else start, None))
+    except IOError as e:
+        log_error("split_transcript: Could not read %s: %s", session_file, e)
+        return None
+    return base, ranges
+
+
+def _next_line_start(f, offset: int) -> Optional[int]:
+    """Offset just after the first newline at or after offset, or None."""
+    f.seek(offset)
+    while True:
+        block = f.read(_BOUNDARY_READ_BYTES)
+        if not block:
+            return None
+        newline = block.find(b'\n')
+        if newline >= 0:
+            return offset + newline + 1
+        offset += len(block)
+
+
+def analyze_range(session_file: Path, start: int, stop: Optional[int]) -> Optional[TranscriptPart]:
+    """
+    Parse the lines between two byte offsets of a transcript on their own.
+    start must be the start of a line and stop (None for EOF) just after a
+    newline. Returns None if the file could not be read.
+    """
+    with trace_span('analyze_range', file=session_file.name, start=start, stop=stop):
+        started = time.perf_counter()
+        part = TranscriptPart(start, TranscriptStats(cwd=None, tier=''))
+        stats = part.stats
+        try:
+            with open(session_file, 'rb') as f:
+                size = f.seek(0, 2)
+                f.seek(start)
+                scanner = JsonlScanner(f, ENTRY_KEYS, stop=stop)
+                for length, complete, entry in scanner:
+                    if not complete and entry is INVALID:
+                        break  # Partial last line that Claude is still writing
+                    stats.offset += length
+                    if isinstance(entry, dict):
+                        stats.tier = _analyze_entry(stats, entry, stats.tier)
+                        if not part.found_model and entry_model(entry):
+                            part.found_model = True
+        except IOError as e:
+            log_error("analyze_range: Could not read %s: %s", session_file, e)
+            return None
+
+        perf.record_file(session_file, time.perf_counter() - started, stats.offset,
+                         scanner.lines, scanner.loads, size, part=True)
+        if scanner.extracted:
+            perf.count('transcript.extracted', scanner.extracted)
+        log_debug("analyze_range: %s: parsed bytes %d-%d", session_file.name, start, start + stats.offset)
+        return part
+
+
+def merge_parts(session_file: Path, base: TranscriptStats, parts: List[TranscriptPart]) -> Optional[TranscriptStats]:
+    """
+    Fold the results of analyze_range into base, in file order, giving the
+    same stats as analyzing the whole file in one pass. base is updated in
+    place. Merging stops at a range that does not start where the previous
+    one ended (the file changed while the ranges were parsed); the next
+    analysis resumes from there.
+
+    Returns None if the file could not be read to sign the result.
+    """
+    stats = base
+    start = stats.offset
+    for part in sorted(parts, key=lambda p: p.start):
+        if part.start != stats.offset:
+            log_debug("merge_parts: %s: range at %d does not follow %d, stopping there",
+                      session_file.name, part.start, stats.offset)
+            break
+        s = part.stats
+        stats.user_count += s.user_count
+        stats.assistant_count += s.assistant_count
+        if not stats.first_prompt:
+            stats.first_prompt = s.first_prompt
+        if not stats.first_timestamp:
+            stats.first_timestamp = s.first_timestamp
+        if s.last_timestamp:
+            stats.last_timestamp = s.last_timestamp
+        if s.cwd is not None:
+            stats.cwd = s.cwd
+        # A fallback model only counts while nothing earlier named one
+        if s.last_model and (part.found_model or not stats.last_model):
+            stats.last_model = s.last_model
+        for tier, totals in s.usage.items():
+            merged = stats.usage.setdefault(tier or stats.tier, [0] * len(USAGE_KEYS))
+            for i, value in enumerate(totals):
+                merged[i] += value
+        if s.tier:
+            stats.tier = s.tier
+        stats.offset = part.start + s.offset
+
+    if stats.offset != start:
+        try:
+            with open(session_file, 'rb') as f:
+                stats.signature = _resume_signature(f, stats.offset)
+        except IOError as e:
+            log_error("merge_parts: Could not read %s: %s", session_file, e)
+            return None
+    perf.count('transcript.files')
+    log_debug("merge_parts: %s: merged %d range(s), bytes %d-%d, %d user, %d assistant, model '%s'",
+              session_file.name, len(parts), start, stats.offset,
+              stats.user_count, stats.assistant_count, stats.last_model)
+    return stats
+
+
+def parse_entry(line: bytes) -> Any:
+    """
+    Decode one transcript line that is already in memory. Long lines are
+    reduced to ENTRY_KEYS rather than decoded whole. Returns INVALID (not a
+    dict) if the line is not valid JSON.
+    """
+    if len(line) >= LONG_LINE_BYTES:
+        return extract(line, ENTRY_KEYS)
+    try:
+        return jsonbackend.loads(line)
+    except ValueError:
+        return INVALID
+
+
+def entry_model(entry: Dict[str, Any]) -> str:
+    """
+    The model an assistant or result entry says produced it, or ''.
+    Top-level 'model' keys on other entries are only a fallback (see _analyze_entry).
+    """
+    model = ''
+    entry_type = entry.get('type')
+    if entry_type == 'assistant':
+        msg = entry.get('message', {})
+        if isinstance(msg, dict):
+            if 'model' in msg:
+                model = msg['model']
+            elif isinstance(msg.get('content'), list):
+                for block in msg['content']:
+                    if isinstance(block, dict) and 'model' in block:
+                        model = block['model']
+    elif entry_type == 'result':
+        model = entry.get('model', '')
+    return model if isinstance(model, str) else ''
+
+
+def _analyze_entry(stats: TranscriptStats, entry: Dict[str, Any], tier: str) -> str:
+    """
+    Fold a single transcript entry into the running stats.
+    Returns the pricing tier in effect after this entry.
+    """
+    entry_type = entry.get('type')
+
+    timestamp = entry.get('timestamp')
+    if isinstance(timestamp, str) and timestamp:
+        if not stats.first_timestamp:
+            stats.first_timestamp = timestamp
+        stats.last_timestamp = timestamp
+
+    # cwd is recorded on summary entries
+    if entry_type == 'summary' and 'cwd' in entry:
+        stats.cwd = entry['cwd']
+
+    if entry_type == 'user':
+        stats.user_count += 1
+        if not stats.first_prompt and entry.get('message'):
+            msg = entry['message']
+            if isinstance(msg, list) and msg and isinstance(msg[0], dict):
+                stats.first_prompt = str(msg[0].get('text', ''))[:100]
+            elif isinstance(msg, str):
+                stats.first_prompt = msg[:100]
+
+    if entry_type == 'assistant':
+        stats.assistant_count += 1
+        msg = entry.get('message', {})
+        if isinstance(msg, dict):
+            # The message's own model prices its usage
+            if isinstance(msg.get('model'), str):
+                tier = pricing_tier(msg['model'])
+            usage = msg.get('usage')
+            if usage and isinstance(usage, dict):
+                _add_usage(stats, tier, usage)
+
+    model = entry_model(entry)
+
+    # Fall back to a top-level model only until one has been found
+    if not model and not stats.last_model and 'model' in entry:
+        model = entry['model']
+    if model and isinstance(model, str):
+        stats.last_model = model
+
+    usage = entry.get('usage')
+    if isinstance(usage, dict):
+        _add_usage(stats, tier, usage)
+
+    return tier
@@ -0,0 +1,286 @@
+"""
+File change watching for SessionForge (Linux).
+Watches ~/.claude/projects/* and ~/.codex with inotify (through ctypes, no
+extra dependencies) and falls back to periodic polling where inotify is
+unavailable or out of watches.
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Optional, Dict, Set, Tuple
+
+from .config import log_debug, log_error
+
+
+# inotify event masks (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_DIR_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR
+_FILE_EVENTS = _DIR_EVENTS | IN_MODIFY | IN_CLOSE_WRITE
+# On the Codex directory's parent while it does not exist yet
+_PARENT_EVENTS = IN_CREATE | IN_MOVED_TO | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# How often the polling fallback rescans
+POLL_INTERVAL_SECONDS = 2.0
+
+# Changes arriving this close together are reported as one batch
+# (Claude appends to a transcript several times per message)
+DEBOUNCE_SECONDS = 0.2
+
+# Changed paths and whether everything must be rescanned (events were lost)
+Changes = Tuple[Set[Path], bool]
+
+
+class InotifyWatcher:
+    """
+    inotify watches on the projects directory, each project directory and
+    the Codex directory. New project directories are watched as they appear,
+    and so is the Codex directory (its parent is watched until it exists).
+    """
+
+    def __init__(self, projects_path: Path, codex_path: Path):
+        self.projects_path = projects_path
+        self.codex_path = codex_path
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs: Dict[int, Path] = {}
+        self._codex_parent_wd = -1  # Watch on codex_path.parent while codex_path is missing
+        try:
+            self._add_watch(projects_path, _DIR_EVENTS)
+            with os.scandir(projects_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        self._add_watch(Path(entry.path), _FILE_EVENTS)
+            self._watch_codex()
+        except OSError:
+            self.close()
+            raise
+        log_debug("InotifyWatcher: watching %d director(ies)", len(self._dirs))
+
+    def _add_watch(self, path: Path, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f'inotify_add_watch failed for {path}: {os.strerror(err)}')
+        self._dirs[wd] = path
+        return wd
+
+    def _watch_codex(self, changed: Optional[Set[Path]] = None):
+        """
+        Watch the Codex directory, or its parent until it is created (Codex
+        may be installed while the menu is open). When it appears, the files
+        already in it go into changed.
+        """
+        if not self.codex_path.is_dir():
+            if self._codex_parent_wd < 0 and self.codex_path.parent.is_dir():
+                self._codex_parent_wd = self._add_watch(self.codex_path.parent, _PARENT_EVENTS)
+            if not self.codex_path.is_dir():  # Again: it may have appeared before the watch did
+                return
+        self._add_watch(self.codex_path, _FILE_EVENTS)
+        if self._codex_parent_wd >= 0:
+            self._libc.inotify_rm_watch(self._fd, self._codex_parent_wd)
+            del self._dirs[self._codex_parent_wd]
+            self._codex_parent_wd = -1
+        if changed is not None:
+            log_debug("InotifyWatcher: %s appeared, watching it", self.codex_path)
+            with os.scandir(self.codex_path) as entries:
+                changed.update(Path(entry.path) for entry in entries)
+
+    def wait(self, timeout: float) -> Changes:
+        """Block up to timeout seconds for changes, then collect a debounced batch."""
+        changed: Set[Path] = set()
+        rescan = False
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                break
+            batch_rescan = self._read_events(changed)
+            rescan = rescan or batch_rescan
+            # Got something: keep collecting only briefly
+            deadline = min(deadline, time.monotonic() + DEBOUNCE_SECONDS)
+        return changed, rescan
+
+    def _read_events(self, changed: Set[Path]) -> bool:
+        """Drain pending events into changed. Returns True if events were lost."""
+        rescan = False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return False
+            raise
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                log_debug("InotifyWatcher: event queue overflowed, full rescan needed")
+                rescan = True
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]  # Directory was removed
+                if directory == self.codex_path and wd != self._codex_parent_wd:
+                    rescan = not self._try_watch_codex(changed) or rescan  # Wait for it to come back
+                continue
+            if wd == self._codex_parent_wd:
+                if os.fsdecode(name) == self.codex_path.name:
+                    rescan = not self._try_watch_codex(changed) or rescan
+                continue
+            if not name:
+                changed.add(directory)
+                continue
+            path = directory / os.fsdecode(name)
+            changed.add(path)
+            # A new project directory: watch it too, then report it for a scan
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and directory == self.projects_path:
+                try:
+                    self._add_watch(path, _FILE_EVENTS)
+                except OSError as e:
+                    log_error("InotifyWatcher: %s", e)
+                    rescan = True
+        return rescan
+
+    def _try_watch_codex(self, changed: Set[Path]) -> bool:
+        """_watch_codex() from the event loop; False (logged) if it failed."""
+        try:
+            self._watch_codex(changed)
+            return True
+        except OSError as e:
+            log_error("InotifyWatcher: %s", e)
+            return False
+
+    def close(self):
+        """Release the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Fallback watcher: compares (size, mtime) of every watched file against
+    the previous scan. Costs a stat per file per interval.
+    """
+
+    def __init__(self, projects_path: Path, codex_path: Path,
+                 interval: float = POLL_INTERVAL_SECONDS):
+        self.projects_path = projects_path
+        self.codex_path = codex_path
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+        log_debug("PollingWatcher: tracking %d path(s) every %ss", len(self._snapshot), interval)
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Map every watched path to (size, mtime_ns); directories map to (-1, 0)."""
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for directory, is_projects in ((self.projects_path, True), (self.codex_path, False)):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if is_projects:
+                                snapshot[Path(entry.path)] = (-1, 0)
+                                self._scan_files(Path(entry.path), snapshot)
+                        else:
+                            self._stat_into(entry, snapshot)
+            except OSError:
+                continue
+        return snapshot
+
+    def _scan_files(self, directory: Path, snapshot: Dict[Path, Tuple[int, int]]):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self._stat_into(entry, snapshot)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _stat_into(entry: os.DirEntry, snapshot: Dict[Path, Tuple[int, int]]):
+        try:
+            st = entry.stat()
+        except OSError:
+            return
+        snapshot[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+
+    def wait(self, timeout: float) -> Changes:
+        """Sleep until the next scan (at most timeout seconds) and report differences."""
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return set(), False
+        if delay > 0:
+            time.sleep(delay)
+        self._next_scan = time.monotonic() + self.interval
+
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        changed = {path for path, sig in snapshot.items() if previous.get(path) != sig}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def create_watcher(projects_path: Path, codex_path: Path):
+    """inotify watcher if possible, otherwise the polling fallback."""
+    if projects_path.is_dir():
+        try:
+            return InotifyWatcher(projects_path, codex_path)
+        except (OSError, AttributeError) as e:
+            # No inotify (non-Linux libc) or out of watches (fs.inotify.max_user_watches)
+            log_error("File watcher: inotify unavailable (%s), polling instead", e)
+    return PollingWatcher(projects_path, codex_path)
+
+
+_libc: Optional[ctypes.CDLL] = None
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Load libc with inotify prototypes declared."""
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        libc.inotify_rm_watch.restype = ctypes.c_int
+        _libc = libc
+    return _libc